@@ -0,0 +1,265 @@
+"""
+GET接口的读穿透缓存
+两级：进程内LRU+TTL，以及可选的Redis兼容共享缓存（CACHE_REDIS_URL）
+缓存键 = 实体 + 版本号 + 路径 + 排序后的查询参数；写接口递增实体的版本号，旧键随之失效
+缓存的是序列化后的响应体，命中时既不查库也不再构建pydantic模型
+缓存项同时保存按客户端编码压缩后的响应体（compression.py），命中时不再重复压缩
+多worker部署时进程内缓存各自独立，版本号只能经共享缓存同步：未配置CACHE_REDIS_URL时自动关闭缓存，避免其他worker返回旧数据
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, Response
+from compression import encoded_body, negotiate
+from conditional import VALIDATOR_HEADERS, is_not_modified, not_modified_response
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# redis://host:6379/0 使用Redis（需安装redis包）；memory:// 使用进程内替身，便于本地测试共享缓存路径
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+# gunicorn.conf.py把worker数写入WEB_CONCURRENCY
+CACHE_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+CACHE_HEADER = "X-Cache"
+JSON_MEDIA_TYPE = "application/json"
+
+# 缓存项：(响应体, 需要一起缓存的响应头, 已压缩的响应体 编码→字节)
+Entry = Tuple[bytes, Dict[str, str], Dict[str, bytes]]
+
+
+class LRUCache:
+    """进程内LRU+TTL缓存，读写均为O(1)"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, entry)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class LocalRedis:
+    """进程内的Redis替身，只实现缓存用到的 get / set(ex) / incr"""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._values.get(key)
+            if item is None or (item[0] is not None and item[0] < time.monotonic()):
+                return None
+            return item[1]
+
+    def set(self, key: str, value: Any, ex: Optional[float] = None) -> bool:
+        with self._lock:
+            data = value if isinstance(value, bytes) else str(value).encode()
+            self._values[key] = (time.monotonic() + ex if ex else None, data)
+        return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            item = self._values.get(key)
+            value = int(item[1]) + 1 if item is not None else 1
+            self._values[key] = (None, str(value).encode())
+        return value
+
+
+def connect_remote(url: str) -> Any:
+    """按CACHE_REDIS_URL创建共享缓存客户端，未配置时返回None"""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return LocalRedis()
+    try:
+        import redis
+    except ImportError as exc:
+        raise RuntimeError("CACHE_REDIS_URL requires the redis package: pip install redis") from exc
+    return redis.Redis.from_url(url)
+
+
+def _pack(entry: Entry) -> bytes:
+    """首行是响应头和各压缩版本的长度，之后依次是原始响应体和各压缩版本"""
+    body, headers, variants = entry
+    lengths = {encoding: len(data) for encoding, data in variants.items()}
+    return json.dumps([headers, lengths]).encode() + b"\n" + body + b"".join(variants.values())
+
+
+def _unpack(raw: bytes) -> Entry:
+    meta, _, data = raw.partition(b"\n")
+    headers, lengths = json.loads(meta)
+    offset = len(data) - sum(lengths.values())
+    body, variants = data[:offset], {}
+    for encoding, length in lengths.items():
+        variants[encoding] = data[offset:offset + length]
+        offset += length
+    return body, headers, variants
+
+
+@dataclass
+class CacheLookup:
+    """一次缓存查询的结果；未命中时保留缓存键，供store写回；encoding是按Accept-Encoding协商的压缩编码"""
+    key: Optional[str]
+    entry: Optional[Entry] = None
+    encoding: Optional[str] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.entry is not None
+
+    def response(self, request: Request) -> Response:
+        """用缓存项构造响应；缓存中带有ETag/Last-Modified，条件请求满足时直接返回304"""
+        body, headers, variants = self.entry
+        if is_not_modified(request, headers):
+            return not_modified_response(headers)
+        content, encoding_headers = encoded_body(body, variants, self.encoding)
+        return Response(content=content, media_type=JSON_MEDIA_TYPE, headers={**headers, **encoding_headers, CACHE_HEADER: "HIT"})
+
+
+class ResponseCache:
+    """按实体划分命名空间的响应缓存"""
+
+    def __init__(self, local: Optional[LRUCache] = None, remote: Any = None, enabled: bool = CACHE_ENABLED):
+        self.local = local if local is not None else LRUCache()
+        self.remote = remote
+        self.enabled = enabled
+        self._generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "local_hits": 0, "remote_hits": 0, "misses": 0, "invalidations": 0, "remote_errors": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, *names: str) -> None:
+        """计数加一；同步路由在线程池中并发执行，+=不是原子操作"""
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+
+    def _generation(self, namespace: str) -> int:
+        """实体当前的版本号；配置了共享缓存时以共享缓存中的为准，保证各worker一致"""
+        if self.remote is None:
+            return self._generations.get(namespace, 0)
+        try:
+            value = self.remote.get(f"cache:gen:{namespace}")
+        except Exception:
+            self._count("remote_errors")
+            return -1
+        return int(value) if value is not None else 0
+
+    def lookup(self, request: Request, namespace: str, *related: str) -> CacheLookup:
+        """
+        按路径和查询参数查缓存，先查进程内再查共享缓存
+        related为include=涉及的关联实体，它们的写入同样使该缓存失效
+        """
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        if not self.enabled:
+            return CacheLookup(key=None, encoding=encoding)
+        versions = []
+        for name in (namespace, *related):
+            generation = self._generation(name)
+            if generation < 0:
+                return CacheLookup(key=None, encoding=encoding)
+            versions.append(f"{name}.{generation}")
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        key = f"cache:{'+'.join(versions)}:{request.url.path}?{params}"
+        entry = self.local.get(key)
+        if entry is not None:
+            self._count("hits", "local_hits")
+            return CacheLookup(key=key, entry=entry, encoding=encoding)
+        if self.remote is not None:
+            try:
+                raw = self.remote.get(key)
+            except Exception:
+                self._count("remote_errors")
+                raw = None
+            if raw is not None:
+                entry = _unpack(raw)
+                self.local.set(key, entry)
+                self._count("hits", "remote_hits")
+                return CacheLookup(key=key, entry=entry, encoding=encoding)
+        self._count("misses")
+        return CacheLookup(key=key, encoding=encoding)
+
+    def store(self, lookup: CacheLookup, response: Response, body: bytes) -> Response:
+        """
+        把序列化好的响应体写入缓存，返回可直接交给FastAPI的Response
+        路由中已设置的X-开头响应头（游标等）和ETag/Last-Modified一并缓存
+        按本次请求协商的编码压缩一次，压缩结果随缓存项保存
+        """
+        headers = {k: v for k, v in response.headers.items() if k.startswith("x-") or k in VALIDATOR_HEADERS}
+        variants: Dict[str, bytes] = {}
+        content, encoding_headers = encoded_body(body, variants, lookup.encoding)
+        if lookup.key is not None:
+            entry = (body, headers, variants)
+            self.local.set(lookup.key, entry)
+            if self.remote is not None:
+                try:
+                    self.remote.set(lookup.key, _pack(entry), ex=self.local.ttl)
+                except Exception:
+                    self._count("remote_errors")
+        return Response(content=content, media_type=JSON_MEDIA_TYPE, headers={**headers, **encoding_headers, CACHE_HEADER: "MISS"})
+
+    def invalidate(self, namespace: str) -> None:
+        """写操作后调用：递增实体版本号，该实体下所有缓存键随之失效"""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._stats["invalidations"] += 1
+        if self.remote is not None:
+            try:
+                self.remote.incr(f"cache:gen:{namespace}")
+            except Exception:
+                self._count("remote_errors")
+
+    def stats(self) -> Dict[str, Any]:
+        """命中/未命中计数"""
+        with self._lock:
+            counts = dict(self._stats)
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            **counts,
+            "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "enabled": self.enabled,
+            "remote": self.remote is not None,
+        }
+
+
+def cache_enabled(enabled: bool = CACHE_ENABLED, remote_url: str = CACHE_REDIS_URL, workers: int = CACHE_WORKERS) -> bool:
+    """
+    是否启用缓存；多worker且没有共享缓存时，写入只能递增本worker的版本号，
+    其他worker在TTL内仍会返回旧数据，此时不启用
+    """
+    return enabled and (bool(remote_url) or workers <= 1)
+
+
+# 所有路由共用的缓存实例
+response_cache = ResponseCache(remote=connect_remote(CACHE_REDIS_URL), enabled=cache_enabled())
@@ -0,0 +1,136 @@
+"""
+生产环境启动配置：gunicorn管理多个uvicorn worker
+用法：gunicorn -c gunicorn.conf.py main:app
+- worker数默认等于容器可用的CPU核数（CPU亲和性与cgroup配额取较小者），WEB_CONCURRENCY可覆盖
+- 不监听文件变化；uvicorn[standard]自带的uvloop和httptools由worker自动启用
+- preload：master导入一次应用（不连接数据库），执行数据库迁移后再fork，worker启动快且共享只读内存页
+- 每个worker处理MAX_REQUESTS（带随机抖动）个请求后由master替换，限制内存碎片和泄漏的累积
+- 收到SIGTERM后停止接受新连接，等待处理中的请求完成，最多GRACEFUL_TIMEOUT秒
+开发调试请使用 python main.py（单进程，自动重载）
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """cgroup限制的CPU核数（v2: cpu.max，v1: cfs_quota_us），没有限制时返回None"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return int(quota) / int(period) if quota != "max" else None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cores() -> int:
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS等平台没有sched_getaffinity
+        cores = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cores = min(cores, math.ceil(quota))
+    return max(1, cores)
+
+
+def _prepare_metrics_dir() -> Optional[str]:
+    """
+    多worker时每个worker把指标写入PROMETHEUS_MULTIPROC_DIR下的文件，/metrics汇总所有worker；
+    必须在master导入应用（preload）之前设置，启动时清空上次运行留下的文件
+    未指定目录时创建临时目录并返回，退出时删除
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path is None:
+        path = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+        return path
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    return None
+
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# 内存存储和内存汇总在进程内，多个worker的数据互不可见，只能单进程运行
+workers = 1 if os.getenv("STORAGE_BACKEND", "database") == "memory" else int(os.getenv("WEB_CONCURRENCY", available_cores()))
+# worker继承环境变量，database.py按worker数分配连接预算（DB_CONNECTION_BUDGET）
+os.environ["WEB_CONCURRENCY"] = str(workers)
+_metrics_tmpdir = _prepare_metrics_dir() if workers > 1 and os.getenv("METRICS_ENABLED", "true").lower() == "true" else None
+preload_app = True
+reload = False
+
+# 纯内存存储（没有MEMORY_DATA_DIR）的数据只在worker进程内，回收worker会丢失全部数据，不按请求数回收；
+# 设置了MEMORY_DATA_DIR时新worker从日志和快照加载，可以照常回收
+_volatile_memory = os.getenv("STORAGE_BACKEND", "database") == "memory" and not os.getenv("MEMORY_DATA_DIR")
+max_requests = 0 if _volatile_memory else int(os.getenv("MAX_REQUESTS", "10000"))
+# 抖动避免所有worker同时重启
+max_requests_jitter = 0 if _volatile_memory else int(os.getenv("MAX_REQUESTS_JITTER", max_requests // 10))
+
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# worker心跳超时（秒），超时的worker会被master重启
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+accesslog = os.getenv("ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """fork worker之前执行一次数据库迁移；MIGRATE_ON_START=false时跳过（如由部署流水线单独执行）"""
+    if os.getenv("MIGRATE_ON_START", "true").lower() == "true":
+        from migrate import run_migrations
+        run_migrations()
+
+
+def post_fork(server, worker):
+    """
+    应用导入时不创建数据库引擎，master通常不持有连接；若已创建，子进程丢弃继承来的连接池
+    （不关闭父进程的连接），第一次查询时再建立自己的连接，避免多个进程共用同一个socket
+    """
+    from database import reset_after_fork
+    reset_after_fork()
+
+
+def child_exit(server, worker):
+    """worker退出后删除其实时指标（处理中的请求数），计数器和直方图的累计值保留"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if _metrics_tmpdir is not None:
+        shutil.rmtree(_metrics_tmpdir, ignore_errors=True)
+
+
+def when_ready(server):
+    try:
+        import httptools  # noqa: F401
+        import uvloop  # noqa: F401
+        server.log.info("Serving with %d workers (uvloop + httptools)", workers)
+    except ImportError:
+        server.log.warning("uvloop/httptools not installed, falling back to asyncio + h11: pip install 'uvicorn[standard]'")
+    from database import DB_CONNECTION_BUDGET, DB_INSTANCES, pool_limits
+    if DB_CONNECTION_BUDGET > 0:
+        processes = DB_INSTANCES * workers
+        server.log.info(
+            "Database connection budget %d across %d processes: pool_size=%d per worker",
+            DB_CONNECTION_BUDGET, processes, pool_limits()[0],
+        )
+        if DB_CONNECTION_BUDGET < processes:
+            server.log.warning("DB_CONNECTION_BUDGET is smaller than instances x workers; each worker still needs 1 connection")
+    from cache import CACHE_ENABLED, cache_enabled
+    if CACHE_ENABLED and not cache_enabled():
+        server.log.warning("Response cache disabled: %d workers without CACHE_REDIS_URL would serve stale entries", workers)
@@ -6,22 +6,41 @@
 生成时间: 2025-07-23T02:11:49.520Z
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import post_router
-from routers import comment_router
-from routers import category_router
+from fastapi.responses import JSONResponse, ORJSONResponse
+from admission import ADMISSION_ENABLED, AdmissionMiddleware
+from cache import response_cache
+from compression import COMPRESSION_ENABLED, CompressionMiddleware
+from metrics import METRICS_ENABLED, MetricsMiddleware, metrics_endpoint
+from profiling import PROFILE_ENABLED, PROFILE_TOKEN, ProfilingMiddleware
+from repositories.memory import close_durable_storage, open_durable_storage
+from serialization import FAST_JSON
+from routers.crud import crud_router
+from routers.resources import RESOURCES
+from routers import profile_router
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 持久化内存存储（MEMORY_DATA_DIR）在worker中加载数据，关闭时写入剩余日志和快照
+    open_durable_storage()
+    yield
+    close_durable_storage()
 
 app = FastAPI(
     title="个人博客系统",
     description="一个简单的个人博客管理系统",
-    version="1.0.0"
+    version="1.0.0",
+    # FAST_JSON=true 时其余接口也用orjson编码
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse,
+    lifespan=lifespan
 )
 
+# 准入控制：实体和统计接口的并发上限、有界排队和优先级；先于CORS注册（位于其内层），拒绝响应也带CORS头
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, routes=app.router.routes, prefixes=["/posts", "/comments", "/categorys"])
+
 # CORS配置
 app.add_middleware(
     CORSMiddleware,
@@ -29,12 +48,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Unindexed-Filters", "X-Cache", "ETag", "Last-Modified"],
 )
 
-# 包含路由
-app.include_router(post_router.router, prefix="/posts", tags=["文章"])
-app.include_router(comment_router.router, prefix="/comments", tags=["评论"])
-app.include_router(category_router.router, prefix="/categorys", tags=["分类"])
+# 响应压缩：按Accept-Encoding协商br/gzip；缓存命中的响应已经压缩过，原样转发
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# 请求诊断（默认关闭）：采样火焰图和慢SQL记录；设置了PROFILE_TOKEN才注册 /admin/profiles 浏览接口
+if PROFILE_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    if PROFILE_TOKEN:
+        app.include_router(profile_router.router, prefix="/admin/profiles", tags=["诊断"])
+
+# 指标中间件最后注册，位于最外层，计时包含其他中间件
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# 包含路由：所有实体共用同一个CRUD路由引擎，按routers/resources.py中的声明注册
+for resource in RESOURCES:
+    app.include_router(crud_router(resource), prefix=f"/{resource.plural}", tags=[resource.tag])
 
 @app.get("/")
 def read_root():
@@ -49,6 +83,14 @@ def read_root():
         ]
     }
 
+@app.get("/cache/stats")
+def cache_stats():
+    """响应缓存的命中/未命中计数"""
+    return response_cache.stats()
+
+# 开发调试：先执行数据库迁移，再以单进程启动，代码变化时自动重载；生产环境使用 gunicorn -c gunicorn.conf.py main:app
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    from migrate import run_migrations
+    run_migrations()
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,3 +1,6 @@
-from .post import Post, PostCreate, PostUpdate
-from .comment import Comment, CommentCreate, CommentUpdate
-from .category import Category, CategoryCreate, CategoryUpdate
\ No newline at end of file
+from .post import Post, PostCreate, PostUpdate, PostBulkUpdate
+from .comment import Comment, CommentCreate, CommentUpdate, CommentBulkUpdate
+from .category import Category, CategoryCreate, CategoryUpdate, CategoryBulkUpdate
+from .bulk import BulkDeleteRequest, BulkItemResult, MAX_BULK_ITEMS
+from .relations import PostWithRelations, CommentWithRelations
+from .search import PostSearchHit, CommentSearchHit, CategorySearchHit
\ No newline at end of file
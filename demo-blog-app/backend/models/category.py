@@ -2,15 +2,14 @@
 Category模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional
 from datetime import datetime
-import uuid
 
 class CategoryBase(BaseModel):
     """Category基础模型"""
     name: str = Field(..., description="名称")
-    description: Optional[str] = None = Field(..., description="描述")
+    description: Optional[str] = Field(None, description="描述")
 
 class CategoryCreate(CategoryBase):
     """创建Category时使用的模型"""
@@ -18,8 +17,20 @@ class CategoryCreate(CategoryBase):
 
 class CategoryUpdate(BaseModel):
     """更新Category时使用的模型"""
-    name: Optional[str] = None = Field(..., description="名称")
-    description: Optional[str] = None = Field(..., description="描述")
+    name: Optional[str] = Field(None, description="名称")
+    description: Optional[str] = Field(None, description="描述")
+
+    @field_validator("name")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        """必填字段可以不提交，但不能提交null（对应的列为NOT NULL）"""
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class CategoryBulkUpdate(CategoryUpdate):
+    """批量更新时的单条修改，需带上id"""
+    id: str = Field(..., description="主键ID")
 
 class Category(CategoryBase):
     """Category完整模型"""
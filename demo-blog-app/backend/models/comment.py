@@ -2,10 +2,9 @@
 Comment模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional
 from datetime import datetime
-import uuid
 
 class CommentBase(BaseModel):
     """Comment基础模型"""
@@ -13,7 +12,7 @@ class CommentBase(BaseModel):
     author: str = Field(..., description="author")
     email: str = Field(..., description="邮箱地址")
     content: str = Field(..., description="content")
-    approved: Optional[bool] = None = Field(..., description="approved")
+    approved: Optional[bool] = Field(None, description="approved")
 
 class CommentCreate(CommentBase):
     """创建Comment时使用的模型"""
@@ -21,11 +20,23 @@ class CommentCreate(CommentBase):
 
 class CommentUpdate(BaseModel):
     """更新Comment时使用的模型"""
-    post_id: Optional[str] = None = Field(..., description="post_id")
-    author: Optional[str] = None = Field(..., description="author")
-    email: Optional[str] = None = Field(..., description="邮箱地址")
-    content: Optional[str] = None = Field(..., description="content")
-    approved: Optional[bool] = None = Field(..., description="approved")
+    post_id: Optional[str] = Field(None, description="post_id")
+    author: Optional[str] = Field(None, description="author")
+    email: Optional[str] = Field(None, description="邮箱地址")
+    content: Optional[str] = Field(None, description="content")
+    approved: Optional[bool] = Field(None, description="approved")
+
+    @field_validator("post_id", "author", "email", "content")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        """必填字段可以不提交，但不能提交null（对应的列为NOT NULL）"""
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class CommentBulkUpdate(CommentUpdate):
+    """批量更新时的单条修改，需带上id"""
+    id: str = Field(..., description="主键ID")
 
 class Comment(CommentBase):
     """Comment完整模型"""
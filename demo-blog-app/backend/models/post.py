@@ -2,18 +2,17 @@
 Post模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional
 from datetime import datetime
-import uuid
 
 class PostBase(BaseModel):
     """Post基础模型"""
     title: str = Field(..., description="标题")
     content: str = Field(..., description="content")
     author: str = Field(..., description="author")
-    published: Optional[bool] = None = Field(..., description="published")
-    publish_date: Optional[datetime] = None = Field(..., description="publish_date")
+    published: Optional[bool] = Field(None, description="published")
+    publish_date: Optional[datetime] = Field(None, description="publish_date")
 
 class PostCreate(PostBase):
     """创建Post时使用的模型"""
@@ -21,11 +20,23 @@ class PostCreate(PostBase):
 
 class PostUpdate(BaseModel):
     """更新Post时使用的模型"""
-    title: Optional[str] = None = Field(..., description="标题")
-    content: Optional[str] = None = Field(..., description="content")
-    author: Optional[str] = None = Field(..., description="author")
-    published: Optional[bool] = None = Field(..., description="published")
-    publish_date: Optional[datetime] = None = Field(..., description="publish_date")
+    title: Optional[str] = Field(None, description="标题")
+    content: Optional[str] = Field(None, description="content")
+    author: Optional[str] = Field(None, description="author")
+    published: Optional[bool] = Field(None, description="published")
+    publish_date: Optional[datetime] = Field(None, description="publish_date")
+
+    @field_validator("title", "content", "author")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        """必填字段可以不提交，但不能提交null（对应的列为NOT NULL）"""
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class PostBulkUpdate(PostUpdate):
+    """批量更新时的单条修改，需带上id"""
+    id: str = Field(..., description="主键ID")
 
 class Post(PostBase):
     """Post完整模型"""
@@ -0,0 +1,16 @@
+"""
+带关联数据的响应模型（include=）
+"""
+
+from typing import List, Optional
+from pydantic import Field
+from .post import Post
+from .comment import Comment
+
+class PostWithRelations(Post):
+    """Post及其关联数据"""
+    comments: Optional[List[Comment]] = Field(None, description="include=comments 时返回")
+
+class CommentWithRelations(Comment):
+    """Comment及其关联数据"""
+    post: Optional[Post] = Field(None, description="include=post 时返回")
@@ -0,0 +1,27 @@
+"""
+全文检索结果模型（/search）
+"""
+
+from typing import Dict
+from pydantic import BaseModel, Field
+from .post import Post
+from .comment import Comment
+from .category import Category
+
+class PostSearchHit(BaseModel):
+    """Post检索结果"""
+    item: Post
+    rank: float = Field(..., description="相关度，0~1，越大越相关")
+    highlight: Dict[str, str] = Field(..., description="title、content的高亮片段（已HTML转义），命中词以<mark>包裹")
+
+class CommentSearchHit(BaseModel):
+    """Comment检索结果"""
+    item: Comment
+    rank: float = Field(..., description="相关度，0~1，越大越相关")
+    highlight: Dict[str, str] = Field(..., description="content的高亮片段（已HTML转义），命中词以<mark>包裹")
+
+class CategorySearchHit(BaseModel):
+    """Category检索结果"""
+    item: Category
+    rank: float = Field(..., description="相关度，0~1，越大越相关")
+    highlight: Dict[str, str] = Field(..., description="name、description的高亮片段（已HTML转义），命中词以<mark>包裹")
@@ -0,0 +1,49 @@
+"""
+键集（游标）分页
+游标是 (排序方式, 排序列的值, id) 的base64编码，对客户端不透明；
+列表接口按 (排序列, id) 排序，配合排序列上的索引做范围查找，深分页也不需要OFFSET扫描
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Sequence, Tuple
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# 列表接口单页条数上限，超出返回422
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# 上一页最后一行的排序键：(排序列的值, id)
+Cursor = Tuple[Any, str]
+
+
+def _field(item: Any, name: str) -> Any:
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def encode_cursor(sort: str, value: Any, item_id: str) -> str:
+    """把排序方式和排序键编码为URL安全的游标"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any, str]:
+    """解析游标，返回 (排序方式, 排序列的值, id)；格式错误返回400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, value, item_id = json.loads(raw)
+        return str(sort), value, str(item_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int, sort: str = "created_at") -> None:
+    """本页已满时在响应头中返回下一页游标；没有该响应头表示已到最后一页"""
+    if limit > 0 and len(items) == limit:
+        last = items[-1]
+        value = _field(last, sort.lstrip("-"))
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, value, _field(last, "id"))
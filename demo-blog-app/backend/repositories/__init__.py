@@ -0,0 +1,4 @@
+from .sql import SqlRepository
+from .post_repository import get_post_repository
+from .comment_repository import get_comment_repository
+from .category_repository import get_category_repository
\ No newline at end of file
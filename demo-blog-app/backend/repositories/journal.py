@@ -0,0 +1,244 @@
+"""
+内存存储的持久化（STORAGE_BACKEND=memory 且设置了 MEMORY_DATA_DIR 时启用）
+每个实体一个只追加的写日志和一个压缩快照：
+- 写入：在存储锁内按发生顺序登记 put(记录) / del(id)，后台线程每 MEMORY_FSYNC_MS 毫秒批量写入并fsync一次，
+  多个请求共用一次fsync；进程崩溃最多丢失最后一个间隔内的写入。MEMORY_FSYNC_MS=0 时每次写入立即fsync
+- 快照：日志超过 MEMORY_SNAPSHOT_LOG_MB 或距上次快照超过 MEMORY_SNAPSHOT_INTERVAL 秒时，切换到新一代日志，
+  把当前全部记录写成快照（先写临时文件再原子替换），然后删除快照已覆盖的旧日志；正常关闭时也写一次快照
+- 启动：以mmap读取快照和之后各代日志并重放，未写完的日志尾部（长度或校验和不符）被丢弃
+日志和快照是带长度和CRC32的pickle帧，只应读取本应用写入的数据目录
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from time import monotonic
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from database import STORAGE_BACKEND
+
+logger = logging.getLogger("journal")
+
+MEMORY_DATA_DIR = os.getenv("MEMORY_DATA_DIR", "")
+MEMORY_FSYNC_MS = int(os.getenv("MEMORY_FSYNC_MS", "10"))
+MEMORY_SNAPSHOT_INTERVAL = float(os.getenv("MEMORY_SNAPSHOT_INTERVAL", "300"))
+MEMORY_SNAPSHOT_LOG_MB = float(os.getenv("MEMORY_SNAPSHOT_LOG_MB", "64"))
+
+# 帧头：(负载长度, 负载的CRC32)
+_HEADER = struct.Struct("<II")
+# 没有批量写入间隔时，后台线程只检查是否需要快照
+_IDLE_SECONDS = 1.0
+
+# 日志条目：("put", 记录) 或 ("del", id)
+Entry = Tuple[str, Any]
+
+
+def _frame(value: Any) -> bytes:
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_frames(path: str) -> Iterator[Any]:
+    """以mmap逐帧读取，不把整个文件复制到内存；遇到不完整或校验失败的帧即停止"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                length, checksum = _HEADER.unpack_from(mm, offset)
+                start, end = offset + _HEADER.size, offset + _HEADER.size + length
+                if end > size:
+                    break
+                with memoryview(mm)[start:end] as payload:
+                    if zlib.crc32(payload) != checksum:
+                        break
+                    value = pickle.loads(payload)
+                yield value
+                offset = end
+            if offset < size:
+                logger.warning("%s: discarded %d bytes of incomplete trailing data", path, size - offset)
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """一个实体的写日志和快照；append在存储锁内调用，保证日志顺序与内存中的修改顺序一致"""
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot")
+        self.generation = 0
+        self._file: Optional[Any] = None
+        self._pending: List[Entry] = []
+        self._lock = threading.Lock()
+        self._log_bytes = 0
+        self._last_snapshot = monotonic()
+        self._scan: Callable[[], List[dict]] = list
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{self.name}.{generation:08d}.log")
+
+    def _generations(self) -> List[int]:
+        prefix, suffix = f"{self.name}.", ".log"
+        found = []
+        for filename in os.listdir(self.directory):
+            middle = filename[len(prefix):-len(suffix)]
+            if filename.startswith(prefix) and filename.endswith(suffix) and middle.isdigit():
+                found.append(int(middle))
+        return sorted(found)
+
+    def load(self) -> List[dict]:
+        """读取快照，按代重放快照之后的日志，返回按插入顺序排列的全部记录"""
+        rows: Dict[str, dict] = {}
+        covered = 0
+        if os.path.exists(self.snapshot_path):
+            for covered, records in read_frames(self.snapshot_path):
+                rows = {record["id"]: record for record in records}
+        generations = self._generations()
+        for generation in generations:
+            if generation < covered:
+                continue
+            # 尚未并入快照的日志计入日志大小，之后按同样的条件写快照并删除
+            self._log_bytes += os.path.getsize(self._log_path(generation))
+            for op, value in read_frames(self._log_path(generation)):
+                if op == "put":
+                    rows[value["id"]] = value
+                else:
+                    rows.pop(value, None)
+        self.generation = max([covered, *generations]) + 1
+        return list(rows.values())
+
+    def start(self, scan: Callable[[], List[dict]]) -> None:
+        """打开新一代日志并启动后台写入线程；scan返回当前全部记录（用于快照）"""
+        self._scan = scan
+        self._file = open(self._log_path(self.generation), "ab")
+        _fsync_dir(self.directory)
+        self._thread = threading.Thread(target=self._run, name=f"journal-{self.name}", daemon=True)
+        self._thread.start()
+
+    def append(self, op: str, value: Any) -> None:
+        with self._lock:
+            self._pending.append((op, value))
+            if MEMORY_FSYNC_MS <= 0:
+                self._write_pending()
+
+    def _write_pending(self) -> None:
+        """调用方持有self._lock"""
+        if not self._pending or self._file is None:
+            return
+        data = b"".join(_frame(entry) for entry in self._pending)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending.clear()
+        self._log_bytes += len(data)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_pending()
+
+    def _due(self) -> bool:
+        if self._log_bytes == 0:
+            return False
+        return (
+            self._log_bytes >= MEMORY_SNAPSHOT_LOG_MB * 1024 * 1024
+            or monotonic() - self._last_snapshot >= MEMORY_SNAPSHOT_INTERVAL
+        )
+
+    def snapshot(self) -> None:
+        """
+        切换到新一代日志后再读取全部记录：切换之后、读取之前的写入既在快照中也在新日志中，
+        重放put/del是幂等的，不会丢失也不会重复
+        """
+        with self._lock:
+            self._write_pending()
+            self._file.close()
+            self.generation += 1
+            covered = self.generation
+            self._file = open(self._log_path(covered), "ab")
+            self._log_bytes = 0
+        records = self._scan()
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(_frame((covered, records)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_path)
+        _fsync_dir(self.directory)
+        for generation in self._generations():
+            if generation < covered:
+                os.remove(self._log_path(generation))
+        self._last_snapshot = monotonic()
+        logger.info("%s: snapshot of %d records", self.name, len(records))
+
+    def _run(self) -> None:
+        interval = MEMORY_FSYNC_MS / 1000 if MEMORY_FSYNC_MS > 0 else _IDLE_SECONDS
+        while not self._stopped.wait(interval):
+            try:
+                self.flush()
+                if self._due():
+                    self.snapshot()
+            except OSError:
+                # 未写入的条目保留在队列中，下一轮重试
+                logger.exception("%s: failed to write journal", self.name)
+
+    def close(self) -> None:
+        """停止后台线程，写入剩余条目；有未并入快照的日志时写一次快照，下次启动只需读取快照"""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        if self._log_bytes:
+            self.snapshot()
+        # 快照之后的新一代日志是空的，删除以免每次重启留下空文件
+        self._file.close()
+        self._file = None
+        os.remove(self._log_path(self.generation))
+
+
+def open_journal(name: str) -> Optional[Journal]:
+    """内存模式且设置了MEMORY_DATA_DIR时返回该实体的日志，否则返回None（纯内存，重启后数据丢失）"""
+    if STORAGE_BACKEND != "memory" or not MEMORY_DATA_DIR:
+        return None
+    return Journal(MEMORY_DATA_DIR, name)
+
+
+_data_dir_lock: Optional[Any] = None
+
+
+def lock_data_dir() -> None:
+    """
+    独占数据目录：同一时间只有一个进程写日志；
+    gunicorn替换worker时新worker在这里等待旧worker写完快照退出
+    """
+    global _data_dir_lock
+    if _data_dir_lock is not None:
+        return
+    os.makedirs(MEMORY_DATA_DIR, exist_ok=True)
+    _data_dir_lock = open(os.path.join(MEMORY_DATA_DIR, "LOCK"), "w")
+    fcntl.flock(_data_dir_lock, fcntl.LOCK_EX)
+
+
+def unlock_data_dir() -> None:
+    global _data_dir_lock
+    if _data_dir_lock is not None:
+        fcntl.flock(_data_dir_lock, fcntl.LOCK_UN)
+        _data_dir_lock.close()
+        _data_dir_lock = None
@@ -0,0 +1,30 @@
+"""
+Post 数据仓储
+把post表绑定到通用仓储：数据库模式用SqlRepository，内存模式用MemoryRepository
+"""
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from database import STORAGE_BACKEND, get_db
+from filters import query_fields
+from repositories.journal import open_journal
+from repositories.memory import MemoryRepository
+from repositories.sql import SqlRepository
+from search import SearchIndex
+from tables.post import PostTable, SEARCH_COLUMNS
+
+# 列表接口可过滤/排序的列，从表定义和索引推导
+QUERY_FIELDS = query_fields(PostTable)
+
+# 内存模式下本进程内所有请求共享同一个存储
+memory_repository = MemoryRepository(PostTable, search_index=SearchIndex(SEARCH_COLUMNS), journal=open_journal("post"))
+
+# 依赖本身不做IO，声明为async以免每个请求都进入线程池
+async def _database_repository(db: Session = Depends(get_db)) -> SqlRepository:
+    return SqlRepository(PostTable, db, search_columns=SEARCH_COLUMNS)
+
+async def _memory_repository() -> MemoryRepository:
+    return memory_repository
+
+# 路由依赖：启动时按STORAGE_BACKEND选定存储实现
+get_post_repository = _memory_repository if STORAGE_BACKEND == "memory" else _database_repository
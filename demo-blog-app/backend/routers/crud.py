@@ -0,0 +1,256 @@
+"""
+通用CRUD路由引擎
+每个实体由一条Resource声明（模型、仓储依赖、可查询的列、关联、检索），crud_router据此生成该实体的全部接口：
+列表（过滤/排序/键集分页/include/304/缓存）、检索、流式导出、单条读取、创建、批量写入、更新（If-Match）和删除
+缓存、条件请求、关联批量加载等都只在这里实现一次；新增实体只增加一条Resource声明（routers/resources.py）
+路由在应用导入时按声明生成一次，实体相关的值（关联表、序列化器、错误信息、导出列）都在生成时算好，
+请求路径上只剩处理函数本身
+"""
+
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from cache import response_cache
+from conditional import VersionConflict, expected_versions, item_etag, last_modified, list_etag, validate
+from export import EXPORT_FORMATS, export_response
+from filters import QueryField, finish_list_response, parse_list_query
+from includes import Relation, included_rows, load_includes, parse_include
+from models.bulk import BulkDeleteRequest, BulkItemResult, MAX_BULK_ITEMS
+from pagination import MAX_PAGE_SIZE
+from profiling import ProfiledRoute
+from search import parse_search_cursor, set_search_cursor
+from serialization import ResponseSerializer
+
+
+@dataclass(frozen=True)
+class Resource:
+    """一个实体的接口声明"""
+    name: str                                       # 实体名：缓存命名空间，路径为 /<name>s
+    title: str                                      # 类名，用于接口文档和错误信息
+    tag: str                                        # OpenAPI分组
+    model: Type[BaseModel]
+    create_model: Type[BaseModel]
+    update_model: Type[BaseModel]
+    bulk_update_model: Type[BaseModel]
+    repository: Callable[..., Any]                  # 路由依赖，返回该实体的仓储
+    query_fields: Dict[str, QueryField]             # 列表和导出接口可过滤/排序的列
+    read_model: Optional[Type[BaseModel]] = None    # 带关联字段的读取模型（有关联时）
+    relations: Sequence[Relation] = ()              # 可通过include=一并返回的关联
+    search_hit: Optional[Type[BaseModel]] = None    # 检索结果模型（有全文检索时）
+    search_fields: Sequence[str] = ()
+
+    @property
+    def plural(self) -> str:
+        return f"{self.name}s"
+
+
+def _related_repositories(relations: Sequence[Relation]) -> Callable[..., Any]:
+    """
+    把各关联实体的仓储依赖合成一个依赖，返回 {关联名: 仓储}
+    数据库会话依赖在一个请求内只解析一次，主实体和关联实体共用同一个会话
+    """
+    # 依赖本身不做IO，声明为async以免每个请求都进入线程池
+    async def dependency(**repositories: Any) -> Dict[str, Any]:
+        return repositories
+
+    dependency.__signature__ = inspect.Signature([
+        inspect.Parameter(relation.name, inspect.Parameter.KEYWORD_ONLY, default=Depends(relation.repository))
+        for relation in relations
+    ])
+    return dependency
+
+
+def crud_router(resource: Resource) -> APIRouter:
+    """按Resource生成该实体的全部路由"""
+    router = APIRouter(route_class=ProfiledRoute)
+    title, namespace, plural = resource.title, resource.name, resource.plural
+    model, create_model, update_model = resource.model, resource.create_model, resource.update_model
+    bulk_update_model, read_model = resource.bulk_update_model, resource.read_model or resource.model
+    get_repository, query_fields = resource.repository, resource.query_fields
+    relations = {relation.name: relation for relation in resource.relations}
+    related_repositories = _related_repositories(resource.relations)
+    serializer = ResponseSerializer(
+        model,
+        expanded=resource.read_model,
+        relations={relation.name: ResponseSerializer(relation.model) for relation in resource.relations},
+    )
+    export_columns = list(query_fields)
+    not_found = f"{title} not found"
+    deleted_message = {"message": f"{title} deleted successfully"}
+
+    def route(path: str, endpoint: Callable[..., Any], method: str, name: str, description: str, **options: Any) -> None:
+        # 路由名与按实体生成处理函数时相同，OpenAPI的operationId和摘要保持不变
+        router.add_api_route(path, endpoint, methods=[method], name=name, description=description, **options)
+
+    def list_items(
+        request: Request,
+        response: Response,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        include: Optional[str] = None,
+        repo=Depends(get_repository),
+        related=Depends(related_repositories),
+    ):
+        selected = parse_include(include, relations)
+        cached = response_cache.lookup(request, namespace, *(relation.namespace for relation in selected))
+        if cached.hit:
+            return cached.response(request)
+        query = parse_list_query(request.query_params, query_fields)
+        items = repo.list(query, skip=skip, limit=limit)
+        included = load_includes(items, selected, related)
+        finish_list_response(response, query, items, limit)
+        rows = [*items, *included_rows(included)]
+        not_modified = validate(request, response, list_etag(rows), last_modified(rows))
+        if not_modified is not None:
+            return not_modified
+        return response_cache.store(cached, response, serializer.many(items, included))
+
+    route("/", list_items, "GET", f"get_{plural}", f"""获取{title}列表
+过滤：字段=值，或 字段__gte=值 等范围条件（ne/gt/gte/lt/lte/in），只允许有索引的列
+排序：sort=字段 或 sort=-字段（降序），只允许有索引的列
+关联：include=关联名（逗号分隔），整页的关联记录用一条 IN 查询加载
+下一页游标见X-Next-Cursor响应头，传入cursor时忽略skip
+支持If-None-Match / If-Modified-Since，列表未变化时返回304""", response_model=List[read_model])
+
+    # 检索和导出接口需声明在 /{item_id} 之前，避免 search、export 被当作ID匹配
+    if resource.search_hit is not None:
+        # 检索结果嵌套ORM行，经响应模型校验后输出
+        search_serializer = ResponseSerializer(resource.search_hit, fast=False)
+
+        def search_items(
+            request: Request,
+            response: Response,
+            q: str = Query(..., min_length=1, max_length=200, description="关键词：空格分隔的词都要命中，or 表示任一，-词 表示排除"),
+            limit: int = Query(20, ge=1, le=100),
+            cursor: Optional[str] = None,
+            repo=Depends(get_repository),
+        ):
+            cached = response_cache.lookup(request, namespace)
+            if cached.hit:
+                return cached.response(request)
+            hits = repo.search(q, after=parse_search_cursor(cursor, q), limit=limit)
+            set_search_cursor(response, q, hits, limit)
+            items = [hit["item"] for hit in hits]
+            not_modified = validate(request, response, list_etag(items), last_modified(items))
+            if not_modified is not None:
+                return not_modified
+            return response_cache.store(cached, response, search_serializer.many(hits))
+
+        route("/search", search_items, "GET", f"search_{plural}", f"""全文检索{title}（{'、'.join(resource.search_fields)}），按相关度降序，highlight为命中词附近的片段
+下一页游标见X-Next-Cursor响应头；支持If-None-Match，结果未变化时返回304""", response_model=List[resource.search_hit])
+
+    def export_items(
+        request: Request,
+        export_format: str = Query("ndjson", alias="format", pattern="^(" + "|".join(EXPORT_FORMATS) + ")$"),
+        sort: Optional[str] = None,
+        repo=Depends(get_repository),
+    ):
+        query = parse_list_query(request.query_params, query_fields)
+        return export_response(repo.stream(query), export_format, serializer.one, export_columns, plural)
+
+    route("/export", export_items, "GET", f"export_{plural}", f"""流式导出{title}，format=ndjson|csv
+过滤和排序参数与列表接口相同；服务端游标分批读取，不把整表读入内存""", response_class=StreamingResponse)
+
+    def get_item(
+        item_id: str,
+        request: Request,
+        response: Response,
+        include: Optional[str] = None,
+        repo=Depends(get_repository),
+        related=Depends(related_repositories),
+    ):
+        selected = parse_include(include, relations)
+        cached = response_cache.lookup(request, namespace, *(relation.namespace for relation in selected))
+        if cached.hit:
+            return cached.response(request)
+        item = repo.get(item_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail=not_found)
+        included = load_includes([item], selected, related)
+        rows = [item, *included_rows(included)]
+        etag = list_etag(rows) if included else item_etag(item)
+        not_modified = validate(request, response, etag, last_modified(rows))
+        if not_modified is not None:
+            return not_modified
+        return response_cache.store(cached, response, serializer.one(item, included[0] if included else None))
+
+    route("/{item_id}", get_item, "GET", f"get_{namespace}", f"""根据ID获取{title}；include=关联名 时一并返回关联记录
+支持If-None-Match / If-Modified-Since，未修改时返回304
+带include时ETag同时覆盖关联记录，If-Match请使用不带include时的ETag""", response_model=read_model)
+
+    def create_item(item: create_model, repo=Depends(get_repository)):
+        created = repo.create(item.dict())
+        response_cache.invalidate(namespace)
+        return created
+
+    route("/", create_item, "POST", f"create_{namespace}", f"创建新的{title}", response_model=model)
+
+    # 批量接口需声明在 /{item_id} 之前，避免 DELETE /bulk 被当作ID匹配
+    def create_items(
+        items: List[create_model] = Body(..., max_length=MAX_BULK_ITEMS),
+        repo=Depends(get_repository),
+    ):
+        created = repo.create_many([item.dict() for item in items])
+        response_cache.invalidate(namespace)
+        return created
+
+    route("/bulk", create_items, "POST", f"create_{plural}_bulk", f"批量创建{title}，按提交顺序返回创建结果", response_model=List[model])
+
+    def update_items(
+        items: List[bulk_update_model] = Body(..., max_length=MAX_BULK_ITEMS),
+        repo=Depends(get_repository),
+    ):
+        changes = [item.dict(exclude_unset=True) for item in items]
+        updated = repo.update_many(changes)
+        response_cache.invalidate(namespace)
+        return [
+            BulkItemResult(id=change["id"], status="updated" if change["id"] in updated else "not_found")
+            for change in changes
+        ]
+
+    route("/bulk", update_items, "PATCH", f"update_{plural}_bulk", f"批量更新{title}，每条只修改提交的字段", response_model=List[BulkItemResult])
+
+    def delete_items(request: BulkDeleteRequest, repo=Depends(get_repository)):
+        deleted = repo.delete_many(request.ids)
+        response_cache.invalidate(namespace)
+        return [
+            BulkItemResult(id=item_id, status="deleted" if item_id in deleted else "not_found")
+            for item_id in request.ids
+        ]
+
+    route("/bulk", delete_items, "DELETE", f"delete_{plural}_bulk", f"批量删除{title}", response_model=List[BulkItemResult])
+
+    def update_item(
+        item_id: str,
+        item: update_model,
+        request: Request,
+        response: Response,
+        repo=Depends(get_repository),
+    ):
+        try:
+            updated_item = repo.update(item_id, item.dict(exclude_unset=True), expected_versions(request))
+        except VersionConflict:
+            raise HTTPException(status_code=409, detail="Conflict: resource has been modified")
+        if updated_item is None:
+            raise HTTPException(status_code=404, detail=not_found)
+        response_cache.invalidate(namespace)
+        response.headers["ETag"] = item_etag(updated_item)
+        return updated_item
+
+    route("/{item_id}", update_item, "PUT", f"update_{namespace}", f"""更新{title}：一条 UPDATE ... RETURNING 只写提交的字段，不先读取整行
+带If-Match时ETag中的版本作为同一条语句的条件，记录已被其他请求修改则返回409""", response_model=model)
+
+    def delete_item(item_id: str, repo=Depends(get_repository)):
+        if not repo.delete(item_id):
+            raise HTTPException(status_code=404, detail=not_found)
+        response_cache.invalidate(namespace)
+        return deleted_message
+
+    route("/{item_id}", delete_item, "DELETE", f"delete_{namespace}", f"删除{title}")
+
+    return router
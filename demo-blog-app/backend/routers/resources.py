@@ -0,0 +1,65 @@
+"""
+实体接口声明
+每个实体一条Resource，main.py按声明用通用CRUD引擎（routers/crud.py）注册路由
+关联由外键推导，可通过include=一并返回，每个关联一条批量查询
+"""
+
+from typing import List
+from includes import Relation
+from models.post import Post, PostCreate, PostUpdate, PostBulkUpdate
+from models.comment import Comment, CommentCreate, CommentUpdate, CommentBulkUpdate
+from models.category import Category, CategoryCreate, CategoryUpdate, CategoryBulkUpdate
+from models.relations import PostWithRelations, CommentWithRelations
+from models.search import PostSearchHit, CommentSearchHit, CategorySearchHit
+from repositories import post_repository, comment_repository, category_repository
+from routers.crud import Resource
+
+RESOURCES: List[Resource] = [
+    Resource(
+        name="post",
+        title="Post",
+        tag="文章",
+        model=Post,
+        create_model=PostCreate,
+        update_model=PostUpdate,
+        bulk_update_model=PostBulkUpdate,
+        repository=post_repository.get_post_repository,
+        query_fields=post_repository.QUERY_FIELDS,
+        read_model=PostWithRelations,
+        relations=[
+            Relation(name="comments", namespace="comment", foreign_key="post_id", many=True, model=Comment, repository=comment_repository.get_comment_repository),
+        ],
+        search_hit=PostSearchHit,
+        search_fields=["title", "content"],
+    ),
+    Resource(
+        name="comment",
+        title="Comment",
+        tag="评论",
+        model=Comment,
+        create_model=CommentCreate,
+        update_model=CommentUpdate,
+        bulk_update_model=CommentBulkUpdate,
+        repository=comment_repository.get_comment_repository,
+        query_fields=comment_repository.QUERY_FIELDS,
+        read_model=CommentWithRelations,
+        relations=[
+            Relation(name="post", namespace="post", foreign_key="post_id", many=False, model=Post, repository=post_repository.get_post_repository),
+        ],
+        search_hit=CommentSearchHit,
+        search_fields=["content"],
+    ),
+    Resource(
+        name="category",
+        title="Category",
+        tag="分类",
+        model=Category,
+        create_model=CategoryCreate,
+        update_model=CategoryUpdate,
+        bulk_update_model=CategoryBulkUpdate,
+        repository=category_repository.get_category_repository,
+        query_fields=category_repository.QUERY_FIELDS,
+        search_hit=CategorySearchHit,
+        search_fields=["name", "description"],
+    ),
+]
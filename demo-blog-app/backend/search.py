@@ -0,0 +1,269 @@
+"""
+全文检索（/search）
+PostgreSQL：search_vector是由标题（权重A）和正文（权重B）生成的tsvector存储列，建有GIN索引；
+  websearch_to_tsquery解析查询，ts_rank_cd排序，ts_headline生成高亮片段
+内存模式：SearchIndex倒排索引随写入增量维护，查询只访问命中词的倒排表
+其他数据库（如开发用SQLite）：LIKE筛选候选行，再在应用层分词计算相关度和高亮
+查询语法与websearch_to_tsquery一致：空格分隔的词都要命中，or表示任一，-词表示排除，"短语"中的词都要命中
+（内存模式和LIKE回退不检查短语中词的相邻顺序）
+分词与PostgreSQL的simple配置一致：按非字母数字切分、转小写、不做词干化；连续的中文字符视为一个词
+"""
+
+import heapq
+import html
+import math
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import REAL, and_, cast, func, literal_column, or_, select, tuple_
+from pagination import NEXT_CURSOR_HEADER, Cursor, decode_cursor, encode_cursor
+
+# 与migration.sql中search_vector的生成表达式一致
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR = "search_vector"
+# ts_rank_cd的默认权重
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+HIGHLIGHT_START, HIGHLIGHT_STOP = "<mark>", "</mark>"
+# ts_headline先用私用区字符标出命中词，HTML转义后再换成<mark>标签，记录中的标签不会原样输出
+HEADLINE_START, HEADLINE_STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = f'StartSel="{HEADLINE_START}", StopSel="{HEADLINE_STOP}", MaxWords=35, MinWords=15, MaxFragments=2'
+# 内存模式和LIKE回退的高亮片段长度（字符）
+FRAGMENT_CHARS = 200
+
+_WORD = re.compile(r"[^\W_]+")
+_TOKEN = re.compile(r'-?"[^"]*"?|\S+')
+
+
+def _field(item: Any, name: str) -> Any:
+    return item.get(name) if isinstance(item, dict) else getattr(item, name)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+@dataclass
+class SearchQuery:
+    """解析后的查询：groups中每组至少命中一个词（组内为or），excluded中的词都不能出现"""
+    groups: List[Set[str]] = field(default_factory=list)
+    excluded: Set[str] = field(default_factory=set)
+
+    @property
+    def terms(self) -> Set[str]:
+        return set().union(*self.groups)
+
+
+def parse_query(text: str) -> SearchQuery:
+    """按websearch_to_tsquery的规则解析；没有正向词（如只有-词）时groups为空，不返回任何结果"""
+    query = SearchQuery()
+    pending_or = False
+    for token in _TOKEN.findall(text):
+        if token.lower() == "or" and query.groups:
+            pending_or = True
+            continue
+        words = tokenize(token)
+        if not words:
+            continue
+        if token.startswith("-"):
+            query.excluded.update(words)
+        elif pending_or:
+            query.groups[-1].add(words[0])
+            query.groups.extend({word} for word in words[1:])
+        else:
+            query.groups.extend({word} for word in words)
+        pending_or = False
+    return query
+
+
+def _document(record: Any, columns: Dict[str, str]) -> Tuple[Dict[str, float], int]:
+    """记录的加权词频和总词数"""
+    weights: Dict[str, float] = defaultdict(float)
+    length = 0
+    for name, weight in columns.items():
+        words = tokenize(_field(record, name))
+        length += len(words)
+        for word in words:
+            weights[word] += WEIGHTS[weight]
+    return weights, length
+
+
+def _rank(weights: Dict[str, float], length: int, terms: Set[str]) -> float:
+    """命中词的加权词频按文档长度的对数归一化，再映射到 (0, 1)，与ts_rank_cd(..., 32)的取值范围一致"""
+    raw = sum(weights.get(term, 0.0) for term in terms) / math.log2(2 + length)
+    return raw / (raw + 1)
+
+
+def _matches(words: Dict[str, float], query: SearchQuery) -> bool:
+    return all(any(term in words for term in group) for group in query.groups) and not any(
+        term in words for term in query.excluded
+    )
+
+
+def page_hits(scored: List[Tuple[float, str]], after: Optional[Cursor], limit: int) -> List[Tuple[float, str]]:
+    """按 (相关度, id) 降序取游标之后的limit条，与数据库的 ORDER BY rank DESC, id DESC 一致"""
+    if after is not None:
+        scored = [pair for pair in scored if pair < tuple(after)]
+    return heapq.nlargest(limit, scored)
+
+
+def highlight(text: Optional[str], terms: Set[str]) -> str:
+    """截取第一个命中词附近的片段，各段文本HTML转义，命中词以<mark>包裹"""
+    if not text:
+        return ""
+    found = [match for match in _WORD.finditer(text) if match.group().lower() in terms]
+    start = 0
+    if found and len(text) > FRAGMENT_CHARS:
+        start = max(0, min(found[0].start() - FRAGMENT_CHARS // 4, len(text) - FRAGMENT_CHARS))
+    end = start + FRAGMENT_CHARS
+    parts, position = [], start
+    for match in found:
+        if match.start() >= position and match.end() <= end:
+            parts += [html.escape(text[position:match.start()]), HIGHLIGHT_START, html.escape(match.group()), HIGHLIGHT_STOP]
+            position = match.end()
+    parts.append(html.escape(text[position:end]))
+    return ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def make_hit(record: Any, rank: float, columns: Dict[str, str], terms: Set[str]) -> dict:
+    return {
+        "item": record,
+        "rank": rank,
+        "highlight": {name: highlight(_field(record, name), terms) for name in columns},
+    }
+
+
+class SearchIndex:
+    """内存模式的倒排索引：词 -> {记录id: 加权词频}，作为内存仓储的写入回调增量维护"""
+
+    def __init__(self, columns: Dict[str, str]):
+        self.columns = columns
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._documents: Dict[str, Tuple[Tuple[str, ...], int]] = {}   # id -> (词, 总词数)
+        self._lock = threading.Lock()
+
+    def record(self, removed: Iterable[dict], added: Iterable[dict]) -> None:
+        with self._lock:
+            for record in removed:
+                self._remove(record["id"])
+            for record in added:
+                self._remove(record["id"])
+                weights, length = _document(record, self.columns)
+                for word, weight in weights.items():
+                    self._postings[word][record["id"]] = weight
+                self._documents[record["id"]] = (tuple(weights), length)
+
+    def _remove(self, item_id: str) -> None:
+        """调用方需持有锁"""
+        words, _ = self._documents.pop(item_id, ((), 0))
+        for word in words:
+            posting = self._postings[word]
+            posting.pop(item_id, None)
+            if not posting:
+                del self._postings[word]
+
+    def match(self, query: SearchQuery) -> List[Tuple[float, str]]:
+        """命中记录的 (相关度, id)：每组的倒排表取并集，各组从小到大求交集，再去掉排除词"""
+        if not query.groups:
+            return []
+        terms = query.terms
+        with self._lock:
+            groups = [
+                set().union(*(self._postings[term].keys() for term in group if term in self._postings))
+                for group in query.groups
+            ]
+            groups.sort(key=len)
+            candidates = groups[0].intersection(*groups[1:])
+            for term in query.excluded:
+                candidates.difference_update(self._postings.get(term, {}))
+            return [
+                (_rank({term: self._postings[term].get(item_id, 0.0) for term in terms if term in self._postings},
+                       self._documents[item_id][1], terms), item_id)
+                for item_id in candidates
+            ]
+
+
+def postgres_search(table: Any, columns: Dict[str, str], text: str, after: Optional[Cursor], limit: int) -> Any:
+    """
+    PostgreSQL检索语句：search_vector @@ 查询 走GIN索引，按 (rank, id) 键集分页
+    ts_headline只对LIMIT后的行计算
+    """
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    vector = literal_column(SEARCH_VECTOR)
+    tsquery = func.websearch_to_tsquery(config, text)
+    rank = func.ts_rank_cd(vector, tsquery, 32)
+    ranked = rank.label("rank")
+    headlines = [
+        func.ts_headline(config, getattr(table, name), tsquery, HEADLINE_OPTIONS).label(f"headline_{name}")
+        for name in columns
+    ]
+    stmt = select(table, ranked, *headlines).where(vector.op("@@")(tsquery))
+    if after is not None:
+        # ts_rank_cd返回real，游标中的相关度按real比较，避免精度差异导致边界行重复或遗漏
+        after_rank, after_id = after
+        stmt = stmt.where(tuple_(rank, table.id) < tuple_(cast(after_rank, REAL), after_id))
+    return stmt.order_by(ranked.desc(), table.id.desc()).limit(limit)
+
+
+def _headline(text: Optional[str]) -> str:
+    """ts_headline的结果HTML转义后，把命中词两侧的标记字符换成<mark>标签"""
+    if not text:
+        return ""
+    return html.escape(text).replace(HEADLINE_START, HIGHLIGHT_START).replace(HEADLINE_STOP, HIGHLIGHT_STOP)
+
+
+def postgres_hits(result: Any, columns: Dict[str, str]) -> List[dict]:
+    return [
+        {
+            "item": row[0],
+            "rank": row.rank,
+            "highlight": {name: _headline(getattr(row, f"headline_{name}")) for name in columns},
+        }
+        for row in result
+    ]
+
+
+def like_search(table: Any, columns: Dict[str, str], query: SearchQuery) -> Any:
+    """非PostgreSQL数据库的候选行：每组至少一个词作为子串出现在某个检索列中"""
+    conditions = [
+        or_(*(getattr(table, name).icontains(term, autoescape=True) for name in columns for term in group))
+        for group in query.groups
+    ]
+    return select(table).where(and_(*conditions))
+
+
+def rank_rows(rows: Iterable[Any], columns: Dict[str, str], query: SearchQuery, after: Optional[Cursor], limit: int) -> List[dict]:
+    """在应用层按分词结果精确过滤候选行，计算相关度并分页"""
+    terms = query.terms
+    scored, by_id = [], {}
+    for row in rows:
+        weights, length = _document(row, columns)
+        if _matches(weights, query):
+            item_id = _field(row, "id")
+            scored.append((_rank(weights, length, terms), item_id))
+            by_id[item_id] = row
+    return [make_hit(by_id[item_id], rank, columns, terms) for rank, item_id in page_hits(scored, after, limit)]
+
+
+def _search_token(text: str) -> str:
+    """游标中的排序标识，同时绑定查询词：换了查询词的游标无效"""
+    return f"search:{text}"
+
+
+def parse_search_cursor(cursor: Optional[str], text: str) -> Optional[Cursor]:
+    """解析检索游标为 (rank, id)，游标与查询词不一致时返回400"""
+    if not cursor:
+        return None
+    token, rank, item_id = decode_cursor(cursor)
+    if token != _search_token(text) or not isinstance(rank, (int, float)):
+        raise HTTPException(status_code=400, detail="Cursor does not match this search")
+    return float(rank), item_id
+
+
+def set_search_cursor(response: Response, text: str, hits: List[dict], limit: int) -> None:
+    """本页取满时写入下一页游标"""
+    if hits and len(hits) == limit:
+        last = hits[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(_search_token(text), last["rank"], _field(last["item"], "id"))
@@ -0,0 +1,95 @@
+"""
+响应序列化
+默认：经pydantic响应模型校验一次后由pydantic-core直接输出JSON字节（不再经过FastAPI的二次校验和标准库编码）
+FAST_JSON=true：仓储返回的ORM行/内存记录本身就是可信数据，跳过模型校验，按模型字段取值后用orjson编码
+"""
+
+import os
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Type
+from pydantic import BaseModel, TypeAdapter
+from metrics import serialization_timer
+
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+try:
+    import orjson
+except ImportError:  # orjson是可选依赖，只有FAST_JSON=true时才需要
+    orjson = None
+
+if FAST_JSON and orjson is None:
+    raise RuntimeError("FAST_JSON=true requires the orjson package: pip install orjson")
+
+# 与pydantic的JSON输出保持一致：UTC时间以Z结尾
+ORJSON_OPTIONS = orjson.OPT_UTC_Z if orjson is not None else 0
+
+
+def _field(item: Any, name: str) -> Any:
+    return item.get(name) if hasattr(item, "get") else getattr(item, name)
+
+
+class ResponseSerializer:
+    """
+    把仓储返回的数据编码为响应模型对应的JSON字节
+    expanded/relations用于include=：按关联名附带关联记录，只输出请求了的关联字段
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        fast: bool = FAST_JSON,
+        expanded: Optional[Type[BaseModel]] = None,
+        relations: Optional[Dict[str, "ResponseSerializer"]] = None,
+    ):
+        self.fields = list(model.model_fields)
+        self.fast = fast
+        self.relations = relations or {}
+        self._one = TypeAdapter(model)
+        self._many = TypeAdapter(list[model])
+        self._expanded_one = TypeAdapter(expanded or model)
+        self._expanded_many = TypeAdapter(list[expanded or model])
+        self._timer = serialization_timer(model.__name__)
+
+    def _row(self, item: Any, extra: Optional[Dict[str, Any]] = None) -> dict:
+        row = {name: _field(item, name) for name in self.fields}
+        for name, value in (extra or {}).items():
+            related = self.relations[name]
+            if isinstance(value, list):
+                row[name] = [related._row(child) for child in value]
+            else:
+                row[name] = related._row(value) if value is not None else None
+        return row
+
+    def _expand(self, item: Any, extra: Dict[str, Any]) -> dict:
+        return {**{name: _field(item, name) for name in self.fields}, **extra}
+
+    def one(self, item: Any, extra: Optional[Dict[str, Any]] = None) -> bytes:
+        start = perf_counter()
+        try:
+            return self._encode_one(item, extra)
+        finally:
+            self._timer.observe(perf_counter() - start)
+
+    def many(self, items: Iterable[Any], included: Optional[List[Dict[str, Any]]] = None) -> bytes:
+        start = perf_counter()
+        try:
+            return self._encode_many(items, included)
+        finally:
+            self._timer.observe(perf_counter() - start)
+
+    def _encode_one(self, item: Any, extra: Optional[Dict[str, Any]]) -> bytes:
+        if self.fast:
+            return orjson.dumps(self._row(item, extra), option=ORJSON_OPTIONS)
+        if extra is None:
+            return self._one.dump_json(self._one.validate_python(item, from_attributes=True))
+        value = self._expanded_one.validate_python(self._expand(item, extra), from_attributes=True)
+        return self._expanded_one.dump_json(value, exclude_unset=True)
+
+    def _encode_many(self, items: Iterable[Any], included: Optional[List[Dict[str, Any]]]) -> bytes:
+        if self.fast:
+            extras = included or [None] * len(items)
+            return orjson.dumps([self._row(item, extra) for item, extra in zip(items, extras)], option=ORJSON_OPTIONS)
+        if included is None:
+            return self._many.dump_json(self._many.validate_python(items, from_attributes=True))
+        rows = [self._expand(item, extra) for item, extra in zip(items, included)]
+        return self._expanded_many.dump_json(self._expanded_many.validate_python(rows, from_attributes=True), exclude_unset=True)
@@ -0,0 +1,3 @@
+from .post import PostTable
+from .comment import CommentTable
+from .category import CategoryTable
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Category表定义
+与migration.sql中的 category 表保持一致
+"""
+
+from sqlalchemy import Column, DDL, DateTime, Index, String, Text, event, func
+from database import Base, DB_SCHEMA
+from .common import new_id, utcnow
+
+class CategoryTable(Base):
+    """Category ORM映射"""
+    __tablename__ = "category"
+    __table_args__ = (
+        Index("idx_category_created_at", "created_at", "id"),
+        Index("idx_category_updated_at", "updated_at"),
+        {"schema": DB_SCHEMA},
+    )
+
+    id = Column(String(255), primary_key=True, default=new_id)
+    name = Column(String(255), nullable=False, unique=True)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
+
+# 全文检索的列和权重（A标题，B正文）
+SEARCH_COLUMNS = {"name": "A", "description": "B"}
+
+# search_vector不映射为ORM字段，普通查询不会读取；每条语句单独执行（asyncpg不支持一次执行多条）
+# 登记在表的info中，迁移时对此前建好的表补建（见migrate.py）
+CategoryTable.__table__.info["postgresql_ddl"] = [
+    DDL("ALTER TABLE %(fullname)s ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple', coalesce(\"name\", '')), 'A') || setweight(to_tsvector('simple', coalesce(\"description\", '')), 'B')) STORED"),
+    DDL("CREATE INDEX IF NOT EXISTS idx_category_search ON %(fullname)s USING GIN (search_vector)"),
+]
+for _ddl in CategoryTable.__table__.info["postgresql_ddl"]:
+    event.listen(CategoryTable.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
@@ -0,0 +1,40 @@
+"""
+Comment表定义
+与migration.sql中的 comment 表保持一致
+"""
+
+from sqlalchemy import Column, Boolean, DDL, DateTime, Index, String, Text, event, false, func
+from database import Base, DB_SCHEMA
+from .common import new_id, utcnow
+
+class CommentTable(Base):
+    """Comment ORM映射"""
+    __tablename__ = "comment"
+    __table_args__ = (
+        Index("idx_comment_post_id", "post_id"),
+        Index("idx_comment_email", "email"),
+        Index("idx_comment_created_at", "created_at", "id"),
+        Index("idx_comment_updated_at", "updated_at"),
+        {"schema": DB_SCHEMA},
+    )
+
+    id = Column(String(255), primary_key=True, default=new_id)
+    post_id = Column(String(255), nullable=False)
+    author = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False)
+    content = Column(Text, nullable=False)
+    approved = Column(Boolean, nullable=True, default=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
+
+# 全文检索的列和权重（A标题，B正文）
+SEARCH_COLUMNS = {"content": "B"}
+
+# search_vector不映射为ORM字段，普通查询不会读取；每条语句单独执行（asyncpg不支持一次执行多条）
+# 登记在表的info中，迁移时对此前建好的表补建（见migrate.py）
+CommentTable.__table__.info["postgresql_ddl"] = [
+    DDL("ALTER TABLE %(fullname)s ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple', coalesce(\"content\", '')), 'B')) STORED"),
+    DDL("CREATE INDEX IF NOT EXISTS idx_comment_search ON %(fullname)s USING GIN (search_vector)"),
+]
+for _ddl in CommentTable.__table__.info["postgresql_ddl"]:
+    event.listen(CommentTable.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
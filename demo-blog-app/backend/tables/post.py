@@ -0,0 +1,40 @@
+"""
+Post表定义
+与migration.sql中的 post 表保持一致
+"""
+
+from sqlalchemy import Column, Boolean, DDL, DateTime, Index, String, Text, event, false, func
+from database import Base, DB_SCHEMA
+from .common import new_id, utcnow
+
+class PostTable(Base):
+    """Post ORM映射"""
+    __tablename__ = "post"
+    __table_args__ = (
+        Index("idx_post_title", "title"),
+        Index("idx_post_publish_date", "publish_date"),
+        Index("idx_post_created_at", "created_at", "id"),
+        Index("idx_post_updated_at", "updated_at"),
+        {"schema": DB_SCHEMA},
+    )
+
+    id = Column(String(255), primary_key=True, default=new_id)
+    title = Column(String(255), nullable=False)
+    content = Column(Text, nullable=False)
+    author = Column(String(255), nullable=False)
+    published = Column(Boolean, nullable=True, default=False, server_default=false())
+    publish_date = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
+
+# 全文检索的列和权重（A标题，B正文）
+SEARCH_COLUMNS = {"title": "A", "content": "B"}
+
+# search_vector不映射为ORM字段，普通查询不会读取；每条语句单独执行（asyncpg不支持一次执行多条）
+# 登记在表的info中，迁移时对此前建好的表补建（见migrate.py）
+PostTable.__table__.info["postgresql_ddl"] = [
+    DDL("ALTER TABLE %(fullname)s ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple', coalesce(\"title\", '')), 'A') || setweight(to_tsvector('simple', coalesce(\"content\", '')), 'B')) STORED"),
+    DDL("CREATE INDEX IF NOT EXISTS idx_post_search ON %(fullname)s USING GIN (search_vector)"),
+]
+for _ddl in PostTable.__table__.info["postgresql_ddl"]:
+    event.listen(PostTable.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
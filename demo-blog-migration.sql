@@ -1,6 +1,6 @@
 CREATE SCHEMA IF NOT EXISTS demo_schema;
 
-CREATE TABLE demo_schema.post (
+CREATE TABLE demo_schema."post" (
   "id" VARCHAR(255) DEFAULT gen_random_uuid() NOT NULL,
   "title" VARCHAR(255) NOT NULL,
   "content" TEXT NOT NULL,
@@ -9,10 +9,11 @@ CREATE TABLE demo_schema.post (
   "publish_date" TIMESTAMPTZ NULL,
   "created_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
   "updated_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
-  CONSTRAINT pk_post PRIMARY KEY (id)
+  "search_vector" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple', coalesce("title", '')), 'A') || setweight(to_tsvector('simple', coalesce("content", '')), 'B')) STORED,
+  CONSTRAINT pk_post PRIMARY KEY ("id")
 );
 
-CREATE TABLE demo_schema.comment (
+CREATE TABLE demo_schema."comment" (
   "id" VARCHAR(255) DEFAULT gen_random_uuid() NOT NULL,
   "post_id" VARCHAR(255) NOT NULL,
   "author" VARCHAR(255) NOT NULL,
@@ -21,30 +22,48 @@ CREATE TABLE demo_schema.comment (
   "approved" BOOLEAN DEFAULT FALSE NULL,
   "created_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
   "updated_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
-  CONSTRAINT pk_comment PRIMARY KEY (id)
+  "search_vector" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple', coalesce("content", '')), 'B')) STORED,
+  CONSTRAINT pk_comment PRIMARY KEY ("id")
 );
 
-CREATE TABLE demo_schema.category (
+CREATE TABLE demo_schema."category" (
   "id" VARCHAR(255) DEFAULT gen_random_uuid() NOT NULL,
   "name" VARCHAR(255) NOT NULL,
   "description" TEXT NULL,
   "created_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
   "updated_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
-  CONSTRAINT pk_category PRIMARY KEY (id),
-  CONSTRAINT uk_category_name UNIQUE (name)
+  "search_vector" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple', coalesce("name", '')), 'A') || setweight(to_tsvector('simple', coalesce("description", '')), 'B')) STORED,
+  CONSTRAINT pk_category PRIMARY KEY ("id"),
+  CONSTRAINT uk_category_name UNIQUE ("name")
 );
 
-CREATE INDEX idx_post_title ON demo_schema.post (title);
-CREATE INDEX idx_post_publish_date ON demo_schema.post (publish_date);
-CREATE INDEX idx_post_created_at ON demo_schema.post (created_at);
-CREATE INDEX idx_post_updated_at ON demo_schema.post (updated_at);
+CREATE INDEX idx_post_title ON demo_schema."post" ("title");
+CREATE INDEX idx_post_publish_date ON demo_schema."post" ("publish_date");
+CREATE INDEX idx_post_created_at ON demo_schema."post" ("created_at", "id");
+CREATE INDEX idx_post_updated_at ON demo_schema."post" ("updated_at");
+CREATE INDEX idx_post_search ON demo_schema."post" USING GIN ("search_vector");
 
-CREATE INDEX idx_comment_email ON demo_schema.comment (email);
-CREATE INDEX idx_comment_created_at ON demo_schema.comment (created_at);
-CREATE INDEX idx_comment_updated_at ON demo_schema.comment (updated_at);
+CREATE INDEX idx_comment_post_id ON demo_schema."comment" ("post_id");
+CREATE INDEX idx_comment_email ON demo_schema."comment" ("email");
+CREATE INDEX idx_comment_created_at ON demo_schema."comment" ("created_at", "id");
+CREATE INDEX idx_comment_updated_at ON demo_schema."comment" ("updated_at");
+CREATE INDEX idx_comment_search ON demo_schema."comment" USING GIN ("search_vector");
 
-CREATE INDEX idx_category_created_at ON demo_schema.category (created_at);
-CREATE INDEX idx_category_updated_at ON demo_schema.category (updated_at);
+CREATE INDEX idx_category_created_at ON demo_schema."category" ("created_at", "id");
+CREATE INDEX idx_category_updated_at ON demo_schema."category" ("updated_at");
+CREATE INDEX idx_category_search ON demo_schema."category" USING GIN ("search_vector");
+
+-- 迁移版本（后端migrate.py），由本脚本初始化的数据库不再重复执行
+CREATE TABLE demo_schema."schema_migrations" (
+  "version" INTEGER NOT NULL,
+  "name" VARCHAR(255) NOT NULL,
+  "applied_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT pk_schema_migrations PRIMARY KEY ("version")
+);
+INSERT INTO demo_schema."schema_migrations" ("version", "name") VALUES
+  (1, '初始表结构'),
+  (3, '全文检索列'),
+  (4, '补齐索引');
 
 -- 应用信息
 -- 应用名称: 个人博客系统
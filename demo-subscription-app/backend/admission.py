@@ -0,0 +1,189 @@
+"""
+准入控制和过载保护
+流量突增时不再无限制地接收请求（在线程池和连接池前排队，p99涨到几十秒才失败），而是：
+- 全局并发上限：本worker同时处理的请求数不超过ADMISSION_MAX_CONCURRENCY，其余进入有界等待队列
+- 优先级：槽位空出时依次分给 单条读取（GET /xxx/{item_id}）> 写入 > 列表/检索/统计 > 导出；
+  队列满时新到的高优先级请求挤掉队尾优先级最低的等待者
+- 截止时间：排队超过ADMISSION_QUEUE_TIMEOUT_MS仍未轮到，或队列已满，返回503
+- 每路由上限：按路由模板统计处理中和排队的请求数，超过该类路由的上限（默认列表16、导出2）直接返回429
+拒绝响应很快返回，并带Retry-After；只作用于实体和统计接口，/metrics、/docs、/admin等不受限制
+纯ASGI中间件，在事件循环中排队，不占用线程池线程；ADMISSION_ENABLED=false 时不注册
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from starlette.routing import BaseRoute, Match
+from database import STORAGE_BACKEND, pool_capacity
+from metrics import record_rejection
+
+# 不经过连接池（SQLite、NullPool、内存模式）时的默认并发上限
+UNBOUNDED_CONCURRENCY = 64
+
+
+def _default_concurrency() -> int:
+    """默认不超过本worker的连接池上限：每个请求最多占用一个连接，多放进来的请求只会在连接池前排队"""
+    capacity = pool_capacity() if STORAGE_BACKEND != "memory" else 0
+    return min(capacity, UNBOUNDED_CONCURRENCY) if capacity else UNBOUNDED_CONCURRENCY
+
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "0")) or _default_concurrency()
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", str(2 * ADMISSION_MAX_CONCURRENCY)))
+ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# 路由类别的优先级，数值小的先获得槽位
+PRIORITIES = {"item": 0, "write": 1, "list": 2, "export": 3}
+# 每个路由（按路由模板）处理中和排队的请求数上限，0表示只受全局上限约束
+ROUTE_LIMITS = {
+    "item": int(os.getenv("ADMISSION_ITEM_LIMIT", "0")),
+    "write": int(os.getenv("ADMISSION_WRITE_LIMIT", "0")),
+    "list": int(os.getenv("ADMISSION_LIST_LIMIT", "16")),
+    "export": int(os.getenv("ADMISSION_EXPORT_LIMIT", "2")),
+}
+
+
+def route_kind(method: str, path: str) -> str:
+    """按方法和路由模板归类"""
+    if method not in ("GET", "HEAD"):
+        return "write"
+    if path.endswith("/export"):
+        return "export"
+    if path.endswith("/{item_id}"):
+        return "item"
+    return "list"
+
+
+class PriorityLimiter:
+    """
+    带优先级的有界并发限制：limit个槽位，最多queue_size个等待者
+    有人排队时新请求也要排队，槽位空出时交给优先级最高（同优先级先到先得）的等待者，不会被新请求插队
+    """
+
+    def __init__(self, limit: int, queue_size: int):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def _evict(self, priority: int) -> bool:
+        """队列已满时挤掉一个优先级低于priority的等待者（优先级最低、最晚到的），没有则返回False"""
+        victim: Optional[Tuple[int, int, asyncio.Future]] = None
+        for entry in self._heap:
+            if not entry[2].done() and entry[0] > priority and (victim is None or entry[:2] > victim[:2]):
+                victim = entry
+        if victim is None:
+            return False
+        victim[2].set_result(False)
+        return True
+
+    async def acquire(self, priority: int, timeout: float) -> bool:
+        """取得槽位返回True；队列已满、被挤掉或等待超时返回False"""
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return True
+        if self.waiting >= self.queue_size and not self._evict(priority):
+            return False
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._sequence), future))
+        self.waiting += 1
+        self._grant()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # 超时与分配到槽位同时发生时，槽位已经转给本请求
+            return future.done() and not future.cancelled() and future.result()
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            raise
+        finally:
+            self.waiting -= 1
+
+    def _grant(self) -> None:
+        """把空闲槽位交给优先级最高的等待者，跳过已超时或被挤掉的"""
+        while self.active < self.limit and self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                self.active += 1
+                future.set_result(True)
+
+    def release(self) -> None:
+        self.active -= 1
+        self._grant()
+
+
+async def _reject(send: Any, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(ADMISSION_RETRY_AFTER).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    routes：应用的路由表（app.router.routes，之后注册的路由也能看到）
+    prefixes：受控接口的路径前缀（实体和统计路由）
+    """
+
+    def __init__(self, app: Any, routes: Sequence[BaseRoute], prefixes: Sequence[str]):
+        self.app = app
+        self.routes = routes
+        self.prefixes = tuple(prefixes)
+        self.limiter = PriorityLimiter(ADMISSION_MAX_CONCURRENCY, ADMISSION_QUEUE_SIZE)
+        self.timeout = ADMISSION_QUEUE_TIMEOUT_MS / 1000
+        # 每个路由模板处理中和排队的请求数
+        self._in_route: Dict[str, int] = {}
+
+    def _match(self, scope: dict) -> Optional[BaseRoute]:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+        route = self._match(scope)
+        if route is None:
+            # 404/405由路由直接处理，开销很小
+            await self.app(scope, receive, send)
+            return
+        template = getattr(route, "path", scope["path"])
+        kind = route_kind(scope["method"], template)
+        limit = ROUTE_LIMITS[kind]
+        in_route = self._in_route.get(template, 0)
+        if limit and in_route >= limit:
+            # 让指标按路由模板记录被拒绝的请求
+            scope["route"] = route
+            record_rejection(template, "route_limit")
+            await _reject(send, 429, "Too many concurrent requests for this endpoint")
+            return
+        self._in_route[template] = in_route + 1
+        try:
+            if not await self.limiter.acquire(PRIORITIES[kind], self.timeout):
+                scope["route"] = route
+                record_rejection(template, "overloaded")
+                await _reject(send, 503, "Server is overloaded, retry later")
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.limiter.release()
+        finally:
+            self._in_route[template] -= 1
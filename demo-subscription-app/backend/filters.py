@@ -0,0 +1,192 @@
+"""
+列表接口的过滤与排序
+查询参数：
+  字段=值              等值过滤，如 ?title=hello
+  字段__操作符=值       范围过滤，操作符为 ne / gt / gte / lt / lte / in（in 的值用逗号分隔）
+  sort=字段 / sort=-字段  按单列排序，-表示降序，id作为并列时的次序
+只允许在有索引的列上过滤和排序，条件直接下推到SQL；
+无索引列上的过滤默认返回400，ALLOW_UNINDEXED_FILTERS=true 时放行并在X-Unindexed-Filters响应头中标出
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response
+from pagination import decode_cursor, set_next_cursor
+
+UNINDEXED_FILTERS_HEADER = "X-Unindexed-Filters"
+ALLOW_UNINDEXED_FILTERS = os.getenv("ALLOW_UNINDEXED_FILTERS", "false").lower() == "true"
+
+DEFAULT_SORT = "created_at"
+OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in")
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ("true", "1", "yes"):
+        return True
+    if lowered in ("false", "0", "no"):
+        return False
+    raise ValueError(value)
+
+
+def _parse_datetime(value: str) -> datetime:
+    """不带时区的时间按UTC处理，与utcnow写入的时间戳一致"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+_PARSERS: Dict[type, Callable[[str], Any]] = {
+    bool: _parse_bool,
+    datetime: _parse_datetime,
+    float: float,
+    int: int,
+}
+
+
+@dataclass(frozen=True)
+class QueryField:
+    """可用于过滤/排序的列"""
+    name: str
+    parse: Callable[[str], Any]
+    indexed: bool
+    nullable: bool
+
+
+@dataclass
+class ListQuery:
+    """解析后的列表查询，数据库仓储和内存仓储共用"""
+    filters: List[Tuple[str, str, Any]] = field(default_factory=list)
+    sort: str = DEFAULT_SORT
+    descending: bool = False
+    nullable_sort: bool = False
+    after: Optional[Tuple[Any, str]] = None
+    unindexed: List[str] = field(default_factory=list)
+
+    @property
+    def sort_token(self) -> str:
+        return ("-" if self.descending else "") + self.sort
+
+    @property
+    def is_default(self) -> bool:
+        """没有过滤且按默认顺序，可以直接走插入顺序索引"""
+        return not self.filters and self.sort == DEFAULT_SORT and not self.descending
+
+
+def query_fields(table: Any) -> Dict[str, QueryField]:
+    """
+    从ORM表定义推导可查询的列
+    主键、唯一列以及作为索引首列的列视为有索引，与migration.sql中的索引保持一致
+    """
+    leading = {next(iter(index.columns)).name for index in table.__table__.indexes}
+    fields = {}
+    for column in table.__table__.columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = str
+        fields[column.name] = QueryField(
+            name=column.name,
+            parse=_PARSERS.get(python_type, str),
+            indexed=column.primary_key or bool(column.unique) or column.name in leading,
+            nullable=bool(column.nullable),
+        )
+    return fields
+
+
+def _parse_value(query_field: QueryField, op: str, raw: str) -> Any:
+    try:
+        if op == "in":
+            return [query_field.parse(part) for part in raw.split(",") if part != ""]
+        return query_field.parse(raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid value for {query_field.name}: {raw}") from exc
+
+
+def parse_list_query(params: Any, fields: Dict[str, QueryField]) -> ListQuery:
+    """
+    从请求的查询参数中解析过滤、排序和游标
+    与字段同名的参数视为过滤条件，其他参数（skip、limit等）忽略；格式错误返回400
+    """
+    query = ListQuery()
+    for key, raw in params.multi_items():
+        name, _, op = key.partition("__")
+        if name not in fields:
+            if op:
+                raise HTTPException(status_code=400, detail=f"Unknown filter field: {name}")
+            continue
+        op = op or "eq"
+        if op not in OPERATORS:
+            raise HTTPException(status_code=400, detail=f"Unsupported filter operator: {op}")
+        if not fields[name].indexed:
+            if not ALLOW_UNINDEXED_FILTERS:
+                raise HTTPException(status_code=400, detail=f"Filtering on unindexed column is not allowed: {name}")
+            if name not in query.unindexed:
+                query.unindexed.append(name)
+        query.filters.append((name, op, _parse_value(fields[name], op, raw)))
+
+    sort = params.get("sort")
+    if sort:
+        name = sort.lstrip("-")
+        if name not in fields or not fields[name].indexed:
+            raise HTTPException(status_code=400, detail=f"Sorting is only allowed on indexed columns: {name}")
+        query.sort, query.descending = name, sort.startswith("-")
+    query.nullable_sort = fields[query.sort].nullable
+
+    cursor = params.get("cursor")
+    if cursor:
+        token, value, item_id = decode_cursor(cursor)
+        if token != query.sort_token:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        if isinstance(value, str):
+            value = _parse_value(fields[query.sort], "eq", value)
+        query.after = (value, item_id)
+    return query
+
+
+def finish_list_response(response: Response, query: ListQuery, items: Sequence[Any], limit: int) -> None:
+    """写入下一页游标，并标出放行的无索引过滤"""
+    set_next_cursor(response, items, limit, query.sort_token)
+    if query.unindexed:
+        response.headers[UNINDEXED_FILTERS_HEADER] = ",".join(query.unindexed)
+
+
+def _comparable(value: Any) -> Any:
+    """内存模式里客户端写入的时间可能不带时区，按UTC处理后再比较"""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _compare(op: str, actual: Any, expected: Any) -> bool:
+    if actual is None:
+        return False
+    actual = _comparable(actual)
+    if op == "eq":
+        return actual == expected
+    if op == "ne":
+        return actual != expected
+    if op == "in":
+        return actual in expected
+    if op == "gt":
+        return actual > expected
+    if op == "gte":
+        return actual >= expected
+    if op == "lt":
+        return actual < expected
+    return actual <= expected
+
+
+def matches(record: dict, query: ListQuery) -> bool:
+    """内存模式下逐条判断过滤条件，语义与SQL一致（NULL不满足比较条件）"""
+    try:
+        return all(_compare(op, record.get(name), value) for name, op, value in query.filters)
+    except TypeError:
+        return False
+
+
+def sort_key(record: dict, sort: str) -> Tuple[bool, Any, str]:
+    """内存模式的排序键：NULL视为最大，与PostgreSQL默认的NULLS LAST/降序NULLS FIRST一致"""
+    value = _comparable(record.get(sort))
+    return value is None, value, record["id"]
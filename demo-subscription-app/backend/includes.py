@@ -0,0 +1,72 @@
+"""
+关联数据批量加载（include=）
+每个关联只发一条 WHERE 外键 IN (...) 查询（命中外键索引），再在内存中按外键分组，
+一页100条记录带子记录只需2条查询，而不是101条
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+from fastapi import HTTPException
+
+
+@dataclass(frozen=True)
+class Relation:
+    """可通过include=加载的关联"""
+    name: str
+    namespace: str     # 关联实体名，也是其缓存命名空间
+    foreign_key: str
+    many: bool         # True：一对多，外键在关联实体上；False：多对一，外键在本实体上
+    model: Any = None       # 关联实体的响应模型
+    repository: Any = None  # 关联实体的仓储依赖
+
+
+def _field(item: Any, name: str) -> Any:
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def parse_include(include: Optional[str], relations: Dict[str, Relation]) -> List[Relation]:
+    """解析逗号分隔的include参数，未知的关联返回400"""
+    if not include:
+        return []
+    selected = []
+    for name in dict.fromkeys(part.strip() for part in include.split(",") if part.strip()):
+        if name not in relations:
+            raise HTTPException(status_code=400, detail=f"Unknown include: {name}; available: {', '.join(relations) or 'none'}")
+        selected.append(relations[name])
+    return selected
+
+
+async def load_includes(items: Sequence[Any], relations: List[Relation], repositories: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """返回与items一一对应的关联数据；没有请求关联时返回None"""
+    if not relations:
+        return None
+    included: List[Dict[str, Any]] = [{} for _ in items]
+    for relation in relations:
+        repository = repositories[relation.name]
+        if relation.many:
+            rows = await repository.list_by(relation.foreign_key, [_field(item, "id") for item in items])
+            groups = defaultdict(list)
+            for row in rows:
+                groups[_field(row, relation.foreign_key)].append(row)
+            for extra, item in zip(included, items):
+                extra[relation.name] = groups.get(_field(item, "id"), [])
+        else:
+            keys = {_field(item, relation.foreign_key) for item in items} - {None}
+            rows = await repository.list_by("id", list(keys))
+            by_id = {_field(row, "id"): row for row in rows}
+            for extra, item in zip(included, items):
+                extra[relation.name] = by_id.get(_field(item, relation.foreign_key))
+    return included
+
+
+def included_rows(included: Optional[List[Dict[str, Any]]]) -> List[Any]:
+    """展开全部关联记录，用于计算包含关联数据的ETag"""
+    rows = []
+    for extra in included or []:
+        for value in extra.values():
+            if isinstance(value, list):
+                rows.extend(value)
+            elif value is not None:
+                rows.append(value)
+    return rows
@@ -6,21 +6,44 @@
 生成时间: 2025-07-23T02:11:49.514Z
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import subscription_router
-from routers import paymentRecord_router
+from fastapi.responses import JSONResponse, ORJSONResponse
+from admission import ADMISSION_ENABLED, AdmissionMiddleware
+from cache import response_cache
+from compression import COMPRESSION_ENABLED, CompressionMiddleware
+from database import dispose_engine
+from metrics import METRICS_ENABLED, MetricsMiddleware, metrics_endpoint
+from profiling import PROFILE_ENABLED, PROFILE_TOKEN, ProfilingMiddleware
+from repositories.memory import close_durable_storage, open_durable_storage
+from serialization import FAST_JSON
+from routers.crud import crud_router
+from routers.resources import RESOURCES
+from routers import stats_router
+from routers import profile_router
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 持久化内存存储（MEMORY_DATA_DIR）在worker中加载数据，关闭时写入剩余日志和快照
+    open_durable_storage()
+    yield
+    close_durable_storage()
+    await dispose_engine()
 
 app = FastAPI(
     title="订阅支出追踪器",
     description="管理订阅服务和支付记录，以及查看总支出和即将到期的订阅",
-    version="1.0.0"
+    version="1.0.0",
+    # FAST_JSON=true 时其余接口也用orjson编码
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse,
+    lifespan=lifespan
 )
 
+# 准入控制：实体和统计接口的并发上限、有界排队和优先级；先于CORS注册（位于其内层），拒绝响应也带CORS头
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, routes=app.router.routes, prefixes=["/subscriptions", "/paymentRecords", "/stats"])
+
 # CORS配置
 app.add_middleware(
     CORSMiddleware,
@@ -28,11 +51,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Unindexed-Filters", "X-Cache", "ETag", "Last-Modified"],
 )
 
-# 包含路由
-app.include_router(subscription_router.router, prefix="/subscriptions", tags=["订阅服务"])
-app.include_router(paymentRecord_router.router, prefix="/paymentRecords", tags=["支付记录"])
+# 响应压缩：按Accept-Encoding协商br/gzip；缓存命中的响应已经压缩过，原样转发
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# 请求诊断（默认关闭）：采样火焰图和慢SQL记录；设置了PROFILE_TOKEN才注册 /admin/profiles 浏览接口
+if PROFILE_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    if PROFILE_TOKEN:
+        app.include_router(profile_router.router, prefix="/admin/profiles", tags=["诊断"])
+
+# 指标中间件最后注册，位于最外层，计时包含其他中间件
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# 包含路由：所有实体共用同一个CRUD路由引擎，按routers/resources.py中的声明注册
+for resource in RESOURCES:
+    app.include_router(crud_router(resource), prefix=f"/{resource.plural}", tags=[resource.tag])
+app.include_router(stats_router.router, prefix="/stats", tags=["统计"])
 
 @app.get("/")
 def read_root():
@@ -42,10 +82,20 @@ def read_root():
         "version": "1.0.0",
         "endpoints": [
             "/subscriptions",
-            "/paymentRecords"
+            "/paymentRecords",
+            "/stats/spend",
+            "/stats/upcoming"
         ]
     }
 
+@app.get("/cache/stats")
+def cache_stats():
+    """响应缓存的命中/未命中计数"""
+    return response_cache.stats()
+
+# 开发调试：先执行数据库迁移，再以单进程启动，代码变化时自动重载；生产环境使用 gunicorn -c gunicorn.conf.py main:app
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    from migrate import run_migrations
+    run_migrations()
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
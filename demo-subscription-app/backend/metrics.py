@@ -0,0 +1,191 @@
+"""
+Prometheus指标（/metrics）
+- http_request_duration_seconds / http_responses_total：按路由模板（如 /posts/{item_id}）而不是原始路径分组，标签数量有界
+- http_requests_in_progress：处理中的请求数
+- response_serialization_seconds：ResponseSerializer编码响应的耗时
+- db_pool_checkout_wait_seconds / db_query_duration_seconds：从连接池取连接的等待时间和SQL执行时间
+- db_pool_connections_in_use / db_pool_capacity / db_pool_saturation / db_pool_checkout_timeouts_total：
+  连接池饱和度，借出和归还连接时更新；饱和度接近1或出现超时说明该worker的连接份额不够
+- http_requests_rejected_total：准入控制（admission.py）按路由模板和原因拒绝的请求数
+中间件是纯ASGI实现（不经过BaseHTTPMiddleware的额外任务和队列），每个请求只做几次计数，可在生产环境常开
+gunicorn多worker时各worker的指标写入PROMETHEUS_MULTIPROC_DIR，/metrics汇总所有worker（见gunicorn.conf.py）
+METRICS_ENABLED=false 时不注册中间件和/metrics，也不监听数据库事件
+"""
+
+import os
+import threading
+from time import perf_counter
+from typing import Any, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import Request
+from starlette.responses import Response
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# 没有匹配到路由的请求（404等）归入同一个标签，避免按原始路径产生无限多的时间序列
+UNMATCHED_ROUTE = "<unmatched>"
+# 亚毫秒级操作（序列化、SQL、取连接）使用更细的桶
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "处理中的请求数", ["method"], multiprocess_mode="livesum"
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "请求处理时间（从收到请求到响应发送完毕）", ["method", "route"]
+)
+RESPONSES = Counter(
+    "http_responses_total", "按状态码统计的响应数", ["method", "route", "status"]
+)
+SERIALIZATION_SECONDS = Histogram(
+    "response_serialization_seconds", "响应模型编码为JSON的耗时", ["model"], buckets=FAST_BUCKETS
+)
+POOL_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "从连接池取得连接的等待时间", buckets=FAST_BUCKETS + (5.0, 10.0, 30.0)
+)
+QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL语句执行时间", ["operation"], buckets=FAST_BUCKETS
+)
+POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use", "已借出的数据库连接数", multiprocess_mode="livesum"
+)
+POOL_CAPACITY = Gauge(
+    "db_pool_capacity", "连接池最多可借出的连接数（pool_size + max_overflow），NullPool为0", multiprocess_mode="livesum"
+)
+POOL_SATURATION = Gauge(
+    "db_pool_saturation", "已借出连接数占连接池上限的比例，多worker时取最高的worker", multiprocess_mode="livemax"
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "等待连接超过DB_POOL_TIMEOUT而失败的次数"
+)
+REJECTED = Counter(
+    "http_requests_rejected_total", "准入控制拒绝的请求数（route_limit: 429，overloaded: 503）", ["route", "reason"]
+)
+
+
+class MetricsMiddleware:
+    """记录每个请求的耗时、状态码和处理中的请求数"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500   # 应用抛出异常、没有发送响应时按500统计
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            in_progress.dec()
+            # 路由匹配后FastAPI把匹配到的路由写入scope["route"]
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            RESPONSES.labels(method, route, str(status)).inc()
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """Prometheus文本格式的指标；多进程模式下汇总所有worker"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+class _NoopTimer:
+    def observe(self, amount: float) -> None:
+        pass
+
+
+def serialization_timer(model_name: str) -> Any:
+    """ResponseSerializer使用的计时器；关闭指标时为空操作"""
+    return SERIALIZATION_SECONDS.labels(model_name) if METRICS_ENABLED else _NoopTimer()
+
+
+def record_rejection(route: str, reason: str) -> None:
+    if METRICS_ENABLED:
+        REJECTED.labels(route, reason).inc()
+
+
+class TimedPool(AsyncAdaptedQueuePool):
+    """
+    记录取连接的等待时间：SQLAlchemy只有取得连接之后的checkout事件，
+    等待（连接池耗尽时阻塞到有连接归还或超时）发生在_do_get中
+    """
+
+    def _do_get(self) -> Any:
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(perf_counter() - start)
+
+
+class _PoolUsage:
+    """本进程借出的连接数，借出和归还时更新饱和度指标"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._lock = threading.Lock()
+        POOL_CAPACITY.set(capacity)
+
+    def checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        self._change(1)
+
+    def checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self._change(-1)
+
+    def _change(self, step: int) -> None:
+        with self._lock:
+            self.in_use += step
+            in_use = self.in_use
+        POOL_IN_USE.set(in_use)
+        if self.capacity:
+            POOL_SATURATION.set(in_use / self.capacity)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    conn.info["query_start"] = perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    start: Optional[float] = conn.info.pop("query_start", None)
+    if start is None:
+        return
+    operation = statement.lstrip()[:6].upper()
+    QUERY_SECONDS.labels(operation if operation in SQL_OPERATIONS else "OTHER").observe(perf_counter() - start)
+
+
+def instrument_engine(engine: Any, pool_capacity: int = 0) -> None:
+    """
+    在引擎上监听SQL执行和连接借出/归还事件（异步引擎监听其sync_engine）
+    pool_capacity是本进程连接池的上限，0表示不限制（NullPool、SQLite），此时不计算饱和度
+    """
+    if not METRICS_ENABLED:
+        return
+    target = getattr(engine, "sync_engine", engine)
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    usage = _PoolUsage(pool_capacity)
+    event.listen(target, "checkout", usage.checkout)
+    event.listen(target, "checkin", usage.checkin)
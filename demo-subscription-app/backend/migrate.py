@@ -0,0 +1,135 @@
+"""
+数据库迁移
+按版本号顺序执行尚未执行的步骤，已执行的版本记录在schema_migrations表中；版本只追加，不修改已发布的步骤
+在启动worker之前执行一次：gunicorn在fork之前（on_starting）调用，也可以单独运行 python migrate.py
+应用本身导入时不连接数据库，worker启动不依赖数据库的可用性
+PostgreSQL上用advisory锁串行化，多个实例同时启动时只有一个执行迁移，其余等待后发现已是最新版本
+由migration.sql初始化的数据库已登记全部版本，不会重复执行
+表结构步骤都可重复执行（IF NOT EXISTS、按现有索引比对），此前由create_all或旧版migration.sql建好的库经后续版本补齐列和索引
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, List
+from sqlalchemy import Column, Connection, DateTime, Integer, MetaData, String, Table, insert, inspect, select, text
+from sqlalchemy.schema import CreateSchema
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import DB_SCHEMA, STORAGE_BACKEND, Base, create_database_engine
+from tables.common import utcnow
+import tables  # noqa: F401  导入全部表，注册到Base.metadata
+from stats import rebuild_summary
+
+logger = logging.getLogger("migrate")
+
+# 本应用迁移锁的标识（任意固定值）
+ADVISORY_LOCK_ID = 7_205_310_015
+
+migrations_table = Table(
+    "schema_migrations",
+    MetaData(schema=DB_SCHEMA),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False, default=utcnow),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[AsyncSession], Any]
+
+
+async def _create_tables(db: AsyncSession) -> None:
+    """建表（含索引和PostgreSQL上的全文检索列）；已存在的表整张跳过，缺少的列和索引由后续版本补齐"""
+    await db.run_sync(lambda session: Base.metadata.create_all(session.connection()))
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"]: index["column_names"] for index in inspector.get_indexes(table.name, schema=table.schema)}
+        for index in table.indexes:
+            columns = [column.name for column in index.columns]
+            if existing.get(index.name) == columns:
+                continue
+            if index.name in existing:
+                index.drop(conn)
+            index.create(conn)
+
+
+async def _sync_indexes(db: AsyncSession) -> None:
+    """
+    按表定义补建索引：外键列索引、(created_at, id) 游标索引等；
+    同名索引的列与定义不一致时（如旧版只有created_at单列）删除后重建
+    """
+    await db.run_sync(lambda session: _create_missing_indexes(session.connection()))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "初始表结构", _create_tables),
+    Migration(2, "回填paymentRecord汇总", rebuild_summary),
+    Migration(4, "补齐索引", _sync_indexes),
+]
+
+
+async def upgrade() -> List[int]:
+    """执行尚未执行的迁移，返回本次执行的版本号；使用不带连接池的独立引擎，结束后不保留连接"""
+    engine = create_database_engine(pooled=False)
+    applied_now = []
+    try:
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                # 会话级锁，连接关闭时自动释放
+                await conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+                if DB_SCHEMA:
+                    await conn.execute(CreateSchema(DB_SCHEMA, if_not_exists=True))
+            await conn.run_sync(migrations_table.create, checkfirst=True)
+            applied = set(await conn.scalars(select(migrations_table.c.version)))
+            await conn.commit()
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                logger.info("Applying migration %d: %s", migration.version, migration.name)
+                async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                    await migration.apply(db)
+                    await db.execute(insert(migrations_table).values(version=migration.version, name=migration.name))
+                    await db.commit()
+                applied_now.append(migration.version)
+    finally:
+        await engine.dispose()
+    return applied_now
+
+
+def run_migrations() -> List[int]:
+    """同步入口（gunicorn钩子和python main.py使用）；内存存储不需要迁移"""
+    if STORAGE_BACKEND == "memory":
+        return []
+    return asyncio.run(upgrade())
+
+
+async def rebuild() -> None:
+    """从明细重算paymentRecord汇总表（修复或接入已有数据时使用，执行期间应暂停写入）；内存存储启动时已由明细重建"""
+    engine = create_database_engine(pooled=False)
+    try:
+        async with AsyncSession(bind=engine) as db:
+            await rebuild_summary(db)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="执行尚未执行的数据库迁移")
+    parser.add_argument("--rebuild-summary", action="store_true", help="迁移后从明细重算paymentRecord汇总表（执行期间应暂停写入）")
+    args = parser.parse_args()
+    versions = run_migrations()
+    if versions:
+        logger.info("Applied migrations: %s", versions)
+    else:
+        logger.info("Database is up to date")
+    if args.rebuild_summary and STORAGE_BACKEND != "memory":
+        asyncio.run(rebuild())
+        logger.info("Rebuilt paymentRecord summary")
@@ -1,2 +1,4 @@
-from .subscription import Subscription, SubscriptionCreate, SubscriptionUpdate
-from .paymentRecord import PaymentRecord, PaymentRecordCreate, PaymentRecordUpdate
\ No newline at end of file
+from .subscription import Subscription, SubscriptionCreate, SubscriptionUpdate, SubscriptionBulkUpdate
+from .paymentRecord import PaymentRecord, PaymentRecordCreate, PaymentRecordUpdate, PaymentRecordBulkUpdate
+from .bulk import BulkDeleteRequest, BulkItemResult, MAX_BULK_ITEMS
+from .relations import SubscriptionWithRelations, PaymentRecordWithRelations
\ No newline at end of file
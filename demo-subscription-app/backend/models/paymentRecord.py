@@ -2,10 +2,9 @@
 PaymentRecord模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional
 from datetime import datetime
-import uuid
 
 class PaymentRecordBase(BaseModel):
     """PaymentRecord基础模型"""
@@ -20,10 +19,22 @@ class PaymentRecordCreate(PaymentRecordBase):
 
 class PaymentRecordUpdate(BaseModel):
     """更新PaymentRecord时使用的模型"""
-    subscriptionId: Optional[str] = None = Field(..., description="subscriptionId")
-    amount: Optional[float] = None = Field(..., description="amount")
-    paymentDate: Optional[datetime] = None = Field(..., description="paymentDate")
-    paymentStatus: Optional[str] = None = Field(..., description="paymentStatus")
+    subscriptionId: Optional[str] = Field(None, description="subscriptionId")
+    amount: Optional[float] = Field(None, description="amount")
+    paymentDate: Optional[datetime] = Field(None, description="paymentDate")
+    paymentStatus: Optional[str] = Field(None, description="paymentStatus")
+
+    @field_validator("subscriptionId", "amount", "paymentDate", "paymentStatus")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        """必填字段可以不提交，但不能提交null（对应的列为NOT NULL）"""
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class PaymentRecordBulkUpdate(PaymentRecordUpdate):
+    """批量更新时的单条修改，需带上id"""
+    id: str = Field(..., description="主键ID")
 
 class PaymentRecord(PaymentRecordBase):
     """PaymentRecord完整模型"""
@@ -0,0 +1,16 @@
+"""
+带关联数据的响应模型（include=）
+"""
+
+from typing import List, Optional
+from pydantic import Field
+from .subscription import Subscription
+from .paymentRecord import PaymentRecord
+
+class SubscriptionWithRelations(Subscription):
+    """Subscription及其关联数据"""
+    paymentRecords: Optional[List[PaymentRecord]] = Field(None, description="include=paymentRecords 时返回")
+
+class PaymentRecordWithRelations(PaymentRecord):
+    """PaymentRecord及其关联数据"""
+    subscription: Optional[Subscription] = Field(None, description="include=subscription 时返回")
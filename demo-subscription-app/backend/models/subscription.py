@@ -2,10 +2,9 @@
 Subscription模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional
 from datetime import datetime
-import uuid
 
 class SubscriptionBase(BaseModel):
     """Subscription基础模型"""
@@ -13,7 +12,7 @@ class SubscriptionBase(BaseModel):
     price: float = Field(..., description="price")
     billingCycle: str = Field(..., description="billingCycle")
     isEnabled: bool = Field(..., description="isEnabled")
-    websiteLink: Optional[str] = None = Field(..., description="websiteLink")
+    websiteLink: Optional[str] = Field(None, description="websiteLink")
 
 class SubscriptionCreate(SubscriptionBase):
     """创建Subscription时使用的模型"""
@@ -21,11 +20,23 @@ class SubscriptionCreate(SubscriptionBase):
 
 class SubscriptionUpdate(BaseModel):
     """更新Subscription时使用的模型"""
-    name: Optional[str] = None = Field(..., description="名称")
-    price: Optional[float] = None = Field(..., description="price")
-    billingCycle: Optional[str] = None = Field(..., description="billingCycle")
-    isEnabled: Optional[bool] = None = Field(..., description="isEnabled")
-    websiteLink: Optional[str] = None = Field(..., description="websiteLink")
+    name: Optional[str] = Field(None, description="名称")
+    price: Optional[float] = Field(None, description="price")
+    billingCycle: Optional[str] = Field(None, description="billingCycle")
+    isEnabled: Optional[bool] = Field(None, description="isEnabled")
+    websiteLink: Optional[str] = Field(None, description="websiteLink")
+
+    @field_validator("name", "price", "billingCycle", "isEnabled")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        """必填字段可以不提交，但不能提交null（对应的列为NOT NULL）"""
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class SubscriptionBulkUpdate(SubscriptionUpdate):
+    """批量更新时的单条修改，需带上id"""
+    id: str = Field(..., description="主键ID")
 
 class Subscription(SubscriptionBase):
     """Subscription完整模型"""
@@ -0,0 +1,354 @@
+"""
+请求诊断（PROFILE_ENABLED=true 时启用，默认关闭）
+- 火焰图：PROFILE_SAMPLE_RATE 比例的请求和带 X-Profile 请求头的请求，执行期间由采样线程每 PROFILE_INTERVAL_MS 毫秒
+  记录一次执行端点的线程的调用栈（同步端点在线程池中执行，也能采到）
+- 慢SQL：所有请求都记录执行的SQL语句和耗时（每条语句一次追加），只有耗时超过 PROFILE_SLOW_MS 的请求才保存；
+  被采样的请求同样只在超过阈值时保存，X-Profile 触发的请求总是保存
+- 每个请求保存为 PROFILE_DIR 下的一个JSON文件，最多保留 PROFILE_MAX_FILES 个，多个worker共用目录，
+  通过 /admin/profiles 浏览（见 routers/profile_router.py）
+- X-Profile 请求头须携带 PROFILE_TOKEN 的值才会触发采样，访问 /admin/profiles 须在 X-Profile-Token 请求头中携带该值；
+  未设置 PROFILE_TOKEN 时不接受 X-Profile，也不注册 /admin/profiles（只按比例采样并保存到PROFILE_DIR）
+采样线程只在有请求被采样时运行，不设置解释器的trace/profile钩子，未被采样的请求不受影响
+异步端点运行在事件循环线程上，等待数据库期间采到的样本可能属于并发的其他请求
+"""
+
+import asyncio
+import hmac
+import html
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "500"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+PROFILE_HEADER = b"x-profile"
+# 每个请求最多保存的SQL语句数（N+1查询时记录不会无限增长），超出的只计数
+MAX_QUERIES = 1000
+_PROFILE_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{8}$")
+SUMMARY_FIELDS = ("id", "time", "method", "path", "route", "status", "duration_ms", "trigger", "samples", "query_count", "query_ms")
+
+logger = logging.getLogger("profiling")
+
+
+@dataclass(eq=False)
+class Capture:
+    """一个请求的诊断数据：采样到的调用栈（折叠格式 -> 次数）和执行的SQL"""
+    profiled: bool
+    forced: bool
+    threads: Set[int] = field(default_factory=set)
+    stacks: Counter = field(default_factory=Counter)
+    queries: List[Tuple[str, float]] = field(default_factory=list)
+    query_count: int = 0
+
+
+_current: ContextVar[Optional[Capture]] = ContextVar("profile_capture", default=None)
+
+
+def check_token(value: Optional[str]) -> bool:
+    """未设置PROFILE_TOKEN时一律拒绝"""
+    return bool(PROFILE_TOKEN) and value is not None and hmac.compare_digest(value, PROFILE_TOKEN)
+
+
+class _Sampler:
+    """后台采样线程：有请求被采样时按间隔读取各线程的当前栈帧，没有时阻塞等待"""
+
+    def __init__(self):
+        self._captures: Set[Capture] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[Any, str] = {}
+
+    def start(self, capture: Capture) -> None:
+        with self._lock:
+            self._captures.add(capture)
+            # 在worker进程中第一次采样时才启动线程（fork不复制线程）
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+            self._wakeup.set()
+
+    def stop(self, capture: Capture) -> None:
+        with self._lock:
+            self._captures.discard(capture)
+
+    def _run(self) -> None:
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                captures = list(self._captures)
+                if not captures:
+                    self._wakeup.clear()
+                    continue
+            frames = sys._current_frames()
+            for capture in captures:
+                for thread_id in tuple(capture.threads):
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        capture.stacks[self._fold(frame)] += 1
+            del frames
+            time.sleep(interval)
+
+    def _fold(self, frame: Any) -> str:
+        """调用栈折叠为 "外层;...;内层" 格式（flamegraph.pl / speedscope可直接读取）"""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            names.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+_sampler = _Sampler()
+
+
+def _track_thread(endpoint: Callable) -> Callable:
+    """端点执行期间把执行它的线程登记到被采样的请求上"""
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def tracked_async(*args: Any, **kwargs: Any) -> Any:
+            capture = _current.get()
+            if capture is None or not capture.profiled:
+                return await endpoint(*args, **kwargs)
+            thread_id = threading.get_ident()
+            capture.threads.add(thread_id)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                capture.threads.discard(thread_id)
+        return tracked_async
+
+    @wraps(endpoint)
+    def tracked(*args: Any, **kwargs: Any) -> Any:
+        capture = _current.get()
+        if capture is None or not capture.profiled:
+            return endpoint(*args, **kwargs)
+        thread_id = threading.get_ident()
+        capture.threads.add(thread_id)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            capture.threads.discard(thread_id)
+    return tracked
+
+
+class ProfiledRoute(APIRoute):
+    """实体路由使用的路由类：启用诊断时包装端点以便采样执行它的线程"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, _track_thread(endpoint) if PROFILE_ENABLED else endpoint, **kwargs)
+
+
+def _header(scope: dict, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """决定是否采样请求，请求结束后按触发条件保存诊断数据"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = _header(scope, PROFILE_HEADER)
+        forced = requested is not None and check_token(requested)
+        capture = Capture(profiled=forced or random.random() < PROFILE_SAMPLE_RATE, forced=forced)
+        status = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current.set(capture)
+        if capture.profiled:
+            _sampler.start(capture)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed_ms = (perf_counter() - start) * 1000
+            _sampler.stop(capture)
+            _current.reset(token)
+            if forced or elapsed_ms >= PROFILE_SLOW_MS:
+                await run_in_threadpool(save_capture, capture, scope, status, elapsed_ms)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    if _current.get() is not None:
+        conn.info["profile_query_start"] = perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    start = conn.info.pop("profile_query_start", None)
+    capture = _current.get()
+    if start is None or capture is None:
+        return
+    capture.query_count += 1
+    if len(capture.queries) < MAX_QUERIES:
+        capture.queries.append((statement, (perf_counter() - start) * 1000))
+
+
+def record_queries(engine: Any) -> None:
+    """把引擎执行的SQL记入当前请求（只记录语句，不记录参数）"""
+    if not PROFILE_ENABLED:
+        return
+    target = getattr(engine, "sync_engine", engine)
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def _statement_summary(queries: List[Tuple[str, float]]) -> List[dict]:
+    """按语句汇总次数和耗时，耗时多的在前；同一语句执行很多次通常是N+1查询"""
+    totals: Dict[str, List[float]] = {}
+    for statement, duration in queries:
+        totals.setdefault(statement, []).append(duration)
+    summary = [
+        {"statement": statement, "count": len(durations), "total_ms": round(sum(durations), 3), "max_ms": round(max(durations), 3)}
+        for statement, durations in totals.items()
+    ]
+    return sorted(summary, key=lambda row: row["total_ms"], reverse=True)
+
+
+def save_capture(capture: Capture, scope: dict, status: int, elapsed_ms: float) -> None:
+    """写入PROFILE_DIR（先写临时文件再改名，浏览时不会读到写了一半的文件），超出数量时删除最旧的"""
+    now = datetime.now(timezone.utc)
+    # 以时间开头（精确到微秒），文件名顺序即保存顺序
+    profile_id = f"{now:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    record = {
+        "id": profile_id,
+        "time": now.isoformat(),
+        "method": scope["method"],
+        "path": scope["path"],
+        "query_string": scope["query_string"].decode("latin-1"),
+        "route": getattr(scope.get("route"), "path", None),
+        "status": status,
+        "duration_ms": round(elapsed_ms, 3),
+        "trigger": "header" if capture.forced else "sample" if capture.profiled else "slow",
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "samples": sum(capture.stacks.values()),
+        "query_count": capture.query_count,
+        "query_ms": round(sum(duration for _, duration in capture.queries), 3),
+        "statements": _statement_summary(capture.queries),
+        "queries": [{"statement": statement, "duration_ms": round(duration, 3)} for statement, duration in capture.queries],
+        "stacks": dict(capture.stacks.most_common()),
+    }
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        temporary = PROFILE_DIR / f".{profile_id}.tmp"
+        temporary.write_text(json.dumps(record, ensure_ascii=False))
+        os.replace(temporary, PROFILE_DIR / f"{profile_id}.json")
+        for old in sorted(PROFILE_DIR.glob("*.json"))[:-PROFILE_MAX_FILES]:
+            old.unlink(missing_ok=True)
+    except OSError:
+        logger.exception("Failed to save profile %s", profile_id)
+
+
+def list_profiles(limit: int) -> List[dict]:
+    """最近保存的诊断记录摘要，新的在前"""
+    summaries = []
+    for path in sorted(PROFILE_DIR.glob("*.json"), reverse=True)[:limit]:
+        try:
+            record = json.loads(path.read_text())
+        except (OSError, ValueError):  # 刚被其他worker清理
+            continue
+        summaries.append({name: record.get(name) for name in SUMMARY_FIELDS})
+    return summaries
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    try:
+        return json.loads((PROFILE_DIR / f"{profile_id}.json").read_text())
+    except FileNotFoundError:
+        return None
+
+
+def folded_stacks(stacks: Dict[str, int]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+
+
+FLAME_WIDTH = 1200
+FLAME_ROW = 16
+# 窄于该宽度（像素）的帧不绘制
+FLAME_MIN_WIDTH = 0.5
+
+
+def flamegraph_svg(stacks: Dict[str, int], title: str) -> str:
+    """由折叠调用栈生成火焰图SVG：宽度与样本数成正比，底部是最外层调用，悬停显示样本数"""
+    root: Dict[str, Any] = {"count": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["count"] += count
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"count": 0, "children": {}})
+            node["count"] += count
+    total = root["count"] or 1
+    frames: List[Tuple[str, int, float, int, float]] = []
+
+    def layout(node: Dict[str, Any], x: float, depth: int) -> None:
+        for name, child in sorted(node["children"].items()):
+            width = child["count"] / total * FLAME_WIDTH
+            if width >= FLAME_MIN_WIDTH:
+                frames.append((name, child["count"], x, depth, width))
+                layout(child, x, depth + 1)
+            x += width
+
+    layout(root, 0.0, 0)
+    depth = max((frame[3] for frame in frames), default=0) + 1
+    height = (depth + 2) * FLAME_ROW
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{FLAME_WIDTH}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="{FLAME_ROW - 4}">{html.escape(title)} ({root["count"]} samples)</text>',
+    ]
+    for name, count, x, level, width in frames:
+        y = height - (level + 1) * FLAME_ROW
+        hue = zlib.crc32(name.encode()) % 55
+        label = html.escape(name)
+        parts.append(
+            f'<g><title>{label} ({count} samples, {count * 100 / total:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{FLAME_ROW - 1}" fill="hsl({hue},85%,60%)"/>'
+        )
+        chars = int(width // 7)
+        if chars >= 3:
+            text = name if len(name) <= chars else name[:chars - 2] + ".."
+            parts.append(f'<text x="{x + 3:.1f}" y="{y + FLAME_ROW - 4}">{html.escape(text)}</text>')
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
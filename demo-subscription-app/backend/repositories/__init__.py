@@ -0,0 +1,3 @@
+from .sql import SqlRepository
+from .subscription_repository import get_subscription_repository
+from .paymentRecord_repository import PaymentRecordRepository, get_paymentRecord_repository
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+PaymentRecord 数据仓储
+把paymentRecord表绑定到通用仓储：数据库模式用PaymentRecordRepository，内存模式用MemoryRepository
+"""
+
+from datetime import datetime
+from typing import List, Optional, Set
+from fastapi import Depends
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import STORAGE_BACKEND, get_db
+from filters import query_fields
+from repositories.journal import open_journal
+from repositories.memory import MemoryRepository
+from repositories.sql import SqlRepository
+from stats import SOURCE_COLUMNS, apply_summary_delta, memory_summary, summary_delta
+from tables.common import utcnow
+from tables.paymentRecord import PaymentRecordTable
+
+
+class PaymentRecordRepository(SqlRepository):
+    """paymentRecord的数据库仓储：写入时在同一事务内按汇总前后的差值增量更新汇总表"""
+
+    async def create(self, data: dict) -> PaymentRecordTable:
+        """插入一行，flush取得列默认值后计入汇总，与插入同一次提交"""
+        row = PaymentRecordTable(**data)
+        self.db.add(row)
+        await self.db.flush()
+        await apply_summary_delta(self.db, summary_delta(added=[row]))
+        await self.db.commit()
+        return row
+
+    async def update(self, item_id: str, data: dict, expected: Optional[List[datetime]] = None) -> Optional[PaymentRecordTable]:
+        """条件更新同SqlRepository.update；修改了汇总相关的列时，同一事务内先锁定该行读取旧值，再按差值更新汇总"""
+        before = None
+        if any(name in data for name in SOURCE_COLUMNS):
+            locked = (
+                select(*(getattr(PaymentRecordTable, name) for name in SOURCE_COLUMNS))
+                .where(PaymentRecordTable.id == item_id)
+                .with_for_update()
+            )
+            before = (await self.db.execute(locked)).mappings().one_or_none()
+        row = (await self.db.scalars(self._update_statement(item_id, data, expected))).one_or_none()
+        if row is not None and before is not None:
+            await apply_summary_delta(self.db, summary_delta(removed=[before], added=[row]))
+        await self.db.commit()
+        await self._check_version(row, item_id, expected)
+        return row
+
+    async def delete(self, item_id: str) -> bool:
+        """按主键删除，一条 DELETE ... RETURNING 同时取回汇总所需的列"""
+        stmt = (
+            delete(PaymentRecordTable)
+            .where(PaymentRecordTable.id == item_id)
+            .returning(*(getattr(PaymentRecordTable, name) for name in SOURCE_COLUMNS))
+        )
+        removed = (await self.db.execute(stmt)).mappings().all()
+        await apply_summary_delta(self.db, summary_delta(removed=removed))
+        await self.db.commit()
+        return bool(removed)
+
+    async def create_many(self, rows: List[dict]) -> List[PaymentRecordTable]:
+        """批量插入同SqlRepository.create_many，插入的行在同一事务内计入汇总"""
+        if not rows:
+            return []
+        stmt = insert(PaymentRecordTable).returning(PaymentRecordTable, sort_by_parameter_order=True)
+        created = list(await self.db.scalars(stmt, rows))
+        await apply_summary_delta(self.db, summary_delta(added=created))
+        await self.db.commit()
+        return created
+
+    async def update_many(self, changes: List[dict]) -> Set[str]:
+        """
+        批量更新：一次IN查询锁定存在的行并取回汇总所需的旧值，再逐条 UPDATE ... RETURNING（见_update_statement），
+        按返回的行确定已更新的id和新值；汇总增量按提交顺序逐条折算，同一id出现多次时与最终写入的值一致
+        """
+        ids = {change["id"] for change in changes}
+        if not ids:
+            return set()
+        columns = [getattr(PaymentRecordTable, name) for name in SOURCE_COLUMNS]
+        stmt = select(PaymentRecordTable.id, *columns).where(PaymentRecordTable.id.in_(ids)).with_for_update()
+        current = {row["id"]: dict(row) for row in (await self.db.execute(stmt)).mappings()}
+        now = utcnow()
+        removed, added = [], []
+        for change in changes:
+            if change["id"] not in current:
+                continue
+            values = {name: value for name, value in change.items() if name != "id"}
+            row = (await self.db.scalars(self._update_statement(change["id"], dict(values, updated_at=now)))).one_or_none()
+            if row is None:
+                continue
+            removed.append(current[row.id])
+            current[row.id] = {"id": row.id, **{name: getattr(row, name) for name in SOURCE_COLUMNS}}
+            added.append(current[row.id])
+        if added:
+            await apply_summary_delta(self.db, summary_delta(removed, added))
+        await self.db.commit()
+        return {row["id"] for row in added}
+
+    async def delete_many(self, ids: List[str]) -> Set[str]:
+        """批量删除：一条 DELETE ... WHERE id IN (...) RETURNING，同时取回汇总所需的列，返回已删除的id"""
+        if not ids:
+            return set()
+        stmt = (
+            delete(PaymentRecordTable)
+            .where(PaymentRecordTable.id.in_(ids))
+            .returning(PaymentRecordTable.id, *(getattr(PaymentRecordTable, name) for name in SOURCE_COLUMNS))
+            .execution_options(synchronize_session=False)
+        )
+        removed = (await self.db.execute(stmt)).mappings().all()
+        await apply_summary_delta(self.db, summary_delta(removed=removed))
+        await self.db.commit()
+        return {row["id"] for row in removed}
+
+
+# 列表接口可过滤/排序的列，从表定义和索引推导
+QUERY_FIELDS = query_fields(PaymentRecordTable)
+
+# 内存模式下本进程内所有请求共享同一个存储
+memory_repository = MemoryRepository(PaymentRecordTable, listeners=[memory_summary.record], journal=open_journal("paymentRecord"))
+
+# 依赖本身不做IO，声明为async以免每个请求都进入线程池
+async def _database_repository(db: AsyncSession = Depends(get_db)) -> PaymentRecordRepository:
+    return PaymentRecordRepository(PaymentRecordTable, db)
+
+async def _memory_repository() -> MemoryRepository:
+    return memory_repository
+
+# 路由依赖：启动时按STORAGE_BACKEND选定存储实现
+get_paymentRecord_repository = _memory_repository if STORAGE_BACKEND == "memory" else _database_repository
@@ -0,0 +1,224 @@
+"""
+数据库仓储
+列表查询下推到SQL：过滤条件、排序和键集分页都翻译成WHERE / ORDER BY，由排序列上的索引完成，不把整表拉到应用层
+SqlRepository按ORM表类参数化（与MemoryRepository(table)对应），所有实体共用同一份SQL；
+需要在写入时附带额外处理的实体（如汇总表的增量更新）在实体仓储模块中继承并覆盖写方法
+"""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from sqlalchemy import RowMapping, and_, delete, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from conditional import VersionConflict
+from database import new_session
+from export import EXPORT_BATCH_SIZE
+from filters import ListQuery
+from pagination import Cursor
+from search import like_search, parse_query, postgres_hits, postgres_search, rank_rows
+from tables.common import utcnow
+
+# IN (...) 列表分块大小，避免超出数据库的绑定参数上限
+IN_CHUNK_SIZE = 1000
+
+
+def _condition(column: Any, op: str, value: Any) -> Any:
+    if op == "ne":
+        return column != value
+    if op == "gt":
+        return column > value
+    if op == "gte":
+        return column >= value
+    if op == "lt":
+        return column < value
+    if op == "lte":
+        return column <= value
+    if op == "in":
+        return column.in_(value)
+    return column == value
+
+
+def _seek(column: Any, id_column: Any, query: ListQuery) -> Any:
+    """
+    排在游标之后的行
+    NULL视为最大值（升序NULLS LAST、降序NULLS FIRST），与B树索引的默认顺序一致，正反向扫描都能用上索引
+    """
+    value, item_id = query.after
+    if not query.nullable_sort:
+        key = tuple_(column, id_column)
+        return key < tuple_(value, item_id) if query.descending else key > tuple_(value, item_id)
+    if query.descending:
+        if value is None:
+            return or_(and_(column.is_(None), id_column < item_id), column.isnot(None))
+        return tuple_(column, id_column) < tuple_(value, item_id)
+    if value is None:
+        return and_(column.is_(None), id_column > item_id)
+    return or_(tuple_(column, id_column) > tuple_(value, item_id), column.is_(None))
+
+
+def apply_list_query(stmt: Any, table: Any, query: ListQuery) -> Any:
+    """把过滤、排序和游标条件加到select语句上"""
+    for name, op, value in query.filters:
+        stmt = stmt.where(_condition(getattr(table, name), op, value))
+    column = getattr(table, query.sort)
+    if query.after is not None:
+        stmt = stmt.where(_seek(column, table.id, query))
+    if query.descending:
+        order = column.desc().nulls_first() if query.nullable_sort else column.desc()
+        return stmt.order_by(order, table.id.desc())
+    order = column.asc().nulls_last() if query.nullable_sort else column.asc()
+    return stmt.order_by(order, table.id.asc())
+
+
+class SqlRepository:
+    """
+    一张表的数据库仓储，每个请求使用get_db提供的会话创建
+    search_columns为全文检索的列（见tables中的SEARCH_COLUMNS），不提供检索的实体不传
+    """
+
+    def __init__(self, table: Any, db: AsyncSession, search_columns: Optional[Dict[str, str]] = None):
+        self.table = table
+        self.db = db
+        self.search_columns = search_columns
+
+    async def list(self, query: ListQuery, skip: int = 0, limit: int = 100) -> List[Any]:
+        """
+        过滤和排序下推到SQL，按(排序列, id)分页，默认按(created_at, id)，与对应索引的顺序一致
+        query.after（上一页最后一行的排序键）存在时做键集分页，直接在索引上定位，不再OFFSET扫描
+        """
+        stmt = apply_list_query(select(self.table), self.table, query).limit(limit)
+        if query.after is None and skip:
+            stmt = stmt.offset(skip)
+        return list(await self.db.scalars(stmt))
+
+    async def stream(self, query: ListQuery) -> AsyncIterator[RowMapping]:
+        """
+        导出用：服务端游标按批读取（yield_per），内存占用与表大小无关
+        只查询列而不构建ORM对象；使用独立会话，流式发送期间不依赖请求级会话的生命周期
+        """
+        stmt = apply_list_query(select(*self.table.__table__.columns), self.table, query)
+        async with new_session() as session:
+            result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            try:
+                async for row in result.mappings():
+                    yield row
+            finally:
+                # 客户端中途断开时生成器被关闭，先关闭服务端游标，会话随后归还连接
+                await result.close()
+
+    async def list_by(self, column: str, values: List[Any]) -> List[Any]:
+        """按某列批量查询（include=加载关联数据），每块一条 WHERE 列 IN (...) 查询"""
+        rows: List[Any] = []
+        for start in range(0, len(values), IN_CHUNK_SIZE):
+            chunk = values[start:start + IN_CHUNK_SIZE]
+            stmt = (
+                select(self.table)
+                .where(getattr(self.table, column).in_(chunk))
+                .order_by(self.table.created_at, self.table.id)
+            )
+            rows.extend(await self.db.scalars(stmt))
+        return rows
+
+    async def search(self, text: str, after: Optional[Cursor] = None, limit: int = 20) -> List[dict]:
+        """
+        全文检索，返回 {item, rank, highlight} 列表，按 (相关度, id) 降序键集分页
+        PostgreSQL：search_vector @@ websearch_to_tsquery 走GIN索引，相关度和高亮片段只对返回的一页计算
+        其他数据库（如开发用SQLite）：LIKE筛选候选行，再在应用层分词、计算相关度和高亮
+        """
+        query = parse_query(text)
+        if not query.groups:
+            return []
+        if self.db.bind.dialect.name == "postgresql":
+            result = await self.db.execute(postgres_search(self.table, self.search_columns, text, after, limit))
+            return postgres_hits(result, self.search_columns)
+        rows = await self.db.scalars(like_search(self.table, self.search_columns, query))
+        return rank_rows(rows, self.search_columns, query, after, limit)
+
+    async def get(self, item_id: str) -> Optional[Any]:
+        """按主键查询"""
+        return await self.db.get(self.table, item_id)
+
+    async def create(self, data: dict) -> Any:
+        """插入一行，id和时间戳由列默认值生成"""
+        row = self.table(**data)
+        self.db.add(row)
+        await self.db.commit()
+        return row
+
+    def _update_statement(self, item_id: str, data: dict, expected: Optional[List[datetime]] = None) -> Any:
+        """
+        UPDATE ... SET <提交的列> WHERE id = :id [AND updated_at IN (:expected)] RETURNING
+        populate_existing：同一会话中已加载过该行时（如批量更新同一id多次），用返回的值刷新已有对象
+        """
+        stmt = (
+            update(self.table)
+            .where(self.table.id == item_id)
+            .values(**data)
+            .returning(self.table)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        if expected is not None:
+            stmt = stmt.where(self.table.updated_at.in_(expected))
+        return stmt
+
+    async def update(self, item_id: str, data: dict, expected: Optional[List[datetime]] = None) -> Optional[Any]:
+        """
+        一条 UPDATE ... RETURNING（见_update_statement），
+        版本比较和写入在同一条语句中完成，多个worker并发更新同一行不会丢失修改；updated_at由onupdate刷新
+        没有更新到行时：记录不存在返回None，记录存在但版本已变化抛出VersionConflict
+        """
+        row = (await self.db.scalars(self._update_statement(item_id, data, expected))).one_or_none()
+        await self.db.commit()
+        await self._check_version(row, item_id, expected)
+        return row
+
+    async def _check_version(self, row: Optional[Any], item_id: str, expected: Optional[List[datetime]]) -> None:
+        """条件更新没有更新到行而记录仍存在时，说明版本已变化"""
+        if row is None and expected is not None and await self.db.get(self.table, item_id) is not None:
+            raise VersionConflict(item_id)
+
+    async def delete(self, item_id: str) -> bool:
+        """按主键删除，一条DELETE语句完成"""
+        result = await self.db.execute(delete(self.table).where(self.table.id == item_id))
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def create_many(self, rows: List[dict]) -> List[Any]:
+        """
+        批量插入：SQLAlchemy把参数列表拼成多行 INSERT ... VALUES (...), (...) RETURNING，
+        每批一次往返，结果按输入顺序返回
+        """
+        if not rows:
+            return []
+        stmt = insert(self.table).returning(self.table, sort_by_parameter_order=True)
+        created = list(await self.db.scalars(stmt, rows))
+        await self.db.commit()
+        return created
+
+    async def update_many(self, changes: List[dict]) -> Set[str]:
+        """
+        批量更新：同一事务内每条修改一条 UPDATE ... RETURNING（见_update_statement），按返回的行确定已更新的id；
+        不先查询存在的id，查询之后被删除的行不会算作已更新
+        """
+        now = utcnow()
+        updated = set()
+        for change in changes:
+            values = {name: value for name, value in change.items() if name != "id"}
+            row = (await self.db.scalars(self._update_statement(change["id"], dict(values, updated_at=now)))).one_or_none()
+            if row is not None:
+                updated.add(row.id)
+        await self.db.commit()
+        return updated
+
+    async def delete_many(self, ids: List[str]) -> Set[str]:
+        """批量删除：一条 DELETE ... WHERE id IN (...) RETURNING id，返回已删除的id"""
+        if not ids:
+            return set()
+        stmt = (
+            delete(self.table)
+            .where(self.table.id.in_(ids))
+            .returning(self.table.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = set(await self.db.scalars(stmt))
+        await self.db.commit()
+        return deleted
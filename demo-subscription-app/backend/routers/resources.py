@@ -0,0 +1,46 @@
+"""
+实体接口声明
+每个实体一条Resource，main.py按声明用通用CRUD引擎（routers/crud.py）注册路由
+关联由外键推导，可通过include=一并返回，每个关联一条批量查询
+"""
+
+from typing import List
+from includes import Relation
+from models.subscription import Subscription, SubscriptionCreate, SubscriptionUpdate, SubscriptionBulkUpdate
+from models.paymentRecord import PaymentRecord, PaymentRecordCreate, PaymentRecordUpdate, PaymentRecordBulkUpdate
+from models.relations import SubscriptionWithRelations, PaymentRecordWithRelations
+from repositories import subscription_repository, paymentRecord_repository
+from routers.crud import Resource
+
+RESOURCES: List[Resource] = [
+    Resource(
+        name="subscription",
+        title="Subscription",
+        tag="订阅服务",
+        model=Subscription,
+        create_model=SubscriptionCreate,
+        update_model=SubscriptionUpdate,
+        bulk_update_model=SubscriptionBulkUpdate,
+        repository=subscription_repository.get_subscription_repository,
+        query_fields=subscription_repository.QUERY_FIELDS,
+        read_model=SubscriptionWithRelations,
+        relations=[
+            Relation(name="paymentRecords", namespace="paymentRecord", foreign_key="subscriptionId", many=True, model=PaymentRecord, repository=paymentRecord_repository.get_paymentRecord_repository),
+        ],
+    ),
+    Resource(
+        name="paymentRecord",
+        title="PaymentRecord",
+        tag="支付记录",
+        model=PaymentRecord,
+        create_model=PaymentRecordCreate,
+        update_model=PaymentRecordUpdate,
+        bulk_update_model=PaymentRecordBulkUpdate,
+        repository=paymentRecord_repository.get_paymentRecord_repository,
+        query_fields=paymentRecord_repository.QUERY_FIELDS,
+        read_model=PaymentRecordWithRelations,
+        relations=[
+            Relation(name="subscription", namespace="subscription", foreign_key="subscriptionId", many=False, model=Subscription, repository=subscription_repository.get_subscription_repository),
+        ],
+    ),
+]
@@ -0,0 +1,99 @@
+"""
+统计路由
+/stats/spend 只读汇总表，不扫描paymentRecord明细；/stats/upcoming 按计费周期推算subscription的续费，数据库模式在SQL中预筛选
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import STORAGE_BACKEND, get_db
+from models.subscription import Subscription
+from profiling import ProfiledRoute
+from repositories.paymentRecord_repository import memory_repository
+from repositories.subscription_repository import memory_repository as subscription_memory
+from stats import load_renewal_candidates, load_summary, memory_renewal_candidates, memory_summary, spend_report, upcoming_renewals
+
+router = APIRouter(route_class=ProfiledRoute)
+
+class SpendBucket(BaseModel):
+    """某个维度取值下的计数和金额合计"""
+    key: str = Field(..., description="维度取值，月份为YYYY-MM")
+    count: int = Field(..., description="记录数")
+    total: float = Field(..., description="amount合计")
+
+class SpendReport(BaseModel):
+    """支出汇总"""
+    count: int = Field(..., description="记录总数")
+    total: float = Field(..., description="amount总计")
+    by_month: List[SpendBucket] = Field(..., description="按月汇总")
+    by_subscriptionId: List[SpendBucket] = Field(..., description="按subscriptionId汇总")
+    by_paymentStatus: List[SpendBucket] = Field(..., description="按paymentStatus汇总")
+
+class UpcomingRenewal(BaseModel):
+    """即将续费的Subscription"""
+    subscription: Subscription
+    next_renewal: datetime = Field(..., description="下次续费时间")
+    days_left: int = Field(..., description="距下次续费的天数，已过续费时间为负数")
+
+class UpcomingReport(BaseModel):
+    """即将续费汇总"""
+    days: int = Field(..., description="查询的天数范围")
+    count: int = Field(..., description="即将续费的数量")
+    total: float = Field(..., description="这些续费的price合计")
+    items: List[UpcomingRenewal]
+
+async def _database_summary(db: AsyncSession = Depends(get_db)):
+    return await load_summary(db)
+
+async def _memory_summary():
+    return memory_summary.rows()
+
+# 启动时按STORAGE_BACKEND选定汇总来源
+get_summary_rows = _memory_summary if STORAGE_BACKEND == "memory" else _database_summary
+
+@router.get("/spend", response_model=SpendReport)
+async def get_spend(rows=Depends(get_summary_rows)):
+    """支出汇总：总计，以及按月、按subscriptionId、按paymentStatus的计数和合计"""
+    return spend_report(rows)
+
+@dataclass(frozen=True)
+class RenewalWindow:
+    """/stats/upcoming的查询范围"""
+    days: int
+    now: datetime
+
+    @property
+    def horizon(self) -> datetime:
+        return self.now + timedelta(days=self.days)
+
+async def renewal_window(days: int = Query(30, ge=0, le=3660, description="查看未来多少天内的续费")) -> RenewalWindow:
+    return RenewalWindow(days, datetime.now(timezone.utc))
+
+async def _database_renewals(window: RenewalWindow = Depends(renewal_window), db: AsyncSession = Depends(get_db)):
+    return await load_renewal_candidates(db, window.horizon)
+
+async def _memory_renewals():
+    return memory_renewal_candidates(subscription_memory.store.scan(), memory_repository.store.scan())
+
+get_renewal_candidates = _memory_renewals if STORAGE_BACKEND == "memory" else _database_renewals
+
+@router.get("/upcoming", response_model=UpcomingReport)
+async def get_upcoming(window: RenewalWindow = Depends(renewal_window), candidates=Depends(get_renewal_candidates)):
+    """
+    未来days天内续费的Subscription，按续费时间排序；已过续费时间的days_left为负数
+    续费时间从最近一次paymentRecord的paymentDate（没有记录时从创建时间）起推一个计费周期
+    """
+    items = [
+        UpcomingRenewal(subscription=Subscription.model_validate(record), next_renewal=renewal, days_left=(renewal - window.now).days)
+        for record, renewal in upcoming_renewals(candidates, window.horizon)
+    ]
+    return UpcomingReport(
+        days=window.days,
+        count=len(items),
+        total=round(sum(item.subscription.price or 0 for item in items), 2),
+        items=items,
+    )
+
@@ -0,0 +1,266 @@
+"""
+PaymentRecord汇总（/stats）
+汇总表按 (维度, 取值) 保存计数和合计，paymentRecord的每次写入在同一事务内增量更新，
+汇总接口只读汇总表，耗时与paymentRecord的行数无关
+续费时间从subscription最近一次paymentRecord的paymentDate（没有记录时从创建时间）起按计费周期（billingCycle）推算
+"""
+
+import calendar
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from export import EXPORT_BATCH_SIZE
+from tables.paymentRecord import PaymentRecordTable
+from tables.summary import SummaryTable
+from tables.subscription import SubscriptionTable
+
+AMOUNT = "amount"
+DATE = "paymentDate"
+GROUP_BY = ("subscriptionId", "paymentStatus")
+# 汇总所需的明细列；更新前和删除时（RETURNING）只取这些列
+SOURCE_COLUMNS = (AMOUNT, DATE, *GROUP_BY)
+# "all"维度只有一行，即总计数和总金额
+DIMENSIONS = ("month", *GROUP_BY)
+
+# (维度, 取值) -> [计数增量, 金额增量]
+Delta = Dict[Tuple[str, str], List[float]]
+SummaryRow = Tuple[str, str, int, float]
+
+
+def _field(item: Any, name: str) -> Any:
+    return item.get(name) if hasattr(item, "get") else getattr(item, name)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _buckets(row: Any) -> Iterable[Tuple[str, str]]:
+    yield "all", ""
+    date = _field(row, DATE)
+    if date is not None:
+        yield "month", _utc(date).strftime("%Y-%m")
+    for name in GROUP_BY:
+        value = _field(row, name)
+        if value is not None:
+            yield name, str(value)
+
+
+def _accumulate(delta: Delta, row: Any, sign: int) -> None:
+    amount = float(_field(row, AMOUNT) or 0)
+    for key in _buckets(row):
+        entry = delta[key]
+        entry[0] += sign
+        entry[1] += sign * amount
+
+
+def summary_delta(removed: Iterable[Any] = (), added: Iterable[Any] = ()) -> Delta:
+    """写入前后的明细行折算为汇总增量；更新 = 减去旧行 + 加上新行"""
+    delta: Delta = defaultdict(lambda: [0, 0.0])
+    for row in removed:
+        _accumulate(delta, row, -1)
+    for row in added:
+        _accumulate(delta, row, 1)
+    return {key: value for key, value in delta.items() if value[0] or value[1]}
+
+
+async def apply_summary_delta(db: AsyncSession, delta: Delta) -> None:
+    """
+    在调用方的事务内合并增量：INSERT ... ON CONFLICT DO UPDATE 在数据库端原子累加，并发写入不会丢失更新
+    按主键顺序写入，并发事务的加锁顺序一致；计数归零的行随后删除
+    """
+    if not delta:
+        return
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(SummaryTable).values([
+        {"dimension": dimension, "bucket": bucket, "count": count, "total": total}
+        for (dimension, bucket), (count, total) in sorted(delta.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SummaryTable.dimension, SummaryTable.bucket],
+        set_={"count": SummaryTable.count + stmt.excluded.count, "total": SummaryTable.total + stmt.excluded.total},
+    )
+    await db.execute(stmt)
+    if any(count < 0 for count, _ in delta.values()):
+        await db.execute(delete(SummaryTable).where(SummaryTable.count <= 0))
+
+
+async def load_summary(db: AsyncSession) -> List[SummaryRow]:
+    """读取整张汇总表；行数只与月份数和各维度的取值个数有关"""
+    result = await db.execute(select(SummaryTable.dimension, SummaryTable.bucket, SummaryTable.count, SummaryTable.total))
+    return [tuple(row) for row in result]
+
+
+async def rebuild_summary(db: AsyncSession) -> None:
+    """
+    从明细表重算汇总（接入已有数据或修复时使用，执行期间应暂停写入）
+    服务端游标分批读取明细，只在内存中保留汇总结果
+    """
+    stmt = select(*(getattr(PaymentRecordTable, name) for name in SOURCE_COLUMNS))
+    rows = (await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))).mappings()
+    delta: Delta = defaultdict(lambda: [0, 0.0])
+    async for row in rows:
+        _accumulate(delta, row, 1)
+    await db.execute(delete(SummaryTable))
+    await apply_summary_delta(db, delta)
+    await db.commit()
+
+
+class MemorySummary:
+    """内存模式的汇总，作为内存仓储的写入回调"""
+
+    def __init__(self):
+        self._rows: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, removed: Iterable[dict], added: Iterable[dict]) -> None:
+        delta = summary_delta(removed, added)
+        with self._lock:
+            for key, (count, total) in delta.items():
+                entry = self._rows.setdefault(key, [0, 0.0])
+                entry[0] += count
+                entry[1] += total
+                if entry[0] <= 0:
+                    del self._rows[key]
+
+    def reset(self, records: Iterable[dict]) -> None:
+        with self._lock:
+            self._rows = {}
+        self.record((), records)
+
+    def rows(self) -> List[SummaryRow]:
+        with self._lock:
+            return [(dimension, bucket, count, total) for (dimension, bucket), (count, total) in self._rows.items()]
+
+
+memory_summary = MemorySummary()
+
+
+def spend_report(rows: Iterable[SummaryRow]) -> Dict[str, Any]:
+    """汇总行整理为 总计 + 各维度明细"""
+    report: Dict[str, Any] = {"count": 0, "total": 0.0, **{f"by_{dimension}": [] for dimension in DIMENSIONS}}
+    for dimension, bucket, count, total in sorted(rows):
+        if dimension == "all":
+            report["count"], report["total"] = count, round(total, 2)
+        elif dimension in DIMENSIONS:
+            report[f"by_{dimension}"].append({"key": bucket, "count": count, "total": round(total, 2)})
+    return report
+
+
+# 计费周期单位 -> (月数, 天数)
+CYCLE_UNITS = {
+    **dict.fromkeys(("d", "day", "days", "daily", "天", "日"), (0, 1)),
+    **dict.fromkeys(("w", "week", "weeks", "weekly", "周", "星期"), (0, 7)),
+    **dict.fromkeys(("m", "mo", "month", "months", "monthly", "月", "个月"), (1, 0)),
+    **dict.fromkeys(("q", "quarter", "quarters", "quarterly", "季", "季度", "个季度"), (3, 0)),
+    **dict.fromkeys(("y", "yr", "year", "years", "yearly", "annual", "annually", "年"), (12, 0)),
+}
+_CYCLE = re.compile(r"^(\d+)?\s*(\D*)$")
+
+CYCLE = "billingCycle"
+# 没有paymentRecord记录时从记录创建时间起算
+START = "created_at"
+# 按月推回截止时间时，月末取整（1月31日加一个月为2月28日）最多差3天
+CUTOFF_SLACK = timedelta(days=3)
+
+
+def parse_cycle(value: Any) -> Optional[Tuple[int, int]]:
+    """计费周期文本 -> (月数, 天数)；支持 monthly / yearly / 3m / 30d / 每月 / 年付 等，无法识别时返回None"""
+    if value is None:
+        return None
+    text = str(value).strip().lower().lstrip("每按包").rstrip("付")
+    match = _CYCLE.match(text)
+    if match is None:
+        return None
+    count = int(match.group(1) or 1)
+    unit = match.group(2).strip()
+    if not unit:
+        return (0, count) if match.group(1) and count else None
+    if unit not in CYCLE_UNITS or not count:
+        return None
+    months, days = CYCLE_UNITS[unit]
+    return months * count, days * count
+
+
+def _shift(start: datetime, months: int, days: int, periods: int) -> datetime:
+    if not months:
+        return start + timedelta(days=days * periods)
+    index = start.month - 1 + months * periods
+    year, month = start.year + index // 12, index % 12 + 1
+    return start.replace(year=year, month=month, day=min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def next_renewal(anchor: datetime, cycle: Tuple[int, int]) -> datetime:
+    """起算时间（最近一次付款或创建时间）之后一个周期；按月的周期在月末取整，如1月31日按月续费为2月28日"""
+    months, days = cycle
+    return _shift(anchor, months, days, 1)
+
+
+def renewal_cutoff(cycle: Tuple[int, int], horizon: datetime) -> datetime:
+    """下次续费不晚于horizon的记录，其起算时间不晚于返回值；用于SQL预筛选，按月的周期留出月末取整的余量"""
+    months, days = cycle
+    if not months:
+        return horizon - timedelta(days=days)
+    return _shift(horizon, -months, 0, 1) + CUTOFF_SLACK
+
+
+def upcoming_renewals(candidates: Iterable[Tuple[Any, Optional[datetime]]], horizon: datetime) -> List[Tuple[Any, datetime]]:
+    """
+    (记录, 起算时间) -> 下次续费不晚于horizon的记录，按续费时间排序
+    已过续费时间仍未付款的也在其中；起算时间为None时取记录的创建时间，计费周期无法识别的记录跳过
+    """
+    upcoming = []
+    for record, anchor in candidates:
+        cycle = parse_cycle(_field(record, CYCLE))
+        if cycle is None:
+            continue
+        renewal = next_renewal(_utc(anchor or _field(record, START)), cycle)
+        if renewal <= horizon:
+            upcoming.append((record, renewal))
+    upcoming.sort(key=lambda pair: pair[1])
+    return upcoming
+
+
+async def load_renewal_candidates(db: AsyncSession, horizon: datetime) -> List[Tuple[Any, Optional[datetime]]]:
+    """
+    在数据库中预筛选可能在horizon之前续费的Subscription：计费周期的取值去重后只有少数几种，
+    按周期算出起算时间的截止点，只返回启用且起算时间不晚于截止点的记录；
+    起算时间为各Subscription最近一次paymentRecord的paymentDate（按subscriptionId分组取最大值），没有记录时为创建时间
+    """
+    cycles: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+    for value in await db.scalars(select(SubscriptionTable.billingCycle).distinct()):
+        cycle = parse_cycle(value)
+        if cycle is not None:
+            cycles[cycle].append(value)
+    if not cycles:
+        return []
+    last_paid = (
+        select(PaymentRecordTable.subscriptionId.label("key"), func.max(PaymentRecordTable.paymentDate).label("paid_at"))
+        .group_by(PaymentRecordTable.subscriptionId)
+        .subquery()
+    )
+    anchor = func.coalesce(last_paid.c.paid_at, SubscriptionTable.created_at)
+    stmt = select(SubscriptionTable, last_paid.c.paid_at).outerjoin(last_paid, last_paid.c.key == SubscriptionTable.id)
+    stmt = stmt.where(SubscriptionTable.isEnabled.is_(True))
+    stmt = stmt.where(or_(*(
+        and_(SubscriptionTable.billingCycle.in_(values), anchor <= renewal_cutoff(cycle, horizon))
+        for cycle, values in cycles.items()
+    )))
+    result = await db.execute(stmt)
+    return [(record, paid_at) for record, paid_at in result]
+
+
+def memory_renewal_candidates(records: Iterable[Any], payments: Iterable[Any]) -> List[Tuple[Any, Optional[datetime]]]:
+    """内存模式：启用的记录，以及按subscriptionId取得的最近一次paymentDate"""
+    last_paid: Dict[Any, datetime] = {}
+    for payment in payments:
+        key, paid_at = _field(payment, "subscriptionId"), _field(payment, DATE)
+        if paid_at is not None and (key not in last_paid or _utc(paid_at) > last_paid[key]):
+            last_paid[key] = _utc(paid_at)
+    return [(record, last_paid.get(_field(record, "id"))) for record in records if _field(record, "isEnabled")]
@@ -0,0 +1,3 @@
+from .subscription import SubscriptionTable
+from .paymentRecord import PaymentRecordTable
+from .summary import SummaryTable
\ No newline at end of file
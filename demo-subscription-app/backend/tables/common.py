@@ -0,0 +1,16 @@
+"""
+ORM表共用的默认值函数
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+
+def new_id() -> str:
+    """生成UUID字符串主键"""
+    return str(uuid.uuid4())
+
+
+def utcnow() -> datetime:
+    """带时区的当前时间，对应TIMESTAMPTZ"""
+    return datetime.now(timezone.utc)
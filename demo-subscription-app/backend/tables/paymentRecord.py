@@ -0,0 +1,27 @@
+"""
+PaymentRecord表定义
+与migration.sql中的 paymentRecord 表保持一致
+"""
+
+from sqlalchemy import Column, DateTime, Index, Numeric, String, func
+from database import Base, DB_SCHEMA
+from .common import new_id, utcnow
+
+class PaymentRecordTable(Base):
+    """PaymentRecord ORM映射"""
+    __tablename__ = "paymentRecord"
+    __table_args__ = (
+        Index("idx_paymentRecord_subscriptionId", "subscriptionId"),
+        Index("idx_paymentRecord_paymentDate", "paymentDate"),
+        Index("idx_paymentRecord_created_at", "created_at", "id"),
+        Index("idx_paymentRecord_updated_at", "updated_at"),
+        {"schema": DB_SCHEMA},
+    )
+
+    id = Column(String(255), primary_key=True, default=new_id)
+    subscriptionId = Column(String(255), nullable=False)
+    amount = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+    paymentDate = Column(DateTime(timezone=True), nullable=False)
+    paymentStatus = Column(String(255), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
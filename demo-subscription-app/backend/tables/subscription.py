@@ -0,0 +1,27 @@
+"""
+Subscription表定义
+与migration.sql中的 subscription 表保持一致
+"""
+
+from sqlalchemy import Column, Boolean, DateTime, Index, Numeric, String, false, func
+from database import Base, DB_SCHEMA
+from .common import new_id, utcnow
+
+class SubscriptionTable(Base):
+    """Subscription ORM映射"""
+    __tablename__ = "subscription"
+    __table_args__ = (
+        Index("idx_subscription_name", "name"),
+        Index("idx_subscription_created_at", "created_at", "id"),
+        Index("idx_subscription_updated_at", "updated_at"),
+        {"schema": DB_SCHEMA},
+    )
+
+    id = Column(String(255), primary_key=True, default=new_id)
+    name = Column(String(255), nullable=False)
+    price = Column(Numeric(10, 2, asdecimal=False), nullable=False)
+    billingCycle = Column(String(255), nullable=False)
+    isEnabled = Column(Boolean, nullable=False, default=False, server_default=false())
+    websiteLink = Column(String(500), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
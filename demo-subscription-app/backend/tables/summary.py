@@ -0,0 +1,17 @@
+"""
+PaymentRecord汇总表定义
+与migration.sql中的 paymentRecord_summary 表保持一致，由stats.py增量维护
+"""
+
+from sqlalchemy import BigInteger, Column, Numeric, String
+from database import Base, DB_SCHEMA
+
+class SummaryTable(Base):
+    """每个 (维度, 取值) 一行：记录数和金额合计"""
+    __tablename__ = "paymentRecord_summary"
+    __table_args__ = {"schema": DB_SCHEMA}
+
+    dimension = Column(String(64), primary_key=True)
+    bucket = Column(String(255), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    total = Column(Numeric(18, 2, asdecimal=False), nullable=False, default=0)
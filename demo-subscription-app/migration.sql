@@ -1,6 +1,6 @@
 CREATE SCHEMA IF NOT EXISTS subscription_tracker;
 
-CREATE TABLE subscription_tracker.subscription (
+CREATE TABLE subscription_tracker."subscription" (
   "id" VARCHAR(255) DEFAULT gen_random_uuid() NOT NULL,
   "name" VARCHAR(255) NOT NULL,
   "price" NUMERIC(10,2) NOT NULL,
@@ -9,10 +9,10 @@ CREATE TABLE subscription_tracker.subscription (
   "websiteLink" VARCHAR(500) NULL,
   "created_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
   "updated_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
-  CONSTRAINT pk_subscription PRIMARY KEY (id)
+  CONSTRAINT pk_subscription PRIMARY KEY ("id")
 );
 
-CREATE TABLE subscription_tracker.paymentRecord (
+CREATE TABLE subscription_tracker."paymentRecord" (
   "id" VARCHAR(255) DEFAULT gen_random_uuid() NOT NULL,
   "subscriptionId" VARCHAR(255) NOT NULL,
   "amount" NUMERIC(10,2) NOT NULL,
@@ -20,16 +20,38 @@ CREATE TABLE subscription_tracker.paymentRecord (
   "paymentStatus" VARCHAR(255) NOT NULL,
   "created_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
   "updated_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
-  CONSTRAINT pk_paymentRecord PRIMARY KEY (id)
+  CONSTRAINT pk_paymentRecord PRIMARY KEY ("id")
 );
 
-CREATE INDEX idx_subscription_name ON subscription_tracker.subscription (name);
-CREATE INDEX idx_subscription_created_at ON subscription_tracker.subscription (created_at);
-CREATE INDEX idx_subscription_updated_at ON subscription_tracker.subscription (updated_at);
+CREATE INDEX idx_subscription_name ON subscription_tracker."subscription" ("name");
+CREATE INDEX idx_subscription_created_at ON subscription_tracker."subscription" ("created_at", "id");
+CREATE INDEX idx_subscription_updated_at ON subscription_tracker."subscription" ("updated_at");
 
-CREATE INDEX idx_paymentRecord_paymentDate ON subscription_tracker.paymentRecord (paymentDate);
-CREATE INDEX idx_paymentRecord_created_at ON subscription_tracker.paymentRecord (created_at);
-CREATE INDEX idx_paymentRecord_updated_at ON subscription_tracker.paymentRecord (updated_at);
+CREATE INDEX idx_paymentRecord_subscriptionId ON subscription_tracker."paymentRecord" ("subscriptionId");
+CREATE INDEX idx_paymentRecord_paymentDate ON subscription_tracker."paymentRecord" ("paymentDate");
+CREATE INDEX idx_paymentRecord_created_at ON subscription_tracker."paymentRecord" ("created_at", "id");
+CREATE INDEX idx_paymentRecord_updated_at ON subscription_tracker."paymentRecord" ("updated_at");
+
+-- paymentRecord的汇总（/stats/spend），写入paymentRecord时在同一事务内增量更新
+CREATE TABLE subscription_tracker."paymentRecord_summary" (
+  "dimension" VARCHAR(64) NOT NULL,
+  "bucket" VARCHAR(255) NOT NULL,
+  "count" BIGINT DEFAULT 0 NOT NULL,
+  "total" NUMERIC(18,2) DEFAULT 0 NOT NULL,
+  CONSTRAINT pk_paymentRecord_summary PRIMARY KEY ("dimension", "bucket")
+);
+
+-- 迁移版本（后端migrate.py），由本脚本初始化的数据库不再重复执行
+CREATE TABLE subscription_tracker."schema_migrations" (
+  "version" INTEGER NOT NULL,
+  "name" VARCHAR(255) NOT NULL,
+  "applied_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT pk_schema_migrations PRIMARY KEY ("version")
+);
+INSERT INTO subscription_tracker."schema_migrations" ("version", "name") VALUES
+  (1, '初始表结构'),
+  (2, '回填paymentRecord汇总'),
+  (4, '补齐索引');
 
 -- 应用信息
 -- 应用名称: 订阅支出追踪器
@@ -0,0 +1,139 @@
+"""
+内存存储的内存占用基准
+在同一进程中以两种布局写入同样的记录，用tracemalloc测量存储保留的字节数（含记录中的字符串和各项索引）：
+  dict     旧布局：每条记录一个字典，id为36字符字符串，created_at/updated_at为datetime对象，
+           另有 id->位置 字典和created_at列表
+  compact  repositories/memory.py的紧凑记录：每列一个槽位，主键16字节，UTC时间存微秒整数，重复字符串共享同一对象
+两种布局都包含主键字典、插入顺序列表和Fenwick树，差别只在记录本身和位置/时间索引
+写入耗时在tracemalloc开启时测得，只用于两种布局之间的比较
+String列（不含Text）取--distinct个不同值，模拟作者、状态、计费周期等重复值多的列；Text列每行不同，长度为--content-size
+
+用法：
+  python scripts/bench_memory.py --backend demo-blog-app/backend --entity post --rows 200000
+  python scripts/bench_memory.py --backend demo-subscription-app/backend --entity paymentRecord --distinct 5
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator
+
+GENERATED_COLUMNS = ("id", "created_at", "updated_at")
+
+
+def sample_rows(table: Any, rows: int, distinct: int, content_size: int) -> Iterator[dict]:
+    """按列类型生成写入数据（不含id和时间戳）；每行都是新对象，与解析请求体得到的数据一样"""
+    from sqlalchemy import Boolean, DateTime, Float, Integer, Numeric, String, Text
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    columns = [column for column in table.__table__.columns if column.name not in GENERATED_COLUMNS]
+    for i in range(rows):
+        row = {}
+        for column in columns:
+            if isinstance(column.type, Text):
+                row[column.name] = f"{i} " + "x" * max(content_size - len(str(i)) - 1, 0)
+            elif isinstance(column.type, String):
+                row[column.name] = f"{column.name}-{i % distinct}"
+            elif isinstance(column.type, Boolean):
+                row[column.name] = i % 2 == 0
+            elif isinstance(column.type, DateTime):
+                row[column.name] = start + timedelta(minutes=i)
+            elif isinstance(column.type, (Float, Numeric)):
+                row[column.name] = float(i % 1000) + 0.5
+            elif isinstance(column.type, Integer):
+                row[column.name] = i
+            else:
+                row[column.name] = None
+        yield row
+
+
+def dict_layout(rows: Iterator[dict]) -> Any:
+    """旧MemoryStore的结构：主键字典、插入顺序列表、id->位置字典、created_at列表和Fenwick树"""
+    from repositories.memory import _LiveIndex
+    from tables.common import new_id, utcnow
+
+    records, order, positions, created, live = {}, [], {}, [], _LiveIndex()
+    for row in rows:
+        now = utcnow()
+        record = dict(row, id=new_id(), created_at=now, updated_at=now)
+        records[record["id"]] = record
+        positions[record["id"]] = len(order)
+        order.append(record["id"])
+        created.append(now)
+        live.append()
+    return records, order, positions, created, live
+
+
+def compact_layout(table: Any) -> Callable[[Iterator[dict]], Any]:
+    """与内存仓储create相同的写入路径（不经过写入回调），同步和异步后端通用"""
+    from repositories.memory import MemoryStore, RecordLayout
+    from tables.common import new_id, utcnow
+
+    def build(rows: Iterator[dict]) -> Any:
+        store = MemoryStore(RecordLayout(table))
+        for row in rows:
+            now = utcnow()
+            store.insert(store.layout.pack(dict(row, id=new_id(), created_at=now, updated_at=now)))
+        return store
+
+    return build
+
+
+def measure(build: Callable[[Iterator[dict]], Any], rows: Callable[[], Iterator[dict]], count: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build(rows())
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return {
+        "bytes_per_row": round(size / count),
+        "total_mb": round(size / 1024 / 1024, 1),
+        "insert_us_per_row": round(elapsed * 1e6 / count, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="demo-blog-app/backend")
+    parser.add_argument("--entity", default="post")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=20, help="每个String列的不同值个数")
+    parser.add_argument("--content-size", type=int, default=200, help="Text列的长度")
+    args = parser.parse_args()
+
+    os.environ.update(STORAGE_BACKEND="memory", MEMORY_DATA_DIR="")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "bench_memory.db"))
+    os.environ.setdefault("DB_SCHEMA", "")
+    sys.path.insert(0, os.path.abspath(args.backend))
+    os.chdir(args.backend)
+    table = getattr(importlib.import_module(f"tables.{args.entity}"), f"{args.entity[0].upper()}{args.entity[1:]}Table")
+
+    def rows() -> Iterator[dict]:
+        return sample_rows(table, args.rows, args.distinct, args.content_size)
+
+    results = {
+        "dict": measure(dict_layout, rows, args.rows),
+        "compact": measure(compact_layout(table), rows, args.rows),
+    }
+    results["compact"]["memory_saving"] = round(1 - results["compact"]["bytes_per_row"] / results["dict"]["bytes_per_row"], 3)
+    print(json.dumps({
+        "entity": args.entity,
+        "rows": args.rows,
+        "distinct": args.distinct,
+        "content_size": args.content_size,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
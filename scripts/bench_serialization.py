@@ -0,0 +1,120 @@
+"""
+生成后端的响应序列化基准
+对同一批数据分别测量每个请求的CPU时间：
+  response_model  生成器旧写法：路由返回ORM行/字典，FastAPI按response_model再校验一遍，再用标准库json编码
+  pydantic        默认写法：校验一次后由pydantic-core直接输出JSON字节
+  orjson          FAST_JSON=true：跳过校验，按模型字段取值后用orjson编码
+每种模式在独立子进程中运行（FAST_JSON在导入时读取），使用内存存储并关闭响应缓存，只测序列化路径
+
+用法：
+  python scripts/bench_serialization.py --backend demo-blog-app/backend --entity post --limit 100 --content-size 4000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+from datetime import datetime, timezone
+
+MODES = ("response_model", "pydantic", "orjson")
+
+
+def _sample_value(annotation, content_size: int):
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if args:
+        annotation = args[0]
+    if annotation is bool:
+        return True
+    if annotation in (int, float):
+        return 42
+    if annotation is datetime:
+        return datetime.now(timezone.utc).isoformat()
+    return "lorem ipsum " * (content_size // 12)
+
+
+def run_worker(args: argparse.Namespace) -> dict:
+    """在当前进程中加载后端并测量一种模式"""
+    sys.path.insert(0, os.path.abspath(args.backend))
+    os.chdir(args.backend)
+    from typing import List
+    from fastapi.testclient import TestClient
+    import importlib
+
+    main = importlib.import_module("main")
+    model_module = importlib.import_module(f"models.{args.entity}")
+    class_name = args.entity[0].upper() + args.entity[1:]
+    model = getattr(model_module, class_name)
+    create_model = getattr(model_module, f"{class_name}Create")
+    repository = importlib.import_module(f"repositories.{args.entity}_repository").memory_repository
+    from filters import ListQuery
+
+    payload = {name: _sample_value(field.annotation, args.content_size) for name, field in create_model.model_fields.items()}
+    client = TestClient(main.app)
+    for _ in range(args.limit):
+        assert client.post(f"/{args.entity}s/", json=payload).status_code == 200
+
+    path = f"/{args.entity}s/?limit={args.limit}"
+    if args.worker == "response_model":
+        @main.app.get("/_bench", response_model=List[model])
+        def baseline():
+            return repository.store.page(0, args.limit)
+        path = "/_bench"
+
+    for _ in range(args.warmup):
+        client.get(path)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    size = 0
+    for _ in range(args.requests):
+        response = client.get(path)
+        size = len(response.content)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {
+        "cpu_ms_per_request": round(cpu * 1000 / args.requests, 3),
+        "wall_ms_per_request": round(wall * 1000 / args.requests, 3),
+        "response_bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="demo-blog-app/backend")
+    parser.add_argument("--entity", default="post")
+    parser.add_argument("--limit", type=int, default=100, help="每个列表请求返回的行数")
+    parser.add_argument("--content-size", type=int, default=4000, help="字符串字段的长度")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = {}
+    for mode in MODES:
+        env = dict(
+            os.environ,
+            STORAGE_BACKEND="memory",
+            CACHE_ENABLED="false",
+            FAST_JSON="true" if mode == "orjson" else "false",
+            DATABASE_URL="sqlite:///" + os.path.join(tempfile.gettempdir(), "bench_serialization.db"),
+            DB_SCHEMA="",
+        )
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--worker", mode],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = results["response_model"]["cpu_ms_per_request"]
+    for result in results.values():
+        result["cpu_speedup"] = round(baseline / result["cpu_ms_per_request"], 2)
+    print(json.dumps({"limit": args.limit, "content_size": args.content_size, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
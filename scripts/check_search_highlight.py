@@ -0,0 +1,93 @@
+"""
+检索高亮片段的HTML转义检查
+写入一条正文含 <script> 标签的记录，通过 /search 检索，确认highlight中记录自身的标签都已转义，
+只剩命中词两侧的<mark>标签；再用含标记字符的片段检查PostgreSQL路径的ts_headline后处理
+内存存储和数据库（SQLite走LIKE回退）各检查一遍，失败时退出码为1
+
+用法：
+  python scripts/check_search_highlight.py --backend demo-blog-app/backend --entity comment
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+PAYLOAD = '<script>alert("x")</script> needle <img src=x onerror=alert(1)>'
+EXPECTED = '&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; <mark>needle</mark> &lt;img src=x onerror=alert(1)&gt;'
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    """在当前进程中加载后端，按STORAGE_BACKEND检查一遍"""
+    sys.path.insert(0, os.path.abspath(args.backend))
+    os.chdir(args.backend)
+    import importlib
+    from fastapi.testclient import TestClient
+
+    importlib.import_module("migrate").run_migrations()
+    main = importlib.import_module("main")
+    search = importlib.import_module("search")
+    model_module = importlib.import_module(f"models.{args.entity}")
+    create_model = getattr(model_module, f"{args.entity[0].upper()}{args.entity[1:]}Create")
+    hit_model = getattr(importlib.import_module("models.search"), f"{args.entity[0].upper()}{args.entity[1:]}SearchHit")
+    columns = list(hit_model.model_fields["item"].annotation.model_fields)
+    searched = [name for name in importlib.import_module(f"tables.{args.entity}").SEARCH_COLUMNS if name in columns]
+
+    payload = {}
+    for name, field in create_model.model_fields.items():
+        annotation = str(field.annotation)
+        if "bool" in annotation:
+            payload[name] = False
+        elif "float" in annotation or "int" in annotation:
+            payload[name] = 1
+        elif "datetime" in annotation:
+            payload[name] = "2024-01-01T00:00:00Z"
+        elif "EmailStr" in annotation or name == "email":
+            payload[name] = "check@example.com"
+        else:
+            payload[name] = PAYLOAD if name in searched else "plain"
+    with TestClient(main.app) as client:
+        response = client.post(f"/{args.entity}s/", json=payload)
+        assert response.status_code == 200, response.text
+        response = client.get(f"/{args.entity}s/search", params={"q": "needle"})
+        assert response.status_code == 200, response.text
+        hits = response.json()
+        assert len(hits) == 1, hits
+        for name in searched:
+            assert hits[0]["highlight"][name] == EXPECTED, hits[0]["highlight"][name]
+
+    # PostgreSQL路径：ts_headline的结果中命中词由标记字符包裹，其余文本原样返回
+    headline = f'<b onclick="x">{search.HEADLINE_START}needle{search.HEADLINE_STOP}</b>'
+    assert search._headline(headline) == '&lt;b onclick=&quot;x&quot;&gt;<mark>needle</mark>&lt;/b&gt;', search._headline(headline)
+    print(f"{os.environ['STORAGE_BACKEND']}: ok")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="demo-blog-app/backend")
+    parser.add_argument("--entity", default="comment")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    failed = False
+    for backend in ("memory", "database"):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                STORAGE_BACKEND=backend,
+                MEMORY_DATA_DIR="",
+                CACHE_ENABLED="false",
+                DATABASE_URL="sqlite:///" + os.path.join(directory, "check.db"),
+                DB_SCHEMA="",
+            )
+            command = [sys.executable, __file__, "--worker", "--backend", args.backend, "--entity", args.entity]
+            failed |= subprocess.run(command, env=env).returncode != 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,27 @@
 import { writeFileSync } from 'fs';
-import { AppDSL, DSLEntity, DSLColumn } from '../types/dsl.js';
+import { AppDSL, DSLEntity, DSLColumn, DSLStats } from '../types/dsl.js';
+
+export interface RelationInfo {
+  name: string;
+  entity: DSLEntity;
+  foreignKey: string;
+  many: boolean;
+}
+
+export interface SearchColumn {
+  name: string;
+  weight: string;    // setweight权重：A标题类字段，B正文
+}
+
+export interface MigrationStep {
+  version: number;
+  name: string;
+}
+
+export const MIGRATIONS_TABLE = 'schema_migrations';
+
+export const SEARCH_VECTOR_COLUMN = 'search_vector';
+export const SEARCH_CONFIG = 'simple';
 
 export class DSLToSQL {
   
@@ -24,13 +46,23 @@ export class DSLToSQL {
     
     // 生成索引
     dsl.entities.forEach(entity => {
-      const indexes = this.generateIndexes(entity, schemaName);
+      const indexes = this.generateIndexes(entity, dsl.entities, schemaName);
       if (indexes.length > 0) {
         ddlStatements.push(...indexes);
         ddlStatements.push('');
       }
     });
     
+    // 汇总表
+    if (dsl.stats) {
+      ddlStatements.push(this.generateSummaryTable(dsl.stats, schemaName));
+      ddlStatements.push('');
+    }
+    
+    // 迁移版本：本脚本已包含全部版本的结果，登记后migrate.py不再重复执行
+    ddlStatements.push(this.generateMigrationsTable(dsl, schemaName));
+    ddlStatements.push('');
+    
     // 生成注释
     ddlStatements.push('-- 应用信息');
     ddlStatements.push(`-- 应用名称: ${dsl.name}`);
@@ -45,7 +77,7 @@ export class DSLToSQL {
    * 为单个实体生成CREATE TABLE语句
    */
   private generateCreateTable(entity: DSLEntity, schemaName: string): string {
-    const tableName = `${schemaName === 'public' ? '' : schemaName + '.'}${entity.name}`;
+    const tableName = qualifiedTableName(entity, schemaName);
     
     const columns = entity.columns.map(column => {
       return this.generateColumnDefinition(column);
@@ -54,7 +86,7 @@ export class DSLToSQL {
     const constraints: string[] = [];
     
     // 主键约束
-    const primaryKeys = entity.columns.filter(col => col.primaryKey).map(col => col.name);
+    const primaryKeys = entity.columns.filter(col => col.primaryKey).map(col => quoteIdent(col.name));
     if (primaryKeys.length > 0) {
       constraints.push(`  CONSTRAINT pk_${entity.name} PRIMARY KEY (${primaryKeys.join(', ')})`);
     }
@@ -62,9 +94,15 @@ export class DSLToSQL {
     // 唯一约束
     const uniqueColumns = entity.columns.filter(col => col.unique && !col.primaryKey);
     uniqueColumns.forEach(col => {
-      constraints.push(`  CONSTRAINT uk_${entity.name}_${col.name} UNIQUE (${col.name})`);
+      constraints.push(`  CONSTRAINT uk_${entity.name}_${col.name} UNIQUE (${quoteIdent(col.name)})`);
     });
     
+    // 全文检索向量：由检索列生成的存储列，写入时自动维护
+    const searchColumns = getSearchColumns(entity);
+    if (searchColumns.length > 0) {
+      columns.push(`  ${quoteIdent(SEARCH_VECTOR_COLUMN)} TSVECTOR GENERATED ALWAYS AS (${searchVectorExpression(searchColumns)}) STORED`);
+    }
+    
     const allDefinitions = [...columns, ...constraints];
     
     return `CREATE TABLE ${tableName} (
@@ -72,11 +110,46 @@ ${allDefinitions.join(',\n')}
 );`;
   }
   
+  /**
+   * 生成汇总表：每个 (维度, 取值) 一行，由应用在明细写入时增量维护
+   */
+  private generateSummaryTable(stats: DSLStats, schemaName: string): string {
+    const tableName = qualifiedSummaryTableName(stats, schemaName);
+    
+    return `-- ${stats.entity}的汇总（/stats/spend），写入${stats.entity}时在同一事务内增量更新
+CREATE TABLE ${tableName} (
+  "dimension" VARCHAR(64) NOT NULL,
+  "bucket" VARCHAR(255) NOT NULL,
+  "count" BIGINT DEFAULT 0 NOT NULL,
+  "total" NUMERIC(18,2) DEFAULT 0 NOT NULL,
+  CONSTRAINT pk_${summaryTableName(stats)} PRIMARY KEY ("dimension", "bucket")
+);`;
+  }
+  
+  /**
+   * 生成迁移版本表，并登记本脚本已完成的版本（与后端migrate.py中的版本一致）
+   */
+  private generateMigrationsTable(dsl: AppDSL, schemaName: string): string {
+    const tableName = `${schemaName === 'public' ? '' : schemaName + '.'}${quoteIdent(MIGRATIONS_TABLE)}`;
+    const values = getMigrationSteps(dsl).map(step => `  (${step.version}, '${step.name}')`).join(',\n');
+    
+    return `-- 迁移版本（后端migrate.py），由本脚本初始化的数据库不再重复执行
+CREATE TABLE ${tableName} (
+  "version" INTEGER NOT NULL,
+  "name" VARCHAR(255) NOT NULL,
+  "applied_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT pk_${MIGRATIONS_TABLE} PRIMARY KEY ("version")
+);
+INSERT INTO ${tableName} ("version", "name") VALUES
+${values};`;
+  }
+  
   /**
    * 生成单个列的定义
    */
   private generateColumnDefinition(column: DSLColumn): string {
-    const type = this.mapColumnType(column.type);
+    // 主键id由gen_random_uuid()/uuid4生成，无论DSL中声明何种类型都存为字符串
+    const type = isUuidPrimaryKey(column) ? 'VARCHAR(255)' : this.mapColumnType(column.type);
     const nullable = column.required ? 'NOT NULL' : 'NULL';
     const defaultValue = this.getDefaultValue(column);
     
@@ -112,7 +185,7 @@ ${allDefinitions.join(',\n')}
    * 获取字段的默认值
    */
   private getDefaultValue(column: DSLColumn): string | null {
-    if (column.name === 'id' && column.primaryKey) {
+    if (isUuidPrimaryKey(column)) {
       return "gen_random_uuid()";
     }
     
@@ -130,43 +203,23 @@ ${allDefinitions.join(',\n')}
   /**
    * 生成索引语句
    */
-  private generateIndexes(entity: DSLEntity, schemaName: string): string[] {
+  private generateIndexes(entity: DSLEntity, entities: DSLEntity[], schemaName: string): string[] {
     const indexes: string[] = [];
-    const tableName = `${schemaName === 'public' ? '' : schemaName + '.'}${entity.name}`;
+    const tableName = qualifiedTableName(entity, schemaName);
     
-    // 为常见的查询字段创建索引
-    entity.columns.forEach(column => {
-      if (this.shouldCreateIndex(column)) {
-        const indexName = `idx_${entity.name}_${column.name}`;
-        indexes.push(`CREATE INDEX ${indexName} ON ${tableName} (${column.name});`);
-      }
+    // 为常见的查询字段和外键创建索引
+    getIndexedColumns(entity, entities).forEach(column => {
+      const indexName = `idx_${entity.name}_${column.name}`;
+      const keys = getIndexKeys(entity, column).map(quoteIdent).join(', ');
+      indexes.push(`CREATE INDEX ${indexName} ON ${tableName} (${keys});`);
     });
     
-    return indexes;
-  }
-  
-  /**
-   * 判断是否应该为字段创建索引
-   */
-  private shouldCreateIndex(column: DSLColumn): boolean {
-    // 主键和唯一字段会自动有索引
-    if (column.primaryKey || column.unique) {
-      return false;
-    }
-    
-    // 为这些字段类型创建索引
-    const indexableTypes = ['email', 'date'];
-    if (indexableTypes.includes(column.type)) {
-      return true;
+    // 全文检索的GIN索引
+    if (getSearchColumns(entity).length > 0) {
+      indexes.push(`CREATE INDEX ${searchIndexName(entity)} ON ${tableName} USING GIN (${quoteIdent(SEARCH_VECTOR_COLUMN)});`);
     }
     
-    // 为常见的查询字段创建索引
-    const commonSearchFields = ['name', 'title', 'status', 'type', 'category'];
-    if (commonSearchFields.includes(column.name)) {
-      return true;
-    }
-    
-    return false;
+    return indexes;
   }
   
   /**
@@ -183,9 +236,15 @@ ${allDefinitions.join(',\n')}
   generateRollback(dsl: AppDSL, schemaName: string = 'public'): string {
     const statements: string[] = [];
     
+    statements.push(`DROP TABLE IF EXISTS ${schemaName === 'public' ? '' : schemaName + '.'}${quoteIdent(MIGRATIONS_TABLE)};`);
+    
+    if (dsl.stats) {
+      statements.push(`DROP TABLE IF EXISTS ${qualifiedSummaryTableName(dsl.stats, schemaName)} CASCADE;`);
+    }
+    
     // 删除表（注意顺序，先删除有外键的表）
     dsl.entities.reverse().forEach(entity => {
-      const tableName = `${schemaName === 'public' ? '' : schemaName + '.'}${entity.name}`;
+      const tableName = qualifiedTableName(entity, schemaName);
       statements.push(`DROP TABLE IF EXISTS ${tableName} CASCADE;`);
     });
     
@@ -198,6 +257,162 @@ ${allDefinitions.join(',\n')}
   }
 }
 
+/**
+ * 判断是否应该为字段创建索引
+ * 迁移脚本和ORM表定义共用这一规则，保证两边的索引一致
+ */
+export function shouldCreateIndex(column: DSLColumn, entities: DSLEntity[] = []): boolean {
+  // 主键和唯一字段会自动有索引
+  if (column.primaryKey || column.unique) {
+    return false;
+  }
+  
+  // 外键：按父记录批量加载子记录（include=）时走 IN (...) 查询
+  if (getReferencedEntity(column, entities)) {
+    return true;
+  }
+  
+  // 为这些字段类型创建索引
+  const indexableTypes = ['email', 'date'];
+  if (indexableTypes.includes(column.type)) {
+    return true;
+  }
+  
+  // 为常见的查询字段创建索引
+  const commonSearchFields = ['name', 'title', 'status', 'type', 'category'];
+  if (commonSearchFields.includes(column.name)) {
+    return true;
+  }
+  
+  return false;
+}
+
+/**
+ * 获取实体中需要建索引的字段
+ */
+export function getIndexedColumns(entity: DSLEntity, entities: DSLEntity[] = []): DSLColumn[] {
+  return entity.columns.filter(column => shouldCreateIndex(column, entities));
+}
+
+/**
+ * 字段引用的实体（外键）：优先使用显式的references，否则按 <实体>_id / <实体>Id 命名推断
+ */
+export function getReferencedEntity(column: DSLColumn, entities: DSLEntity[]): DSLEntity | undefined {
+  if (column.primaryKey) {
+    return undefined;
+  }
+  const target = column.references || column.name.match(/^(.+?)(_id|Id)$/)?.[1];
+  return target ? entities.find(entity => entity.name === target) : undefined;
+}
+
+/**
+ * 实体的关联：本实体上的外键为多对一，其他实体上指向本实体的外键为一对多
+ * 关联名用于include=参数：多对一取外键名去掉_id/Id后缀，一对多取子实体名加s
+ */
+export function getRelations(entity: DSLEntity, entities: DSLEntity[]): RelationInfo[] {
+  const relations: RelationInfo[] = [];
+  
+  entity.columns.forEach(column => {
+    const target = getReferencedEntity(column, entities);
+    if (target) {
+      const stripped = column.name.replace(/(_id|Id)$/, '');
+      const name = stripped !== column.name ? stripped : target.name;
+      relations.push({ name, entity: target, foreignKey: column.name, many: false });
+    }
+  });
+  
+  entities.forEach(other => {
+    other.columns.forEach(column => {
+      if (getReferencedEntity(column, entities)?.name === entity.name) {
+        const plural = `${other.name}s`;
+        const name = relations.some(relation => relation.name === plural) ? `${plural}_by_${column.name}` : plural;
+        relations.push({ name, entity: other, foreignKey: column.name, many: true });
+      }
+    });
+  });
+  
+  return relations;
+}
+
+/**
+ * 索引包含的列；created_at索引附带id，与列表接口的(created_at, id)排序及游标分页一致
+ */
+export function getIndexKeys(entity: DSLEntity, column: DSLColumn): string[] {
+  const hasId = entity.columns.some(col => col.name === 'id');
+  return column.name === 'created_at' && hasId ? ['created_at', 'id'] : [column.name];
+}
+
+/**
+ * 全文检索使用的列和权重：含textarea字段的实体可检索，
+ * 标题类字段（title/name/subject）权重A，textarea字段权重B
+ */
+export function getSearchColumns(entity: DSLEntity): SearchColumn[] {
+  if (!entity.columns.some(column => column.type === 'textarea')) {
+    return [];
+  }
+  const titleFields = ['title', 'name', 'subject'];
+  return entity.columns
+    .filter(column => column.type === 'textarea' || (column.type === 'text' && titleFields.includes(column.name)))
+    .map(column => ({ name: column.name, weight: column.type === 'textarea' ? 'B' : 'A' }))
+    .sort((a, b) => a.weight.localeCompare(b.weight));
+}
+
+/**
+ * search_vector的生成表达式，迁移脚本和ORM建表共用；
+ * 使用simple配置（不做词干化，不依赖语言），与内存模式的分词规则一致
+ */
+export function searchVectorExpression(columns: SearchColumn[]): string {
+  return columns
+    .map(column => `setweight(to_tsvector('${SEARCH_CONFIG}', coalesce(${quoteIdent(column.name)}, '')), '${column.weight}')`)
+    .join(' || ');
+}
+
+export function searchIndexName(entity: DSLEntity): string {
+  return `idx_${entity.name}_search`;
+}
+
+/**
+ * 迁移步骤（版本号递增，只追加不修改）：migration.sql登记这些版本，后端migrate.py按版本执行
+ */
+export function getMigrationSteps(dsl: AppDSL): MigrationStep[] {
+  return [
+    { version: 1, name: '初始表结构' },
+    ...(dsl.stats ? [{ version: 2, name: `回填${dsl.stats.entity}汇总` }] : []),
+    // 3、4补齐此前建好的库缺少的列和索引，可重复执行；新建的库已由版本1建好
+    ...(dsl.entities.some(entity => getSearchColumns(entity).length > 0) ? [{ version: 3, name: '全文检索列' }] : []),
+    { version: 4, name: '补齐索引' },
+  ];
+}
+
+/**
+ * 主键id统一使用UUID字符串
+ */
+export function isUuidPrimaryKey(column: DSLColumn): boolean {
+  return column.name === 'id' && !!column.primaryKey;
+}
+
+/**
+ * 给标识符加双引号，保留驼峰命名（如 paymentRecord、paymentDate）的大小写
+ */
+function quoteIdent(name: string): string {
+  return `"${name}"`;
+}
+
+function qualifiedTableName(entity: DSLEntity, schemaName: string): string {
+  return `${schemaName === 'public' ? '' : schemaName + '.'}${quoteIdent(entity.name)}`;
+}
+
+/**
+ * 汇总表名：<被汇总实体>_summary
+ */
+export function summaryTableName(stats: DSLStats): string {
+  return `${stats.entity}_summary`;
+}
+
+function qualifiedSummaryTableName(stats: DSLStats, schemaName: string): string {
+  return `${schemaName === 'public' ? '' : schemaName + '.'}${quoteIdent(summaryTableName(stats))}`;
+}
+
 // 便捷函数
 export function dslToSql(dsl: AppDSL, schemaName: string = 'public'): string {
   const generator = new DSLToSQL();
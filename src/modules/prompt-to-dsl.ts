@@ -19,7 +19,8 @@ Your task is to analyze the user's request and generate a complete application s
           "type": "字段类型（text|number|date|boolean|email|url|textarea）",
           "required": true/false,
           "unique": true/false,
-          "primaryKey": true/false
+          "primaryKey": true/false,
+          "references": "外键引用的实体名称（可选，如post_id引用post）"
         }
       ]
     }
@@ -32,7 +33,19 @@ Your task is to analyze the user's request and generate a complete application s
       "title": "页面标题",
       "description": "页面描述"
     }
-  ]
+  ],
+  "stats": {
+    "entity": "被汇总的实体（可选，仪表板需要总额统计时填写）",
+    "amount": "求和的number字段",
+    "date": "按月汇总的date字段",
+    "groupBy": ["其他汇总维度字段"],
+    "renewal": {
+      "entity": "有计费周期的实体（可选）",
+      "cycle": "计费周期字段",
+      "enabled": "是否启用的boolean字段（可选）",
+      "amount": "每期金额字段（可选）"
+    }
+  }
 }
 
 规则：
@@ -47,7 +60,9 @@ Your task is to analyze the user's request and generate a complete application s
    - 长文本、备注等 -> textarea
 3. 自动为每个实体生成基本页面：列表页(list)、表单页(form)、详情页(detail)
 4. 根据应用类型决定是否需要仪表板页面
-5. 只返回有效的JSON，不要包含任何其他文本
+5. 实体之间的关联用外键字段表示，命名为 <实体名>_id（如comment的post_id），类型为text
+6. 仪表板需要总支出、即将续费等统计时填写stats，否则省略stats
+7. 只返回有效的JSON，不要包含任何其他文本
 
 示例：
 用户输入："订阅支出追踪器，字段：名称 text, 金额 number, 周期 text"
@@ -5,6 +5,7 @@ export interface DSLColumn {
   required?: boolean;
   unique?: boolean;
   primaryKey?: boolean;
+  references?: string;  // 外键引用的实体名；未声明时按 <实体>_id / <实体>Id 命名推断
 }
 
 export interface DSLEntity {
@@ -28,12 +29,26 @@ export interface DSLPolicy {
   condition?: string;
 }
 
+export interface DSLStats {
+  entity: string;       // 被汇总的实体，如paymentRecord
+  amount: string;       // 求和的数值字段
+  date: string;         // 按月汇总所用的日期字段
+  groupBy?: string[];   // 其他汇总维度，如subscriptionId、paymentStatus
+  renewal?: {           // 按计费周期推算即将续费的记录（/stats/upcoming）
+    entity: string;     // 周期所在的实体，如subscription
+    cycle: string;      // 计费周期字段，如 monthly / yearly / 30d
+    enabled?: string;   // 是否启用的布尔字段，未启用的不参与续费
+    amount?: string;    // 每期金额字段，用于汇总即将发生的支出
+  };
+}
+
 export interface AppDSL {
   name: string;
   description?: string;
   entities: DSLEntity[];
   pages: DSLPage[];
   policies?: DSLPolicy[];
+  stats?: DSLStats;
   version?: string;
   createdAt?: string;
 } 
\ No newline at end of file
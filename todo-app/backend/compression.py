@@ -0,0 +1,177 @@
+"""
+响应压缩
+按Accept-Encoding协商br（需安装brotli）或gzip，响应体不小于COMPRESSION_MIN_SIZE字节时压缩：
+- 缓存的GET响应（cache.py）把压缩后的字节保存在缓存项中，命中时直接返回，不再重复压缩；
+  每种编码在第一次被请求时压缩一次
+- 其余响应（写接口、统计、缓存关闭时）由CompressionMiddleware压缩；流式导出逐块压缩并立即flush
+ETag都是弱ETag，同一版本的不同编码共用一个ETag；达到压缩阈值的响应都带 Vary: Accept-Encoding
+"""
+
+import gzip
+import os
+import zlib
+from typing import Any, Dict, Optional, Tuple
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli是可选依赖，未安装时只使用gzip
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# 服务端的偏好顺序，客户端给出的q值相同时选靠前的
+COMPRESSION_ENCODINGS = [
+    name for name in (part.strip() for part in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(","))
+    if name == "gzip" or (name == "br" and brotli is not None)
+]
+
+# 压缩这些类型的响应（前缀匹配）
+COMPRESSIBLE_TYPES = (b"application/json", b"application/x-ndjson", b"text/", b"image/svg+xml")
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """按Accept-Encoding（含q值和*）选择编码，客户端不接受任何可用编码时返回None（不压缩）"""
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for name in COMPRESSION_ENCODINGS:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0：同一响应体的压缩结果相同
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def encoded_body(body: bytes, variants: Dict[str, bytes], encoding: Optional[str]) -> Tuple[bytes, Dict[str, str]]:
+    """
+    按协商的编码取响应体，返回 (响应体, 需要附加的响应头)
+    variants是缓存项中已压缩的各编码版本，缺少所需编码时压缩一次并存入，之后的命中直接使用
+    """
+    if not COMPRESSION_ENABLED or len(body) < COMPRESSION_MIN_SIZE:
+        return body, {}
+    if encoding is None:
+        return body, {"vary": "Accept-Encoding"}
+    data = variants.get(encoding)
+    if data is None:
+        data = variants[encoding] = compress(body, encoding)
+    return data, {"content-encoding": encoding, "vary": "Accept-Encoding"}
+
+
+class _StreamCompressor:
+    """流式响应逐块压缩，每块之后flush，客户端可以边收边解压"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._compressor.process(chunk)
+            return data + (self._compressor.finish() if final else self._compressor.flush())
+        data = self._compressor.compress(chunk)
+        return data + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _header(headers: Any, name: bytes) -> bytes:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return b""
+
+
+def _compressible(headers: Any) -> bool:
+    """可压缩的类型，且未经压缩；Vary中已有Accept-Encoding的是缓存层已经按编码协商过的响应"""
+    if _header(headers, b"content-encoding"):
+        return False
+    if b"accept-encoding" in _header(headers, b"vary").lower():
+        return False
+    return _header(headers, b"content-type").startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    纯ASGI中间件：等到第一块响应体再决定是否压缩
+    一次性发送且小于阈值的响应原样转发；多块发送的流式响应（导出）总是压缩，去掉Content-Length
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(_header(scope["headers"], b"accept-encoding").decode("latin-1"))
+        start: Optional[dict] = None
+        stream: Optional[_StreamCompressor] = None
+
+        async def send_compressed(message: dict) -> None:
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                if _compressible(message["headers"]):
+                    # 响应头等第一块响应体一起发送
+                    start = message
+                else:
+                    await send(message)
+                return
+            if stream is not None:
+                more_body = message.get("more_body", False)
+                await send({
+                    "type": "http.response.body",
+                    "body": stream.compress(message.get("body", b""), not more_body),
+                    "more_body": more_body,
+                })
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            initial, start = start, None
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not more_body and len(body) < COMPRESSION_MIN_SIZE:
+                await send(initial)
+                await send(message)
+                return
+            headers = MutableHeaders(raw=initial["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None:
+                await send(initial)
+                await send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            if more_body:
+                del headers["Content-Length"]
+                stream = _StreamCompressor(encoding)
+                await send(initial)
+                await send({"type": "http.response.body", "body": stream.compress(body, False), "more_body": True})
+                return
+            data = compress(body, encoding)
+            headers["Content-Length"] = str(len(data))
+            await send(initial)
+            await send({"type": "http.response.body", "body": data})
+
+        await self.app(scope, receive, send_compressed)
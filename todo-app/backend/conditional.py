@@ -0,0 +1,112 @@
+"""
+HTTP条件请求
+ETag和Last-Modified由 (id, updated_at) 推导，不需要先序列化响应体：
+- GET：If-None-Match / If-Modified-Since 满足时直接返回304
+- PUT：If-Match 中的ETag还原为updated_at，作为 UPDATE ... WHERE updated_at IN (...) 的条件，
+  版本已变化时返回409（乐观并发控制，比较和写入是同一条语句）
+单条记录的ETag就是updated_at的微秒数；ETag是弱ETag，但每次写入都会刷新updated_at，
+版本与内容一一对应，因此也接受用于If-Match
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, Mapping, Optional, Sequence
+from fastapi import Request, Response
+
+VALIDATOR_HEADERS = ("etag", "last-modified")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class VersionConflict(Exception):
+    """带版本条件的更新没有命中：记录存在，但已被其他请求修改"""
+
+
+def _field(item: Any, name: str) -> Any:
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _micros(item: Any) -> int:
+    """updated_at距纪元的微秒数，用整数运算避免浮点误差"""
+    return (_utc(_field(item, "updated_at")) - EPOCH) // MICROSECOND
+
+
+def _version(item: Any) -> str:
+    return f"{_field(item, 'id')}@{_micros(item)}"
+
+
+def _digest(text: str) -> str:
+    return 'W/"' + hashlib.blake2b(text.encode(), digest_size=12).hexdigest() + '"'
+
+
+def item_etag(item: Any) -> str:
+    """单条记录的弱ETag，内容是版本（updated_at的微秒数），If-Match时可还原"""
+    return f'W/"{_micros(item)}"'
+
+
+def list_etag(items: Sequence[Any]) -> str:
+    """列表的弱ETag：任一记录被修改、增删或顺序变化都会改变"""
+    return _digest("\n".join(_version(item) for item in items))
+
+
+def last_modified(items: Sequence[Any]) -> Optional[datetime]:
+    return max((_utc(_field(item, "updated_at")) for item in items), default=None)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def is_not_modified(request: Request, headers: Mapping[str, str]) -> bool:
+    """按RFC 9110判断客户端缓存是否仍然有效；If-None-Match优先于If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = headers.get("etag")
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    modified = headers.get("last-modified")
+    if not if_modified_since or not modified:
+        return False
+    try:
+        return parsedate_to_datetime(modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified_response(headers: Mapping[str, str]) -> Response:
+    """304响应只带校验头，不带响应体"""
+    return Response(status_code=304, headers={k: headers[k] for k in VALIDATOR_HEADERS if k in headers})
+
+
+def validate(request: Request, response: Response, etag: str, modified: Optional[datetime]) -> Optional[Response]:
+    """写入ETag/Last-Modified；客户端缓存仍有效时返回304响应，调用方直接返回它，不再序列化"""
+    response.headers["ETag"] = etag
+    if modified is not None:
+        response.headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    if is_not_modified(request, response.headers):
+        return not_modified_response(response.headers)
+    return None
+
+
+def expected_versions(request: Request) -> Optional[List[datetime]]:
+    """
+    If-Match中的ETag还原为updated_at，作为更新语句的版本条件
+    没有If-Match或为*时返回None（不比较版本）；无法还原的ETag（如带include时的ETag）不匹配任何版本
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        value = tag.strip().removeprefix("W/").strip('"')
+        if value.isdigit():
+            versions.append(EPOCH + int(value) * MICROSECOND)
+    return versions
@@ -1 +1,2 @@
-from .task import Task, TaskCreate, TaskUpdate
\ No newline at end of file
+from .task import Task, TaskCreate, TaskUpdate, TaskBulkUpdate
+from .bulk import BulkDeleteRequest, BulkItemResult, MAX_BULK_ITEMS
\ No newline at end of file
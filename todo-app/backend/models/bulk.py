@@ -0,0 +1,19 @@
+"""
+批量操作的请求与结果模型
+"""
+
+import os
+from typing import List
+from pydantic import BaseModel, Field
+
+# 单次批量请求的最大条数，避免一个请求占用过多内存和过长的事务
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_ITEMS", "5000"))
+
+class BulkDeleteRequest(BaseModel):
+    """批量删除请求"""
+    ids: List[str] = Field(..., max_length=MAX_BULK_ITEMS, description="要删除的ID列表")
+
+class BulkItemResult(BaseModel):
+    """批量更新/删除中单条的处理结果"""
+    id: str = Field(..., description="主键ID")
+    status: str = Field(..., description="updated / deleted / not_found")
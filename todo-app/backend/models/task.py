@@ -2,10 +2,9 @@
 Task模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional
 from datetime import datetime
-import uuid
 
 class TaskBase(BaseModel):
     """Task基础模型"""
@@ -18,8 +17,20 @@ class TaskCreate(TaskBase):
 
 class TaskUpdate(BaseModel):
     """更新Task时使用的模型"""
-    name: Optional[str] = None = Field(..., description="名称")
-    completed: Optional[bool] = None = Field(..., description="completed")
+    name: Optional[str] = Field(None, description="名称")
+    completed: Optional[bool] = Field(None, description="completed")
+
+    @field_validator("name", "completed")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        """必填字段可以不提交，但不能提交null（对应的列为NOT NULL）"""
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class TaskBulkUpdate(TaskUpdate):
+    """批量更新时的单条修改，需带上id"""
+    id: str = Field(..., description="主键ID")
 
 class Task(TaskBase):
     """Task完整模型"""
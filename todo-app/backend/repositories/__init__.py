@@ -0,0 +1,2 @@
+from .sql import SqlRepository
+from .task_repository import get_task_repository
\ No newline at end of file
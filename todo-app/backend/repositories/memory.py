@@ -0,0 +1,543 @@
+"""
+内存仓储
+STORAGE_BACKEND=memory 时使用，适合开发调试和压测
+记录以紧凑形式保存（见RecordLayout）：每列一个槽位，主键UUID存16字节，UTC时间存微秒整数，重复的字符串共享同一对象；
+过滤、排序和写入回调直接读取紧凑记录，返回给路由序列化时才解码为普通字典
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterator, Dict, List, Optional, Sequence, Set
+from sqlalchemy import DateTime, String, Text
+from conditional import VersionConflict
+from filters import ListQuery, matches, sort_key
+from repositories.journal import Journal, lock_data_dir, unlock_data_dir
+from pagination import Cursor
+from search import SearchIndex, make_hit, page_hits, parse_query
+from tables.common import new_id, utcnow
+
+# 写入回调：(被移除或修改前的记录, 新增或修改后的记录)
+WriteListener = Callable[[List["Record"], List["Record"]], None]
+
+# 带持久化日志的仓储，由open_durable_storage / close_durable_storage统一打开和关闭
+_durable_repositories: List["MemoryRepository"] = []
+
+
+class _LiveIndex:
+    """Fenwick树：记录每个插入位置上的记录是否仍然存在，O(log n)按名次定位"""
+
+    def __init__(self):
+        self._tree = [0]
+
+    def append(self) -> None:
+        """在末尾追加一个存活位置"""
+        i = len(self._tree)
+        total, step, low = 1, 1, i & -i
+        while step < low:
+            total += self._tree[i - step]
+            step <<= 1
+        self._tree.append(total)
+
+    def discard(self, position: int) -> None:
+        """把位置标记为已删除"""
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] -= 1
+            i += i & -i
+
+    def find(self, rank: int) -> int:
+        """返回第rank条（从0开始）存活记录所在的位置"""
+        size = len(self._tree) - 1
+        position, step = 0, 1 << size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= size and self._tree[nxt] <= rank:
+                position = nxt
+                rank -= self._tree[nxt]
+            step >>= 1
+        return position
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_UTC_OFFSET = timedelta(0)
+# 每个字符串列最多登记的不同值：低基数列（作者、状态、周期等）的重复值全部共享，高基数列登记满后新值不再登记
+INTERN_LIMIT = 4096
+
+
+def _decode_id(value: bytes) -> str:
+    text = value.hex()
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+
+def _id_key(item_id: Any) -> Optional[bytes]:
+    """UUID字符串转为16字节；只接受生成时的小写带连字符格式，其他写法与数据库模式一样查不到记录"""
+    try:
+        key = bytes.fromhex(item_id.replace("-", ""))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return key if len(key) == 16 and _decode_id(key) == item_id else None
+
+
+def _encode_id(value: str) -> bytes:
+    key = _id_key(value)
+    if key is None:
+        raise ValueError(f"Invalid record id: {value!r}")
+    return key
+
+
+def _micros(value: datetime) -> int:
+    """距纪元的微秒数，不带时区的时间按UTC计算"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _encode_time(value: Any) -> Any:
+    """UTC时间（生成的created_at/updated_at都是）存为微秒整数；其他时区、不带时区的时间和None原样保存，读取结果不变"""
+    if isinstance(value, datetime) and value.utcoffset() == _UTC_OFFSET:
+        return _micros(value)
+    return value
+
+
+def _decode_time(value: Any) -> Any:
+    return _EPOCH + _MICROSECOND * value if type(value) is int else value
+
+
+class _Interner:
+    """把同一列中相等的字符串换成同一个对象；登记的不同值达到INTERN_LIMIT后，新值原样保存"""
+
+    def __init__(self):
+        self._pool: Dict[str, str] = {}
+
+    def __call__(self, value: Any) -> Any:
+        if type(value) is not str:
+            return value
+        shared = self._pool.get(value)
+        if shared is not None:
+            return shared
+        if len(self._pool) < INTERN_LIMIT:
+            self._pool[value] = value
+        return value
+
+
+class Record:
+    """
+    紧凑记录的基类，每个实体的记录类型由RecordLayout生成：每列一个槽位，没有实例字典
+    record["列"]、record.get("列")、record.列 读取解码后的值，与字典和ORM行的读取方式相同；
+    {**record} / dict(record) 得到普通字典
+    """
+
+    __slots__ = ("_position",)  # 在插入顺序索引中的位置，由MemoryStore维护
+    _layout: "RecordLayout"
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._layout.column_set:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return getattr(self, name) if name in self._layout.column_set else default
+
+    def keys(self) -> Sequence[str]:
+        return self._layout.columns
+
+    def to_dict(self) -> dict:
+        return self._layout.unpack(self)
+
+    def __reduce__(self) -> Any:
+        # 写日志和快照中仍保存为普通字典，与之前写入的数据兼容
+        return dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class RecordLayout:
+    """
+    按表定义生成实体的紧凑记录类型：
+    - 主键（UUID字符串，36字符）存为16字节
+    - DateTime列存为微秒整数，不再每个值一个datetime对象
+    - String列（不含Text）的重复值共享同一个字符串对象
+    其余列原样保存；编码过的列以"_列名"为槽位，同名属性读取时解码
+    """
+
+    def __init__(self, table: Any):
+        self.columns = tuple(column.name for column in table.__table__.columns)
+        self.column_set = frozenset(self.columns)
+        # 列的标量默认值（如布尔列默认false）；创建时未提交或为null的列取默认值，与数据库插入时一致
+        self.defaults = {
+            column.name: column.default.arg
+            for column in table.__table__.columns
+            if column.default is not None and column.default.is_scalar
+        }
+        namespace: Dict[str, Any] = {}
+        decoders = []
+        self._fields = []
+        for column in table.__table__.columns:
+            encode: Optional[Callable[[Any], Any]] = None
+            decode: Optional[Callable[[Any], Any]] = None
+            if column.primary_key:
+                encode, decode = _encode_id, _decode_id
+                self.key_of = attrgetter(f"_{column.name}")
+            elif isinstance(column.type, DateTime):
+                encode, decode = _encode_time, _decode_time
+            elif isinstance(column.type, String) and not isinstance(column.type, Text):
+                encode = _Interner()
+            slot = column.name if decode is None else f"_{column.name}"
+            if decode is not None:
+                decoders.append((column.name, decode))
+                namespace[column.name] = property(lambda record, read=attrgetter(slot), decode=decode: decode(read(record)))
+            self._fields.append((column.name, slot, encode))
+        self.created_of = attrgetter("_created_at")
+        self._read = attrgetter(*(slot for _, slot, _ in self._fields))
+        self._decoders = decoders
+        name = table.__name__[:-len("Table")] if table.__name__.endswith("Table") else table.__name__
+        self.record_class = type(f"{name}Record", (Record,), {
+            "__slots__": tuple(slot for _, slot, _ in self._fields),
+            "__module__": __name__,
+            "_layout": self,
+            **namespace,
+        })
+
+    # 请求中的id转为存储键，不是UUID时为None
+    key = staticmethod(_id_key)
+
+    def unpack(self, record: Record) -> dict:
+        """解码为普通字典：一次取出全部槽位，只解码编码过的列"""
+        row = dict(zip(self.columns, self._read(record)))
+        for name, decode in self._decoders:
+            row[name] = decode(row[name])
+        return row
+
+    def pack(self, values: Any, base: Optional[Record] = None) -> Record:
+        """
+        把字典编码为紧凑记录；给出base时values只需包含修改的列，其余列直接沿用base中已编码的值
+        created_at和updated_at通常是同一个时间对象，编码结果也共用一个整数
+        """
+        record = object.__new__(self.record_class)
+        last, encoded = None, None
+        for name, slot, encode in self._fields:
+            if base is not None and name not in values:
+                setattr(record, slot, getattr(base, slot))
+                continue
+            value = values.get(name)
+            if encode is _encode_time and value is last:
+                value = encoded
+            elif encode is _encode_time:
+                last, value = value, _encode_time(value)
+                encoded = value
+            elif encode is not None:
+                value = encode(value)
+            setattr(record, slot, value)
+        return record
+
+
+class MemoryStore:
+    """
+    按主键索引的内存存储，保存RecordLayout编码的紧凑记录
+    - 主键字典（16字节键）：get / replace / remove 均为 O(1)
+    - 插入顺序索引：记录自身保存所在位置；删除只留空位，空位超过一半时整体压缩（均摊 O(1)）
+    - 分页：Fenwick树 O(log n) 定位skip，再顺序取limit条，不复制整个列表
+    - 游标分页：游标记录仍在时 O(1) 定位，已删除时在created_at微秒数组上二分，再在同一created_at的记录中按id定位
+    - journal：设置后每次修改在锁内先登记到写日志，日志顺序与修改顺序一致
+    - lock：仓储持有它完成一次写入及其回调，回调的顺序与修改顺序一致
+    """
+
+    def __init__(self, layout: RecordLayout):
+        self.layout = layout
+        self._rows: Dict[bytes, Record] = {}
+        self._order: List[Optional[Record]] = []
+        self._created = array("q")
+        self._live = _LiveIndex()
+        # 可重入：仓储在同一把锁内完成读取、修改和写入回调，存储自身的方法在其中再次加锁
+        self.lock = threading.RLock()
+        self.journal: Optional[Journal] = None
+
+    def _log(self, op: str, value: Any) -> None:
+        """调用方持有锁；先于修改登记，立即fsync模式下写日志失败时内存也不修改"""
+        if self.journal is not None:
+            self.journal.append(op, value)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, item_id: str) -> Optional[Record]:
+        return self._rows.get(self.layout.key(item_id))
+
+    def insert(self, record: Record) -> Record:
+        with self.lock:
+            self._log("put", record)
+            record._position = len(self._order)
+            self._rows[self.layout.key_of(record)] = record
+            self._order.append(record)
+            self._created.append(self.layout.created_of(record))
+            self._live.append()
+        return record
+
+    def replace(self, record: Record, current: Optional[Record] = None) -> bool:
+        """
+        替换主键相同的已有记录；给出current时只有存储中仍是这条记录才替换（compare-and-swap），
+        读取之后被其他请求修改过则返回False
+        """
+        key = self.layout.key_of(record)
+        with self.lock:
+            existing = self._rows.get(key)
+            if existing is None or (current is not None and existing is not current):
+                return False
+            self._log("put", record)
+            record._position = existing._position
+            self._rows[key] = record
+            self._order[record._position] = record
+        return True
+
+    def remove(self, item_id: str) -> Optional[Record]:
+        """删除并返回被删除的记录，不存在时返回None"""
+        key = self.layout.key(item_id)
+        with self.lock:
+            if key not in self._rows:
+                return None
+            self._log("del", item_id)
+            record = self._rows.pop(key)
+            self._order[record._position] = None
+            self._live.discard(record._position)
+            if len(self._order) > 2 * len(self._rows) + 64:
+                self._compact()
+        return record
+
+    def scan(self) -> List[Record]:
+        """当前全部记录的快照"""
+        with self.lock:
+            return list(self._rows.values())
+
+    def page(self, skip: int = 0, limit: int = 100) -> List[Record]:
+        if skip >= len(self._rows) or limit <= 0:
+            return []
+        with self.lock:
+            return self._collect(self._live.find(skip), limit)
+
+    def page_after(self, after: Cursor, limit: int = 100) -> List[Record]:
+        """返回排在游标之后的limit条记录"""
+        created_at, item_id = after
+        with self.lock:
+            record = self._rows.get(self.layout.key(item_id))
+            if record is not None:
+                return self._collect(record._position + 1, limit)
+            # 游标记录已删除：与SQL的键集条件一样按 (created_at, id) 定位，
+            # 同一created_at的记录（如同一批创建）按id顺序插入，跳过id不大于游标的记录
+            micros = _micros(created_at)
+            position, end = bisect_left(self._created, micros), bisect_right(self._created, micros)
+            while position < end:
+                current = self._order[position]
+                if current is not None and current.id > item_id:
+                    break
+                position += 1
+            return self._collect(position, limit)
+
+    def _collect(self, position: int, limit: int) -> List[Record]:
+        """从position开始跳过空位顺序取limit条，调用方需持有锁"""
+        result = []
+        while position < len(self._order) and len(result) < limit:
+            record = self._order[position]
+            if record is not None:
+                result.append(record)
+            position += 1
+        return result
+
+    def _compact(self) -> None:
+        """去掉删除留下的空位并重建索引，调用方需持有锁"""
+        self._order = [record for record in self._order if record is not None]
+        for position, record in enumerate(self._order):
+            record._position = position
+        self._created = array("q", map(self.layout.created_of, self._order))
+        self._live = _LiveIndex()
+        for _ in self._order:
+            self._live.append()
+
+
+class MemoryRepository:
+    """
+    内存仓储，接口与数据库仓储一致；table为实体的ORM表，用于生成紧凑记录类型
+    存储中始终是紧凑记录，过滤和排序直接读取记录；返回给路由的记录才解码为普通字典，每条每个请求只解码一次
+    listeners中的每个回调 (removed, added) 在每次写入后调用，用于维护派生数据（如汇总）；更新时传入旧记录和新记录
+    写入、时间戳和回调都在存储锁内完成：回调顺序与修改顺序一致，插入顺序与created_at顺序一致
+    search_index：可检索实体的倒排索引，同样随写入增量维护
+    journal：持久化日志（见repositories/journal.py），应用启动时open()加载数据，关闭时close()刷盘
+    """
+
+    def __init__(
+        self,
+        table: Any,
+        store: Optional[MemoryStore] = None,
+        listeners: Sequence[WriteListener] = (),
+        search_index: Optional[SearchIndex] = None,
+        journal: Optional[Journal] = None,
+    ):
+        self.store = store if store is not None else MemoryStore(RecordLayout(table))
+        self._unpack = self.store.layout.unpack
+        self.search_index = search_index
+        self.listeners = [*listeners, *([search_index.record] if search_index is not None else [])]
+        self.journal = journal
+        if journal is not None:
+            _durable_repositories.append(self)
+
+    def open(self) -> None:
+        """加载快照和日志，经由写入回调重建汇总和检索索引，之后的写入追加到日志"""
+        records = [self.store.insert(self.store.layout.pack(values)) for values in self.journal.load()]
+        self._written([], records)
+        self.store.journal = self.journal
+        self.journal.start(self.store.scan)
+
+    def close(self) -> None:
+        self.journal.close()
+        self.store.journal = None
+
+    def _with_defaults(self, data: dict) -> dict:
+        """未提交或为null的列取列默认值，与数据库模式创建的记录一致"""
+        defaults = self.store.layout.defaults
+        return {**data, **{name: value for name, value in defaults.items() if data.get(name) is None}}
+
+    def _written(self, removed: List[Record], added: List[Record]) -> None:
+        if removed or added:
+            for listener in self.listeners:
+                listener(removed, added)
+
+    def _matching(self, query: ListQuery) -> List[Record]:
+        """按过滤和排序选出游标之后的全部记录（内存模式没有二级索引，需要扫描）"""
+        keyed = sorted(
+            ((sort_key(record, query.sort), record) for record in self.store.scan() if matches(record, query)),
+            key=itemgetter(0),
+            reverse=query.descending,
+        )
+        if query.after is not None:
+            value, item_id = query.after
+            start = (value is None, value, item_id)
+            keyed = [(key, record) for key, record in keyed if (key < start if query.descending else key > start)]
+        return [record for _, record in keyed]
+
+    def _page(self, query: ListQuery, skip: int, limit: int) -> List[Record]:
+        if query.is_default:
+            if query.after is not None:
+                return self.store.page_after(query.after, limit)
+            return self.store.page(skip, limit)
+        start = 0 if query.after is not None else skip
+        return self._matching(query)[start:start + limit]
+
+    def list(self, query: ListQuery, skip: int = 0, limit: int = 100) -> List[dict]:
+        """默认顺序直接走插入顺序索引；带过滤或其他排序时扫描全部记录"""
+        return list(map(self._unpack, self._page(query, skip, limit)))
+
+    def stream(self, query: ListQuery) -> Iterator[dict]:
+        """导出用：逐条产出匹配的记录，逐条解码"""
+        records = self.store.scan() if query.is_default and query.after is None else self._matching(query)
+        for record in records:
+            yield self._unpack(record)
+
+    def list_by(self, column: str, values: List[Any]) -> List[dict]:
+        """按某列批量查询（include=）；按id走主键字典，其他列扫描一次"""
+        if column == "id":
+            records = [record for record in map(self.store.get, values) if record is not None]
+        else:
+            wanted = set(values)
+            records = [record for record in self.store.scan() if record.get(column) in wanted]
+        return list(map(self._unpack, records))
+
+    def search(self, text: str, after: Optional[Cursor] = None, limit: int = 20) -> List[dict]:
+        """全文检索：倒排索引只访问命中词的记录，按 (相关度, id) 降序分页"""
+        query = parse_query(text)
+        scored = self.search_index.match(query)
+        hits = []
+        for rank, item_id in page_hits(scored, after, limit):
+            record = self.store.get(item_id)
+            if record is not None:
+                hits.append(make_hit(self._unpack(record), rank, self.search_index.columns, query.terms))
+        return hits
+
+    def get(self, item_id: str) -> Optional[dict]:
+        record = self.store.get(item_id)
+        return self._unpack(record) if record is not None else None
+
+    def create(self, data: dict) -> dict:
+        with self.store.lock:
+            now = utcnow()
+            record = self.store.insert(self.store.layout.pack(dict(self._with_defaults(data), id=new_id(), created_at=now, updated_at=now)))
+            self._written([], [record])
+        return self._unpack(record)
+
+    def update(self, item_id: str, data: dict, expected: Optional[List[datetime]] = None) -> Optional[dict]:
+        """
+        只编码提交的字段，其余列沿用原记录，在存储锁内读取、合并并替换；
+        带版本条件（expected）且记录已被修改时抛出VersionConflict
+        """
+        with self.store.lock:
+            existing = self.store.get(item_id)
+            if existing is None:
+                return None
+            if expected is not None and existing["updated_at"] not in expected:
+                raise VersionConflict(item_id)
+            record = self.store.layout.pack(dict(data, updated_at=utcnow()), existing)
+            self.store.replace(record, existing)
+            self._written([existing], [record])
+        return self._unpack(record)
+
+    def delete(self, item_id: str) -> bool:
+        with self.store.lock:
+            record = self.store.remove(item_id)
+            if record is None:
+                return False
+            self._written([record], [])
+        return True
+
+    def create_many(self, rows: List[dict]) -> List[dict]:
+        pack = self.store.layout.pack
+        with self.store.lock:
+            now = utcnow()
+            created = [pack(dict(self._with_defaults(row), id=new_id(), created_at=now, updated_at=now)) for row in rows]
+            # 同一批共用一个created_at，按id顺序插入，插入顺序与 (created_at, id) 的键集顺序一致；结果仍按提交顺序返回
+            for record in sorted(created, key=self.store.layout.key_of):
+                self.store.insert(record)
+            self._written([], created)
+        return list(map(self._unpack, created))
+
+    def update_many(self, changes: List[dict]) -> Set[str]:
+        removed, added = [], []
+        # 与update相同：在存储锁内读取、合并并替换，整批写入之后才调用回调
+        with self.store.lock:
+            now = utcnow()
+            for change in changes:
+                existing = self.store.get(change["id"])
+                if existing is None:
+                    continue
+                record = self.store.layout.pack(dict(change, updated_at=now), existing)
+                self.store.replace(record, existing)
+                removed.append(existing)
+                added.append(record)
+            self._written(removed, added)
+        return {record["id"] for record in added}
+
+    def delete_many(self, ids: List[str]) -> Set[str]:
+        with self.store.lock:
+            removed = [record for record in map(self.store.remove, ids) if record is not None]
+            self._written(removed, [])
+        return {record["id"] for record in removed}
+
+
+def open_durable_storage() -> None:
+    """应用启动时（在worker中）调用：独占数据目录，加载各实体的数据；没有设置MEMORY_DATA_DIR时什么都不做"""
+    if not _durable_repositories:
+        return
+    lock_data_dir()
+    for repository in _durable_repositories:
+        repository.open()
+
+
+def close_durable_storage() -> None:
+    """应用关闭时调用：写入剩余日志和快照，释放数据目录"""
+    if not _durable_repositories:
+        return
+    for repository in _durable_repositories:
+        repository.close()
+    unlock_data_dir()
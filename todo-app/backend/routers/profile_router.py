@@ -0,0 +1,51 @@
+"""
+诊断路由（PROFILE_ENABLED=true 时注册）
+浏览各worker保存在PROFILE_DIR中的请求诊断记录：耗时、慢SQL汇总和火焰图
+只在设置了PROFILE_TOKEN时注册，需在X-Profile-Token请求头中携带该值（不用X-Profile，浏览请求本身不会被采样）
+"""
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from profiling import PROFILE_MAX_FILES, check_token, flamegraph_svg, folded_stacks, list_profiles, load_profile
+
+
+def require_token(x_profile_token: Optional[str] = Header(default=None)) -> None:
+    if not check_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Profile-Token")
+
+
+router = APIRouter(dependencies=[Depends(require_token)])
+
+
+def _load(profile_id: str) -> dict:
+    record = load_profile(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return record
+
+
+@router.get("/")
+def get_profiles(limit: int = Query(50, ge=1, le=PROFILE_MAX_FILES)) -> List[dict]:
+    """最近的诊断记录摘要，新的在前"""
+    return list_profiles(limit)
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str) -> dict:
+    """完整记录：按语句汇总的SQL（耗时多的在前）、按执行顺序的SQL和折叠调用栈"""
+    return _load(profile_id)
+
+
+@router.get("/{profile_id}/flamegraph")
+def get_flamegraph(profile_id: str) -> Response:
+    """火焰图SVG，可直接在浏览器中打开"""
+    record = _load(profile_id)
+    title = f'{record["method"]} {record["path"]} {record["duration_ms"]:.0f}ms'
+    return Response(flamegraph_svg(record["stacks"], title), media_type="image/svg+xml")
+
+
+@router.get("/{profile_id}/folded", response_class=PlainTextResponse)
+def get_folded(profile_id: str) -> str:
+    """折叠格式的调用栈，可导入speedscope或flamegraph.pl"""
+    return folded_stacks(_load(profile_id)["stacks"])
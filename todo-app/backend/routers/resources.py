@@ -0,0 +1,24 @@
+"""
+实体接口声明
+每个实体一条Resource，main.py按声明用通用CRUD引擎（routers/crud.py）注册路由
+关联由外键推导，可通过include=一并返回，每个关联一条批量查询
+"""
+
+from typing import List
+from models.task import Task, TaskCreate, TaskUpdate, TaskBulkUpdate
+from repositories import task_repository
+from routers.crud import Resource
+
+RESOURCES: List[Resource] = [
+    Resource(
+        name="task",
+        title="Task",
+        tag="任务",
+        model=Task,
+        create_model=TaskCreate,
+        update_model=TaskUpdate,
+        bulk_update_model=TaskBulkUpdate,
+        repository=task_repository.get_task_repository,
+        query_fields=task_repository.QUERY_FIELDS,
+    ),
+]
@@ -0,0 +1 @@
+from .task import TaskTable
\ No newline at end of file
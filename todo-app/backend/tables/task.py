@@ -0,0 +1,24 @@
+"""
+Task表定义
+与migration.sql中的 task 表保持一致
+"""
+
+from sqlalchemy import Column, Boolean, DateTime, Index, String, false, func
+from database import Base, DB_SCHEMA
+from .common import new_id, utcnow
+
+class TaskTable(Base):
+    """Task ORM映射"""
+    __tablename__ = "task"
+    __table_args__ = (
+        Index("idx_task_name", "name"),
+        Index("idx_task_created_at", "created_at", "id"),
+        Index("idx_task_updated_at", "updated_at"),
+        {"schema": DB_SCHEMA},
+    )
+
+    id = Column(String(255), primary_key=True, default=new_id)
+    name = Column(String(255), nullable=False)
+    completed = Column(Boolean, nullable=False, default=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
@@ -1,15 +1,26 @@
-CREATE TABLE task (
-  "id" NUMERIC(10,2) DEFAULT gen_random_uuid() NOT NULL,
+CREATE TABLE "task" (
+  "id" VARCHAR(255) DEFAULT gen_random_uuid() NOT NULL,
   "name" VARCHAR(255) NOT NULL,
   "completed" BOOLEAN DEFAULT FALSE NOT NULL,
   "created_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
   "updated_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
-  CONSTRAINT pk_task PRIMARY KEY (id)
+  CONSTRAINT pk_task PRIMARY KEY ("id")
 );
 
-CREATE INDEX idx_task_name ON task (name);
-CREATE INDEX idx_task_created_at ON task (created_at);
-CREATE INDEX idx_task_updated_at ON task (updated_at);
+CREATE INDEX idx_task_name ON "task" ("name");
+CREATE INDEX idx_task_created_at ON "task" ("created_at", "id");
+CREATE INDEX idx_task_updated_at ON "task" ("updated_at");
+
+-- 迁移版本（后端migrate.py），由本脚本初始化的数据库不再重复执行
+CREATE TABLE "schema_migrations" (
+  "version" INTEGER NOT NULL,
+  "name" VARCHAR(255) NOT NULL,
+  "applied_at" TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT pk_schema_migrations PRIMARY KEY ("version")
+);
+INSERT INTO "schema_migrations" ("version", "name") VALUES
+  (1, '初始表结构'),
+  (4, '补齐索引');
 
 -- 应用信息
 -- 应用名称: 待办事项应用